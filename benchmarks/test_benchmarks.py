@@ -0,0 +1,147 @@
+"""Benchmarks of the hot paths, with pytest-benchmark.
+
+Run them separately from the tests, and save the results as JSON for comparison:
+
+    pytest benchmarks --benchmark-json=benchmark.json
+    pytest benchmarks --benchmark-compare  # with --benchmark-autosave runs
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import overhang  # noqa: E402
+from overhang.reports import make_overhang_figures_data  # noqa: E402
+
+EMMA = [
+    "TAGG",
+    "ATGG",
+    "GACT",
+    "GGAC",
+    "TCCG",
+    "CCAG",
+    "CAGC",
+    "AGGC",
+    "ATCC",
+    "GCGT",
+    "TGCT",
+    "GGTA",
+    "CGTC",
+    "TCAC",
+    "CTAC",
+    "GCAA",
+    "CCCT",
+    "GCTC",
+    "CGGT",
+    "GTGC",
+    "AGCG",
+    "TGGA",
+    "GTTG",
+    "CGAA",
+    "CACG",
+    "ACTG",
+    "ACGA",
+]
+
+
+def get_overhang_set(size):
+    """Return a (deterministic) list of `size` non-palindromic 4-base overhangs, up to
+    120. They are not filtered with the annealing data, so that the sets are the same
+    with any data."""
+    overhangs = [
+        oh.overhang for oh in overhang.iter_all_overhangs(4) if not oh.is_palindromic
+    ]
+    overhangs = overhangs[:: max(1, len(overhangs) // size)][:size]
+    # A smaller set would be benchmarked under the name of this size:
+    assert len(overhangs) == size, "Only %d overhangs" % len(overhangs)
+    return overhangs
+
+
+@pytest.mark.parametrize("overhang_length", [3, 4, 5, 6])
+def test_generate_all_overhangs(benchmark, overhang_length):
+    overhangs = benchmark(overhang.generate_all_overhangs, overhang_length)
+    assert len(overhangs) > 0
+
+
+@pytest.mark.parametrize("size", [5, 10, 20, 40, 60])
+def test_inspect_overhangs(benchmark, size):
+    overhangs = get_overhang_set(size)
+
+    def inspect_overhangs():
+        overhangset = overhang.OverhangSet(overhangs)
+        return overhangset.inspect_overhangs(make_plot=False)
+
+    inspection = benchmark(inspect_overhangs)
+    assert len(inspection.overhangs) == size
+
+
+@pytest.mark.parametrize("name", ["EMMA", "60 overhangs", "100 overhangs"])
+def test_find_perfect_subset(benchmark, name):
+    overhangs = EMMA if name == "EMMA" else get_overhang_set(int(name.split()[0]))
+
+    def find_perfect_subset():
+        overhangset = overhang.OverhangSet(overhangs)
+        overhangset.find_perfect_subset(time_limit=10, make_plot=False, verbose=False)
+        return overhangset
+
+    overhangset = benchmark.pedantic(find_perfect_subset, rounds=3, iterations=1)
+    assert len(overhangset.subset) > 0
+
+
+@pytest.mark.parametrize("size", [20, 60])
+def test_find_similar_overhangs(benchmark, size):
+    overhangset = overhang.OverhangSet(get_overhang_set(size))
+    benchmark(overhangset.find_similar_overhangs, difference_threshold=2)
+
+
+def test_similarity_index_query(benchmark):
+    index = overhang.SimilarityIndex(overhang.OverhangTable(8))
+    queries = overhang.generate_all_overhangs(8)[:1000]
+    results = benchmark.pedantic(
+        index.query, args=(queries,), kwargs=dict(max_distance=1), rounds=3
+    )
+    assert len(results) >= len(queries)
+
+
+@pytest.mark.parametrize("backend", ["matplotlib", "svg"])
+def test_make_overhang_figures_data(benchmark, backend):
+    overhangs = overhang.generate_all_overhangs(4)[:10]
+    benchmark.pedantic(
+        make_overhang_figures_data,
+        args=(overhangs, "Esp3I"),
+        kwargs=dict(backend=backend),
+        rounds=3,
+        iterations=1,
+    )
+
+
+def test_write_pdf_report(benchmark, tmpdir):
+    """The full compendium of 4-base overhangs."""
+    target = os.path.join(str(tmpdir), "compendium.pdf")
+    overhangs = overhang.generate_all_overhangs(4)
+    try:
+        benchmark.pedantic(
+            overhang.write_pdf_report,
+            kwargs=dict(target=target, overhangs=overhangs, workers=os.cpu_count()),
+            rounds=1,
+            iterations=1,
+        )
+    except ImportError as error:  # WeasyPrint needs system libraries
+        pytest.skip(str(error))
+
+
+def test_write_compendiums(benchmark, tmpdir):
+    """The HTML compendiums of all enzymes, with SVG plots."""
+    benchmark.pedantic(
+        overhang.write_compendiums,
+        kwargs=dict(
+            target_dir=str(tmpdir),
+            workers=os.cpu_count(),
+            output_format="html",
+            figure_backend="svg",
+        ),
+        rounds=1,
+        iterations=1,
+    )
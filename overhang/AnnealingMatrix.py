@@ -0,0 +1,831 @@
+import collections
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas
+
+from .profiling import profiled
+from .tools import order_overhangs, enzyme_tatapov_lookup, reverse_complement
+
+MAX_SET_SUBSETS = 128  # set subsets kept by each matrix, see `get_subset()`
+
+
+class AnnealingMatrix:
+    """Class for a Tatapov annealing dataset stored as a dense NumPy array.
+
+    Rows and columns are indexed by overhang sequences; `values[i, j]` is the number
+    of ligation events between the overhangs labelling row `i` and column `j`. The
+    values are a read-only view, as matrices are shared (see `get_annealing_matrix()`).
+
+
+    **Parameters**
+
+    **values**
+    > Square array of ligation counts (`numpy.ndarray`).
+
+    **overhangs**
+    > Overhang sequences labelling both the rows and the columns (`list`).
+    """
+
+    def __init__(self, values, overhangs):
+        self.values = np.asanyarray(values).view()  # memory maps stay memory maps
+        self.values.setflags(write=False)
+        self.overhangs = list(overhangs)
+        self.index = {overhang: i for i, overhang in enumerate(self.overhangs)}
+        # Memoized dataframes: the last set subsets (see `get_subset()`), and the
+        # subset of each overhang (see `get_overhang_subset()`):
+        self._set_subsets = collections.OrderedDict()
+        self._overhang_subsets = {}
+        self._data_hash = None  # computed at first use, see `get_data_hash()`
+
+    def get_data_hash(self):
+        """Return a hash of the overhangs and values of the matrix (`str`), which
+        identifies the annealing data, for example in the keys of a `FigureCache`."""
+        if self._data_hash is None:
+            data_hash = hashlib.sha256("\n".join(self.overhangs).encode("utf-8"))
+            data_hash.update(str(self.values.dtype).encode("utf-8"))
+            data_hash.update(np.ascontiguousarray(self.values).tobytes())
+            self._data_hash = data_hash.hexdigest()
+        return self._data_hash
+
+    @classmethod
+    def from_dataframe(cls, dataframe):
+        """Create an `AnnealingMatrix` from a Tatapov dataframe.
+
+
+        **Parameters**
+
+        **dataframe**
+        > Tatapov dataset, for example `tatapov.annealing_data["37C"]["01h"]`.
+        """
+        overhangs = list(dataframe.index)
+        values = dataframe.loc[overhangs, overhangs].to_numpy()
+        return cls(values, overhangs)
+
+    def get_indices(self, overhangs):
+        """Return the row/column indices of the overhangs as an array.
+
+        Raises `KeyError` for sequences not in the dataset, like `tatapov.data_subset`.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+        """
+        return np.array([self.index[overhang] for overhang in overhangs], dtype=int)
+
+    @profiled("get_subset")
+    def get_subset(self, overhangs, add_reverse=True):
+        """Return the dataframe of the ligations between overhangs.
+
+        Same as `tatapov.data_subset()` on the full dataset. The last
+        `MAX_SET_SUBSETS` subsets are memoized, so the returned dataframe must not be
+        modified.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+
+        **add_reverse**
+        > If True, the reverse complements of the overhangs are also included, each
+        after its overhang (`bool`).
+        """
+        key = (tuple(overhangs), add_reverse)
+        if key in self._set_subsets:
+            self._set_subsets.move_to_end(key)
+        else:
+            overhangs = list(overhangs)
+            if add_reverse:
+                overhangs = [
+                    sequence
+                    for overhang in overhangs
+                    for sequence in [overhang, reverse_complement(overhang)]
+                ]
+            overhangs = list(dict.fromkeys(overhangs))  # unique, in order
+            indices = self.get_indices(overhangs)
+            self._set_subsets[key] = pandas.DataFrame(
+                self.values[np.ix_(indices, indices)],
+                index=overhangs,
+                columns=overhangs,
+            )
+            if len(self._set_subsets) > MAX_SET_SUBSETS:
+                self._set_subsets.popitem(last=False)  # least recently used
+        return self._set_subsets[key]
+
+    @profiled("get_subset")
+    def get_overhang_subset(self, overhang):
+        """Return the dataframe of the ligations of an overhang and its reverse
+        complement (rows) with all overhangs they ligate with (columns).
+
+        Same as `subset_data_for_overhang()` on the full dataset. Subsets are memoized,
+        so the returned dataframe must not be modified.
+
+
+        **Parameters**
+
+        **overhang**
+        > Overhang class instance (`Overhang`).
+        """
+        key = overhang.overhang  # at most one subset per overhang of the matrix
+        if key not in self._overhang_subsets:
+            rows = [overhang.overhang, overhang.overhang_rc]
+            values = self.values[self.get_indices(rows)]
+            columns = np.flatnonzero(values.sum(axis=0) != 0)
+            self._overhang_subsets[key] = pandas.DataFrame(
+                values[:, columns],
+                index=rows,
+                columns=[self.overhangs[column] for column in columns],
+            )
+        return self._overhang_subsets[key]
+
+    def find_weak_anneals(self, overhangs, overhangs_rc, cutoff=400):
+        """Return a boolean array marking overhangs that anneal weakly with their
+        reverse complement.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+
+        **overhangs_rc**
+        > Reverse complements of `overhangs`, in the same order (`list`).
+
+        **cutoff**
+        > Overhangs with fewer correct ligations are weak (`int`). See cutoff 400 in
+        Pryor et al. Figure 2.
+        """
+        rows = self.get_indices(overhangs_rc)
+        columns = self.get_indices(overhangs)
+        return self.values[rows, columns] < cutoff
+
+    def find_self_misanneals(self, overhangs, overhangs_rc):
+        """Return a boolean array marking overhangs that ligate with themselves, on
+        either strand.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+
+        **overhangs_rc**
+        > Reverse complements of `overhangs`, in the same order (`list`).
+        """
+        indices = self.get_indices(overhangs)
+        indices_rc = self.get_indices(overhangs_rc)
+        return (self.values[indices, indices] != 0) | (
+            self.values[indices_rc, indices_rc] != 0
+        )
+
+    def find_misanneals(self, overhangs, overhangs_rc, cutoff=10):
+        """Return the index pairs of misannealing overhangs.
+
+        Two overhangs misanneal if any of the four combinations of the two overhangs
+        and their reverse complements has more ligations than the cutoff. Pairs are
+        returned in the order of `itertools.combinations(overhangs, 2)`.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+
+        **overhangs_rc**
+        > Reverse complements of `overhangs`, in the same order (`list`).
+
+        **cutoff**
+        > Ligation count above which a pair is misannealing (`int`).
+        """
+        is_misannealing = self.get_misannealing_matrix(
+            overhangs, overhangs_rc, cutoff=cutoff
+        )
+        first, second = np.triu_indices(len(overhangs), k=1)
+        is_pair_misannealing = is_misannealing[first, second]
+        return [
+            (int(i), int(j))
+            for i, j in zip(first[is_pair_misannealing], second[is_pair_misannealing])
+        ]
+
+    def get_misannealing_matrix(
+        self,
+        overhangs,
+        overhangs_rc,
+        other_overhangs=None,
+        other_overhangs_rc=None,
+        cutoff=10,
+    ):
+        """Return a boolean array marking the misannealing pairs of two lists of
+        overhangs, of shape `(len(overhangs), len(other_overhangs))`.
+
+        See `find_misanneals()` for the definition.
+
+
+        **Parameters**
+
+        **overhangs**
+        > ACGT sequences (`list`).
+
+        **overhangs_rc**
+        > Reverse complements of `overhangs`, in the same order (`list`).
+
+        **other_overhangs**
+        > ACGT sequences (`list`). Defaults to `overhangs`.
+
+        **other_overhangs_rc**
+        > Reverse complements of `other_overhangs`, in the same order (`list`).
+
+        **cutoff**
+        > Ligation count above which a pair is misannealing (`int`).
+        """
+        if other_overhangs is None:
+            other_overhangs, other_overhangs_rc = overhangs, overhangs_rc
+        indices = self.get_indices(overhangs)
+        indices_rc = self.get_indices(overhangs_rc)
+        other_indices = self.get_indices(other_overhangs)
+        other_indices_rc = self.get_indices(other_overhangs_rc)
+        is_misannealing = np.zeros((len(indices), len(other_indices)), dtype=bool)
+        for rows in [indices, indices_rc]:
+            for columns in [other_indices, other_indices_rc]:
+                is_misannealing |= self.values[np.ix_(rows, columns)] > cutoff
+        return is_misannealing
+
+    def get_junction_fidelities(self, overhangs):
+        """Return the ligation fidelity of each junction (overhang) of a set.
+
+        See `FidelityScore` for the definition.
+
+
+        **Parameters**
+
+        **overhangs**
+        > Overhang strings of the set (`list`).
+        """
+        return FidelityScore(self, overhangs).get_junction_fidelities()
+
+    def get_fidelity(self, overhangs):
+        """Return the predicted ligation fidelity of an overhang set (between 0 and 1).
+
+        See `FidelityScore` for the definition.
+
+
+        **Parameters**
+
+        **overhangs**
+        > Overhang strings of the set (`list`).
+        """
+        return FidelityScore(self, overhangs).get_fidelity()
+
+
+_annealing_matrices = {}  # loaded once per temperature and dataset
+
+
+def get_annealing_matrix(enzyme="Esp3I", temperature="37C"):
+    """Return the `AnnealingMatrix` of an enzyme, loading it on first use.
+
+    Tatapov (which reads all its datasets) is only imported here, at the first call.
+    If the `OVERHANG_ANNEALING_FILE` environment variable is set, the matrices of that
+    file (see `write_annealing_file()`) are used instead, when it has them.
+
+
+    **Parameters**
+
+    **enzyme**
+    > Enzyme used for assembly (`str`). See `overhang.tools.enzyme_tatapov_lookup`
+    for options.
+
+    **temperature**
+    > Temperature key of `tatapov.annealing_data` (`str`).
+    """
+    return get_dataset_matrix(temperature, enzyme_tatapov_lookup[enzyme])
+
+
+def get_dataset_matrix(temperature="37C", dataset="01h"):
+    """Return the `AnnealingMatrix` of a Tatapov dataset, loading it on first use.
+
+    See `get_annealing_matrix()`.
+
+
+    **Parameters**
+
+    **temperature**
+    > Temperature key of `tatapov.annealing_data` (`str`).
+
+    **dataset**
+    > Dataset key of `tatapov.annealing_data[temperature]` (`str`), for example
+    `"18h"` or `"2020_01h_BsaI"`.
+    """
+    key = (temperature, dataset)
+    path = os.environ.get("OVERHANG_ANNEALING_FILE")
+    if key not in _annealing_matrices and path and path not in _annealing_files:
+        register_annealing_file(path)
+    if key not in _annealing_matrices:
+        import tatapov
+
+        data = tatapov.annealing_data[key[0]][key[1]]
+        _annealing_matrices[key] = AnnealingMatrix.from_dataframe(data)
+    return _annealing_matrices[key]
+
+
+def has_annealing_data(enzyme="Esp3I", overhang_length=4, temperature="37C"):
+    """Return whether there is annealing data for an enzyme and overhang length.
+
+    The data comes from Tatapov (or an annealing file, see `get_annealing_matrix()`),
+    for the enzymes of `overhang.tools.enzyme_tatapov_lookup` and 4-base overhangs.
+
+
+    **Parameters**
+
+    **enzyme**
+    > Enzyme used for assembly (`str`).
+
+    **overhang_length**
+    > Length of the overhangs (`int`).
+
+    **temperature**
+    > Temperature key of `tatapov.annealing_data` (`str`).
+    """
+    if enzyme not in enzyme_tatapov_lookup:
+        return False
+    matrix = get_annealing_matrix(enzyme, temperature=temperature)
+    return len(matrix.overhangs[0]) == overhang_length
+
+
+def get_annealing_conditions(enzyme="Esp3I"):
+    """Return the (temperature, dataset) keys of the Tatapov datasets usable for an
+    enzyme: the dataset of the enzyme (see `overhang.tools.enzyme_tatapov_lookup`),
+    then the datasets of all temperatures and incubation times that were not made
+    with a specific enzyme (for example `("25C", "18h")`).
+
+
+    **Parameters**
+
+    **enzyme**
+    > Enzyme used for assembly (`str`).
+    """
+    import tatapov
+
+    enzyme_datasets = set(enzyme_tatapov_lookup.values())
+    conditions = [("37C", enzyme_tatapov_lookup[enzyme])]
+    for temperature, datasets in tatapov.annealing_data.items():
+        conditions += [
+            (temperature, dataset)
+            for dataset in datasets
+            if dataset not in enzyme_datasets
+        ]
+    return conditions
+
+
+class AnnealingTensor:
+    """Class for several annealing datasets stacked into one NumPy array, to evaluate
+    overhangs in all conditions (temperatures and incubation times) at once.
+
+    `values[c, i, j]` is the number of ligation events between the overhangs
+    labelling row `i` and column `j`, in condition `c`. The checks are those of
+    `AnnealingMatrix`, with a first axis for the conditions.
+
+
+    **Parameters**
+
+    **values**
+    > Array of ligation counts of shape `(conditions, overhangs, overhangs)`
+    (`numpy.ndarray`).
+
+    **overhangs**
+    > Overhang sequences labelling the rows and the columns of each matrix (`list`).
+
+    **conditions**
+    > The (temperature, dataset) key of each matrix (`list`).
+    """
+
+    def __init__(self, values, overhangs, conditions):
+        self.values = np.asarray(values)
+        self.values.setflags(write=False)
+        self.overhangs = list(overhangs)
+        self.index = {overhang: i for i, overhang in enumerate(self.overhangs)}
+        self.conditions = [tuple(condition) for condition in conditions]
+
+    @classmethod
+    def from_matrices(cls, matrices, conditions):
+        """Create an `AnnealingTensor` from `AnnealingMatrix` instances, with the
+        overhang order of the first one.
+
+
+        **Parameters**
+
+        **matrices**
+        > `AnnealingMatrix` instances (`list`).
+
+        **conditions**
+        > The (temperature, dataset) key of each matrix (`list`).
+        """
+        overhangs = matrices[0].overhangs
+        values = np.stack(
+            [
+                matrix.values[np.ix_(*2 * [matrix.get_indices(overhangs)])]
+                for matrix in matrices
+            ]
+        )
+        return cls(values, overhangs, conditions)
+
+    def get_indices(self, overhangs):
+        """Return the row/column indices of the overhangs as an array. See
+        `AnnealingMatrix.get_indices()`."""
+        return np.array([self.index[overhang] for overhang in overhangs], dtype=int)
+
+    def find_weak_anneals(self, overhangs, overhangs_rc, cutoff=400):
+        """Return a boolean array of shape `(conditions, overhangs)` marking the
+        overhangs that anneal weakly with their reverse complement. See
+        `AnnealingMatrix.find_weak_anneals()`."""
+        rows = self.get_indices(overhangs_rc)
+        columns = self.get_indices(overhangs)
+        return self.values[:, rows, columns] < cutoff
+
+    def find_self_misanneals(self, overhangs, overhangs_rc):
+        """Return a boolean array of shape `(conditions, overhangs)` marking the
+        overhangs that ligate with themselves. See
+        `AnnealingMatrix.find_self_misanneals()`."""
+        indices = self.get_indices(overhangs)
+        indices_rc = self.get_indices(overhangs_rc)
+        return (self.values[:, indices, indices] != 0) | (
+            self.values[:, indices_rc, indices_rc] != 0
+        )
+
+    def get_misannealing_tensor(self, overhangs, overhangs_rc, cutoff=10):
+        """Return a boolean array of shape `(conditions, overhangs, overhangs)` marking
+        the misannealing pairs. See `AnnealingMatrix.get_misannealing_matrix()`."""
+        indices = self.get_indices(overhangs)
+        indices_rc = self.get_indices(overhangs_rc)
+        is_misannealing = np.zeros(
+            (len(self.conditions), len(indices), len(indices)), dtype=bool
+        )
+        for rows in [indices, indices_rc]:
+            for columns in [indices, indices_rc]:
+                is_misannealing |= self.values[:, rows[:, None], columns] > cutoff
+        return is_misannealing
+
+    def count_misanneals(self, overhangs, overhangs_rc, cutoff=10):
+        """Return the number of misannealing pairs in each condition
+        (`numpy.ndarray`). See `AnnealingMatrix.find_misanneals()`."""
+        is_misannealing = self.get_misannealing_tensor(
+            overhangs, overhangs_rc, cutoff=cutoff
+        )
+        return np.triu(is_misannealing, k=1).sum(axis=(1, 2))
+
+    def get_fidelities(self, overhangs):
+        """Return the predicted ligation fidelity of an overhang set in each condition
+        (`numpy.ndarray`). See `FidelityScore` for the definition.
+
+
+        **Parameters**
+
+        **overhangs**
+        > Overhang strings of the set (`list`).
+        """
+        overhang_pairs = [order_overhangs(overhang) for overhang in overhangs]
+        strands = self.get_indices([pair[0] for pair in overhang_pairs])
+        strands_rc = self.get_indices([pair[1] for pair in overhang_pairs])
+        columns = FidelityScore.get_columns(strands, strands_rc)
+        fidelities = []
+        for rows, other_rows in [(strands, strands_rc), (strands_rc, strands)]:
+            totals = self.values[:, rows[:, None], columns].sum(axis=2)
+            correct = self.values[:, rows, other_rows].astype(float)
+            fidelities += [
+                np.divide(
+                    correct, totals, out=np.zeros_like(correct), where=totals != 0
+                )
+            ]
+        fidelities[1][:, strands == strands_rc] = 1  # a single strand
+        return np.prod(fidelities[0] * fidelities[1], axis=1)
+
+
+_annealing_tensors = {}  # keyed by conditions
+
+
+def get_annealing_tensor(enzyme="Esp3I", conditions=None):
+    """Return the `AnnealingTensor` of an enzyme, built on first use from the
+    matrices of `get_dataset_matrix()`.
+
+
+    **Parameters**
+
+    **enzyme**
+    > Enzyme used for assembly (`str`).
+
+    **conditions**
+    > The (temperature, dataset) keys of the matrices (`list`). Defaults to
+    `get_annealing_conditions(enzyme)`.
+    """
+    if conditions is None:
+        conditions = get_annealing_conditions(enzyme)
+    key = tuple(tuple(condition) for condition in conditions)
+    if key not in _annealing_tensors:
+        matrices = [get_dataset_matrix(*condition) for condition in key]
+        _annealing_tensors[key] = AnnealingTensor.from_matrices(matrices, key)
+    return _annealing_tensors[key]
+
+
+ANNEALING_FILE_MAGIC = b"OVHGANN1"
+ANNEALING_FILE_ALIGNMENT = 64  # bytes, for the start of each matrix
+_annealing_files = set()  # registered with `register_annealing_file()`
+
+
+def write_annealing_file(target, enzymes=None, temperature="37C"):
+    """Write annealing matrices into a binary file, for `load_annealing_file()`.
+
+    The file starts with a magic string, the length of a JSON header (8 bytes, little
+    endian) and the header, which lists the matrices with their overhangs, dtype,
+    shape and offset. The matrices follow, as C-ordered arrays aligned to 64 bytes.
+
+
+    **Parameters**
+
+    **target**
+    > Path of the file (`str`).
+
+    **enzymes**
+    > Enzymes whose matrices are written (`list`). Defaults to all enzymes of
+    `overhang.tools.enzyme_tatapov_lookup`.
+
+    **temperature**
+    > Temperature key of `tatapov.annealing_data` (`str`).
+    """
+    if enzymes is None:
+        enzymes = list(enzyme_tatapov_lookup)
+    arrays = []
+    entries = []
+    for enzyme in enzymes:
+        dataset = enzyme_tatapov_lookup[enzyme]
+        if any(entry["dataset"] == dataset for entry in entries):
+            continue  # enzymes can share a dataset
+        matrix = get_annealing_matrix(enzyme, temperature=temperature)
+        values = matrix.values
+        if np.issubdtype(values.dtype, np.integer):  # ligation counts
+            values = values.astype("<i4" if values.max() < 2**31 else "<i8")
+        else:
+            values = values.astype("<f8")
+        arrays += [values]
+        entries += [
+            {
+                "temperature": temperature,
+                "dataset": dataset,
+                "overhangs": matrix.overhangs,
+                "dtype": values.dtype.str,
+                "shape": list(values.shape),
+            }
+        ]
+
+    position = 0  # offsets are relative to the start of the data section
+    for entry, values in zip(entries, arrays):
+        entry["offset"] = position
+        position = get_aligned_position(position + values.nbytes)
+    header = json.dumps(entries).encode()
+    data_start = get_aligned_position(len(ANNEALING_FILE_MAGIC) + 8 + len(header))
+
+    with open(target, "wb") as f:
+        f.write(ANNEALING_FILE_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for entry, values in zip(entries, arrays):
+            f.write(b"\0" * (data_start + entry["offset"] - f.tell()))
+            f.write(values.tobytes())
+
+
+def get_aligned_position(position):
+    """Return the first position from `position` aligned for a matrix in a file."""
+    return -(-position // ANNEALING_FILE_ALIGNMENT) * ANNEALING_FILE_ALIGNMENT
+
+
+def load_annealing_file(path):
+    """Return the annealing matrices of a file made with `write_annealing_file()`.
+
+    The matrices are read-only memory maps of the file, so that processes loading the
+    same file share one copy in memory. Returns a dictionary of `AnnealingMatrix`
+    instances, keyed by (temperature, dataset).
+
+
+    **Parameters**
+
+    **path**
+    > Path of the file (`str`).
+    """
+    with open(path, "rb") as f:
+        if f.read(len(ANNEALING_FILE_MAGIC)) != ANNEALING_FILE_MAGIC:
+            raise ValueError("%s is not an annealing matrix file." % path)
+        header_length = int.from_bytes(f.read(8), "little")
+        entries = json.loads(f.read(header_length))
+    data_start = get_aligned_position(len(ANNEALING_FILE_MAGIC) + 8 + header_length)
+
+    matrices = {}
+    for entry in entries:
+        values = np.memmap(
+            path,
+            dtype=entry["dtype"],
+            mode="r",
+            offset=data_start + entry["offset"],
+            shape=tuple(entry["shape"]),
+        )
+        key = (entry["temperature"], entry["dataset"])
+        matrices[key] = AnnealingMatrix(values, entry["overhangs"])
+    return matrices
+
+
+def register_annealing_file(path):
+    """Use the matrices of a file made with `write_annealing_file()` in
+    `get_annealing_matrix()`, instead of loading them from Tatapov.
+
+    Matrices already in use are replaced. To use the file in all processes, set the
+    `OVERHANG_ANNEALING_FILE` environment variable instead.
+
+
+    **Parameters**
+
+    **path**
+    > Path of the file (`str`).
+    """
+    _annealing_matrices.update(load_annealing_file(path))
+    _annealing_files.add(path)
+    _annealing_tensors.clear()  # made of the replaced matrices
+
+
+class FidelityScore:
+    """Class for the ligation fidelity of an overhang set, with incremental updates.
+
+    The fidelity of a strand is the fraction of its ligations (with all strands of the
+    set, each counted once, even if an overhang is duplicated) that are with its
+    reverse complement. The fidelity of a junction is the
+    product of the fidelities of its two strands (one for palindromes), and the
+    fidelity of the set is the product of the junction fidelities.
+
+    The ligation totals of each strand are kept, so that adding, removing or replacing
+    an overhang updates the score in O(N) instead of recomputing it from scratch.
+
+
+    **Parameters**
+
+    **matrix**
+    > An `AnnealingMatrix` instance.
+
+    **overhangs**
+    > Overhang strings of the initial set (`list`).
+    """
+
+    def __init__(self, matrix, overhangs=()):
+        self.matrix = matrix
+        self.overhangs = list(overhangs)
+        overhang_pairs = [order_overhangs(overhang) for overhang in self.overhangs]
+        # Matrix index of each overhang and of its reverse complement:
+        self.strands = matrix.get_indices([pair[0] for pair in overhang_pairs])
+        self.strands_rc = matrix.get_indices([pair[1] for pair in overhang_pairs])
+        # Ligations of each strand with all strands of the set:
+        columns = self.get_columns(self.strands, self.strands_rc)
+        self.totals = matrix.values[np.ix_(self.strands, columns)].sum(axis=1)
+        self.totals_rc = matrix.values[np.ix_(self.strands_rc, columns)].sum(axis=1)
+
+    def get_strands(self, overhang):
+        """Return the matrix indices of the overhang and its reverse complement."""
+        overhang, overhang_rc = order_overhangs(overhang)
+        return self.matrix.index[overhang], self.matrix.index[overhang_rc]
+
+    @staticmethod
+    def get_columns(strands, strands_rc):
+        """Return the matrix indices of all strands, each once (palindromes and
+        duplicate overhangs)."""
+        return np.unique(np.concatenate([strands, strands_rc]))
+
+    def get_ligations(self, columns):
+        """Return the ligations of each strand of the set with the strands of the
+        columns (matrix indices)."""
+        columns = np.array(sorted(columns), dtype=int)
+        values = self.matrix.values
+        return (
+            values[np.ix_(self.strands, columns)].sum(axis=1),
+            values[np.ix_(self.strands_rc, columns)].sum(axis=1),
+        )
+
+    def get_other_columns(self, position=None):
+        """Return the strands of the set (`set`), without those of the junction at the
+        position (`int`), if any."""
+        strands, strands_rc = self.strands, self.strands_rc
+        if position is not None:
+            strands = np.delete(strands, position)
+            strands_rc = np.delete(strands_rc, position)
+        return set(strands.tolist()) | set(strands_rc.tolist())
+
+    def compute_junction_fidelities(self, strands, strands_rc, totals, totals_rc):
+        values = self.matrix.values
+        fidelities = []
+        for rows, columns, row_totals in [
+            (strands, strands_rc, totals),
+            (strands_rc, strands, totals_rc),
+        ]:
+            correct = values[rows, columns].astype(float)
+            fidelities += [
+                np.divide(
+                    correct,
+                    row_totals,
+                    out=np.zeros_like(correct),
+                    where=row_totals != 0,
+                )
+            ]
+        fidelities[1][strands == strands_rc] = 1  # a single strand
+        return fidelities[0] * fidelities[1]
+
+    def get_addition(self, overhang):
+        strand, strand_rc = self.get_strands(overhang)
+        # Strands already in the set (duplicates) are counted once:
+        new_columns = {strand, strand_rc} - self.get_other_columns()
+        ligations, ligations_rc = self.get_ligations(new_columns)
+        strands = np.append(self.strands, strand)
+        strands_rc = np.append(self.strands_rc, strand_rc)
+        columns = self.get_columns(strands, strands_rc)
+        values = self.matrix.values
+        totals = np.append(self.totals + ligations, values[strand, columns].sum())
+        totals_rc = np.append(
+            self.totals_rc + ligations_rc, values[strand_rc, columns].sum()
+        )
+        return strands, strands_rc, totals, totals_rc
+
+    def get_removal(self, position):
+        columns = {int(self.strands[position]), int(self.strands_rc[position])}
+        removed_columns = columns - self.get_other_columns(position)
+        ligations, ligations_rc = self.get_ligations(removed_columns)
+        return (
+            np.delete(self.strands, position),
+            np.delete(self.strands_rc, position),
+            np.delete(self.totals - ligations, position),
+            np.delete(self.totals_rc - ligations_rc, position),
+        )
+
+    def get_replacement(self, position, overhang):
+        strand, strand_rc = self.get_strands(overhang)
+        other_columns = self.get_other_columns(position)
+        old_columns = {int(self.strands[position]), int(self.strands_rc[position])}
+        old_columns -= other_columns
+        new_columns = {strand, strand_rc} - other_columns
+        old_ligations, old_ligations_rc = self.get_ligations(old_columns - new_columns)
+        ligations, ligations_rc = self.get_ligations(new_columns - old_columns)
+        strands = self.strands.copy()
+        strands_rc = self.strands_rc.copy()
+        strands[position] = strand
+        strands_rc[position] = strand_rc
+        columns = self.get_columns(strands, strands_rc)
+        values = self.matrix.values
+        totals = self.totals - old_ligations + ligations
+        totals_rc = self.totals_rc - old_ligations_rc + ligations_rc
+        totals[position] = values[strand, columns].sum()
+        totals_rc[position] = values[strand_rc, columns].sum()
+        return strands, strands_rc, totals, totals_rc
+
+    def get_addition_fidelity(self, overhang):
+        """Return the set fidelity after adding the overhang, without adding it."""
+        return float(
+            np.prod(self.compute_junction_fidelities(*self.get_addition(overhang)))
+        )
+
+    def get_removal_fidelity(self, position):
+        """Return the set fidelity after removing the overhang at the position
+        (`int`), without removing it."""
+        return float(
+            np.prod(self.compute_junction_fidelities(*self.get_removal(position)))
+        )
+
+    def get_replacement_fidelity(self, position, overhang):
+        """Return the set fidelity after replacing the overhang at the position
+        (`int`), without replacing it."""
+        state = self.get_replacement(position, overhang)
+        return float(np.prod(self.compute_junction_fidelities(*state)))
+
+    def add(self, overhang):
+        """Add an overhang (`str`) to the end of the set."""
+        state = self.get_addition(overhang)
+        self.strands, self.strands_rc, self.totals, self.totals_rc = state
+        self.overhangs.append(overhang)
+
+    def remove(self, position):
+        """Remove the overhang at the position (`int`) from the set."""
+        state = self.get_removal(position)
+        self.strands, self.strands_rc, self.totals, self.totals_rc = state
+        del self.overhangs[position]
+
+    def replace(self, position, overhang):
+        """Replace the overhang at the position (`int`) with a new one (`str`)."""
+        state = self.get_replacement(position, overhang)
+        self.strands, self.strands_rc, self.totals, self.totals_rc = state
+        self.overhangs[position] = overhang
+
+    def get_junction_fidelities(self):
+        """Return the fidelity of each junction, in the order of `overhangs`
+        (`numpy.ndarray`)."""
+        return self.compute_junction_fidelities(
+            self.strands, self.strands_rc, self.totals, self.totals_rc
+        )
+
+    def get_fidelity(self):
+        """Return the fidelity of the set (between 0 and 1)."""
+        return float(np.prod(self.get_junction_fidelities()))
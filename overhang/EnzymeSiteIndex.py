@@ -0,0 +1,97 @@
+from .tools import reverse_complement
+
+_enzyme_site_index = None  # shared index, see `get_enzyme_site_index()`
+
+
+class EnzymeSiteIndex:
+    """Class for the k-mers of restriction enzyme sites, for "overhang in site" checks.
+
+    For each enzyme and overhang length, the k-mers of the site on both strands are
+    stored as a set, so that checking whether an overhang (or its reverse complement)
+    is part of the site is a set membership test. K-mers with ambiguous nucleotides
+    are left out, as ACGT overhangs never match them. Any enzyme of
+    `Bio.Restriction` can be used.
+
+
+    **Parameters**
+
+    **enzymes**
+    > Names of the enzymes indexed now (`list`). Defaults to all enzymes of
+    `Bio.Restriction`. Other enzymes are indexed at first use.
+
+    **overhang_lengths**
+    > Overhang lengths indexed now (`list`). Other lengths are indexed at first use.
+    """
+
+    def __init__(self, enzymes=None, overhang_lengths=(4,)):
+        import Bio.Restriction  # imported at first use, as it is slow to load
+
+        if enzymes is None:
+            enzymes = [str(enzyme) for enzyme in Bio.Restriction.AllEnzymes]
+        self.sites = {}
+        self.kmers = {}  # (enzyme, overhang length): set of k-mers
+        for enzyme in enzymes:
+            for overhang_length in overhang_lengths:
+                self.get_kmers(enzyme, overhang_length)
+
+    def get_site(self, enzyme):
+        """Return the recognition site of an enzyme (`str`).
+
+        Raises `ValueError` for names that are not `Bio.Restriction` enzymes.
+        """
+        if enzyme not in self.sites:
+            import Bio.Restriction
+
+            enzyme_type = getattr(Bio.Restriction, enzyme, None)
+            if not isinstance(getattr(enzyme_type, "site", None), str):
+                raise ValueError("Unknown restriction enzyme: %s" % enzyme)
+            self.sites[enzyme] = enzyme_type.site
+        return self.sites[enzyme]
+
+    def get_kmers(self, enzyme, overhang_length):
+        """Return the k-mers of an enzyme site and of its reverse complement
+        (`frozenset`).
+
+
+        **Parameters**
+
+        **enzyme**
+        > Name of the enzyme (`str`).
+
+        **overhang_length**
+        > Length of the k-mers (`int`).
+        """
+        key = (enzyme, overhang_length)
+        if key not in self.kmers:
+            site = self.get_site(enzyme)
+            kmers = {
+                site[i : i + overhang_length]
+                for i in range(len(site) - overhang_length + 1)
+            }
+            kmers = {kmer for kmer in kmers if set(kmer) <= set("ACGT")}
+            kmers |= {reverse_complement(kmer) for kmer in kmers}
+            self.kmers[key] = frozenset(kmers)
+        return self.kmers[key]
+
+    def is_in_site(self, overhang, enzyme):
+        """Return whether an overhang or its reverse complement is part of the site of
+        the enzyme.
+
+
+        **Parameters**
+
+        **overhang**
+        > ACGT sequence (`str`).
+
+        **enzyme**
+        > Name of the enzyme (`str`).
+        """
+        return overhang in self.get_kmers(enzyme, len(overhang))
+
+
+def get_enzyme_site_index():
+    """Return the `EnzymeSiteIndex` shared in this process, built on first use."""
+    global _enzyme_site_index
+    if _enzyme_site_index is None:
+        _enzyme_site_index = EnzymeSiteIndex()
+    return _enzyme_site_index
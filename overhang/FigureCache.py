@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+
+from .version import __version__
+
+CACHE_PATH = os.environ.get(
+    "OVERHANG_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "overhang")
+)
+
+
+class FigureCache:
+    """Class for a size-bounded, on-disk cache of rendered report figures.
+
+    Figures are stored as text files named by the hash of the parameters that define
+    them (see `make_key()`). When the cache grows over `max_size`, the least recently
+    used figures are deleted.
+
+
+    **Parameters**
+
+    **path**
+    > Directory of the cache (`str`). Defaults to the `figures` directory in
+    `$OVERHANG_CACHE_DIR` (or `~/.cache/overhang`).
+
+    **max_size**
+    > Maximum total size of the cached figures, in bytes (`int`).
+    """
+
+    def __init__(self, path=None, max_size=100_000_000):
+        if path is None:
+            path = os.path.join(CACHE_PATH, "figures")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_size = max_size
+        self.size = None  # measured at the first write
+
+    def make_key(self, **parameters):
+        """Return the cache key of a figure described by the keyword arguments.
+
+        The version of this package is always part of the key.
+        """
+        parameters["overhang_version"] = __version__
+        text = json.dumps(parameters, sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_filepath(self, key):
+        return os.path.join(self.path, key + ".txt")
+
+    def get(self, key):
+        """Return the cached figure data, or None if the key is not in the cache."""
+        filepath = self.get_filepath(key)
+        try:
+            with open(filepath, "r") as f:
+                figure_data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(filepath)  # mark as recently used
+        return figure_data
+
+    def set(self, key, figure_data):
+        """Store the figure data (`str`) under the key, then enforce `max_size`."""
+        filepath = self.get_filepath(key)
+        temp_filepath = "%s.%d.tmp" % (filepath, os.getpid())
+        with open(temp_filepath, "w") as f:
+            f.write(figure_data)
+        try:
+            old_size = os.path.getsize(filepath)  # the entry is replaced
+        except FileNotFoundError:
+            old_size = 0
+        os.replace(temp_filepath, filepath)  # atomic, for concurrent reports
+
+        if self.size is None:
+            self.size = self.measure_size()
+        else:
+            self.size += os.path.getsize(filepath) - old_size
+        if self.size > self.max_size:
+            self.evict()
+
+    def list_files(self):
+        return [
+            os.path.join(self.path, filename)
+            for filename in os.listdir(self.path)
+            if filename.endswith(".txt")
+        ]
+
+    def measure_size(self):
+        return sum(os.path.getsize(filepath) for filepath in self.list_files())
+
+    def evict(self):
+        """Delete the least recently used figures until the cache fits `max_size`."""
+        files = [
+            (os.path.getmtime(filepath), os.path.getsize(filepath), filepath)
+            for filepath in self.list_files()
+        ]
+        files.sort()
+        self.size = sum(size for _, size, _ in files)
+        for _, size, filepath in files:
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:  # removed by another process
+                pass
+            self.size -= size
+
+    def clear(self):
+        """Delete all figures in the cache."""
+        for filepath in self.list_files():
+            os.remove(filepath)
+        self.size = 0
@@ -0,0 +1,131 @@
+import json
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True)
+class InspectionResult:
+    """Class for the result of `OverhangSet.inspect_overhangs()`.
+
+    Overhangs are given as `(overhang, overhang_rc)` pairs, in the order of the set.
+    The result is immutable, and serializes to a `dict` (see `to_dict()`) without
+    building any text.
+
+
+    **Parameters**
+
+    **name**
+    > Name of the set (`str`).
+
+    **enzyme**
+    > Enzyme used for assembly (`str`).
+
+    **overhangs**
+    > Overhang strings of the set, as given (`tuple`).
+
+    **has_duplicates**
+    > Whether an overhang is given more than once (`bool`). An error.
+
+    **palindromic_overhangs**
+    > Palindromic overhangs (`tuple`). An error.
+
+    **rc_overhangs**
+    > Nonpalindromic overhangs given with their reverse complement, sorted (`tuple`).
+    An error.
+
+    **weak_anneals**
+    > Pairs that anneal weakly (`tuple`). A warning.
+
+    **self_misanneals**
+    > Pairs that ligate with themselves (`tuple`). A warning.
+
+    **misanneals**
+    > Misannealing couples of pairs (`tuple` of 2-tuples of pairs). A warning.
+
+    **overhangs_in_site**
+    > Pairs that are part of the enzyme site (`tuple`). A warning.
+
+    **max_set_size**
+    > Size above which the assembly fidelity decreases significantly, or 0 if unknown
+    for the overhang length (`int`). See Pryor et al., PLoS ONE (2020).
+
+    **fidelity**
+    > Predicted ligation fidelity of the set (`float`), or None without annealing data.
+
+    **junction_fidelities**
+    > Predicted ligation fidelity of each overhang (`tuple`).
+
+    **has_annealing_data**
+    > Whether the annealing of the overhangs was checked (`bool`). If not (no data for
+    the enzyme and overhang length), it is a warning.
+    """
+
+    name: str
+    enzyme: str
+    overhangs: tuple
+    has_duplicates: bool
+    palindromic_overhangs: tuple
+    rc_overhangs: tuple
+    weak_anneals: tuple
+    self_misanneals: tuple
+    misanneals: tuple
+    overhangs_in_site: tuple
+    max_set_size: int
+    fidelity: float
+    junction_fidelities: tuple
+    has_annealing_data: bool = True
+
+    @property
+    def errors(self):
+        """Names of the errors of the set, which cannot be used for assembly."""
+        found = {
+            "duplicates": self.has_duplicates,
+            "palindromic_overhangs": self.palindromic_overhangs,
+            "rc_overhangs": self.rc_overhangs,
+        }
+        return tuple(error for error, is_found in found.items() if is_found)
+
+    @property
+    def warnings(self):
+        """Names of the potential issues of the set."""
+        found = {
+            "weak_anneals": self.weak_anneals,
+            "self_misanneals": self.self_misanneals,
+            "misanneals": self.misanneals,
+            "overhangs_in_site": self.overhangs_in_site,
+            "no_annealing_data": not self.has_annealing_data,
+        }
+        return tuple(warning for warning, is_found in found.items() if is_found)
+
+    @property
+    def has_errors(self):
+        return len(self.errors) > 0
+
+    @property
+    def has_warnings(self):
+        return len(self.warnings) > 0
+
+    @property
+    def is_too_large(self):
+        """Whether the set has more overhangs than `max_set_size` (not a warning)."""
+        return 0 < self.max_set_size < len(self.overhangs)
+
+    @property
+    def severity(self):
+        """`"error"`, `"warning"` or `"ok"`."""
+        if self.has_errors:
+            return "error"
+        if self.has_warnings:
+            return "warning"
+        return "ok"
+
+    def to_dict(self):
+        """Return the result as a `dict`, with the errors, warnings and severity."""
+        result = {field.name: getattr(self, field.name) for field in fields(self)}
+        result["errors"] = self.errors
+        result["warnings"] = self.warnings
+        result["severity"] = self.severity
+        return result
+
+    def to_json(self):
+        """Return the result as a JSON string, see `to_dict()`."""
+        return json.dumps(self.to_dict())
@@ -0,0 +1,227 @@
+import importlib.metadata
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .FigureCache import CACHE_PATH
+from .OverhangTable import OverhangTable
+from .tools import decode_overhang, get_code_bases, reverse_complement_codes
+
+MAX_KMER_LENGTH = 8  # longest sequences with a table, see `get_kmer_table()`
+START_CODONS = ["ATG"]
+STOP_CODONS = ["TAA", "TAG", "TGA"]
+KMER_TABLES_PATH = os.path.join(CACHE_PATH, "kmer_tables")
+
+_kmer_tables = {}  # overhang length: KmerTable, see `get_kmer_table()`
+
+
+class KmerTable:
+    """Class for the properties of all 4^k sequences of a length, indexed by their
+    2-bit code (see `overhang.tools.encode_overhang()`).
+
+    The codon flags, the longest homopolymer run and the GC content are computed for
+    all sequences at once, with NumPy. The amino acid patterns (from minotaor) are
+    slower to compute: they are computed at first use, or for all sequences with
+    `build_aa_patterns()`, and kept when the table is saved (see `save()`).
+
+
+    **Parameters**
+
+    **overhang_length**
+    > Length of the sequences (`int`).
+    """
+
+    def __init__(self, overhang_length=4):
+        self.overhang_length = overhang_length
+        codes = np.arange(4**overhang_length, dtype=np.int64)
+        bases = get_code_bases(codes, overhang_length)
+        self.has_start_codon = OverhangTable.find_codons(bases, START_CODONS)
+        self.has_stop_codon = OverhangTable.find_codons(bases, STOP_CODONS)
+        self.max_repeat = self.find_max_repeats(bases)
+        self.gc_content = np.isin(bases, [1, 2]).mean(axis=1)  # C or G
+        self.aa_patterns = {}  # code: list of patterns
+        self._properties = None  # Python lists of the arrays, see `get_properties()`
+
+    def __len__(self):
+        return len(self.max_repeat)
+
+    @staticmethod
+    def find_max_repeats(bases):
+        """Return the length of the longest run of a base in each sequence."""
+        run = np.ones(len(bases), dtype=np.int8)
+        max_run = run.copy()
+        for position in range(1, bases.shape[1]):
+            is_repeat = bases[:, position] == bases[:, position - 1]
+            run = np.where(is_repeat, run + 1, 1).astype(np.int8)
+            np.maximum(max_run, run, out=max_run)
+        return max_run
+
+    def get_properties(self, code):
+        """Return `(has_start_codon, has_stop_codon, has_multimer, gc_content)` for a
+        sequence code, as Python values. Multimers are runs of 3 bases or more, as in
+        `Overhang.count_max_repeat()`."""
+        if self._properties is None:
+            self._properties = list(
+                zip(
+                    self.has_start_codon.tolist(),
+                    self.has_stop_codon.tolist(),
+                    (self.max_repeat >= 3).tolist(),
+                    self.gc_content.tolist(),
+                )
+            )
+        return self._properties[code]
+
+    def get_aa_patterns(self, code):
+        """Return the amino acid patterns of a sequence code in 6 translation frames
+        (`list`), see `minotaor.convert_dna_to_aa_pattern()`."""
+        if code not in self.aa_patterns:
+            sequence = decode_overhang(code, self.overhang_length)
+            self.aa_patterns[code] = convert_dna_to_aa_pattern(sequence)
+        return self.aa_patterns[code]
+
+    def build_aa_patterns(self, workers=None):
+        """Compute the amino acid patterns of all sequences that are not the reverse
+        complement of a lower sequence (the `Overhang.overhang` of all overhangs).
+
+
+        **Parameters**
+
+        **workers**
+        > Number of processes (`int`). If None or 1, the patterns are computed in this
+        process.
+        """
+        if self.overhang_length < 3:
+            return  # minotaor needs a codon
+        codes = np.arange(len(self), dtype=np.int64)
+        codes_rc = reverse_complement_codes(codes, self.overhang_length)
+        codes = [int(code) for code in codes[codes <= codes_rc]]
+        codes = [code for code in codes if code not in self.aa_patterns]
+        sequences = [decode_overhang(code, self.overhang_length) for code in codes]
+        if workers is None or workers <= 1:
+            patterns = map(convert_dna_to_aa_pattern, sequences)
+            self.aa_patterns.update(zip(codes, patterns))
+            return
+        chunksize = max(1, len(sequences) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            patterns = executor.map(
+                convert_dna_to_aa_pattern, sequences, chunksize=chunksize
+            )
+            self.aa_patterns.update(zip(codes, patterns))
+
+    def save(self, target):
+        """Write the table into a NumPy `.npz` file, for `load()`.
+
+
+        **Parameters**
+
+        **target**
+        > Path of the file (`str`).
+        """
+        aa_codes = sorted(self.aa_patterns)
+        np.savez_compressed(
+            target,
+            overhang_length=self.overhang_length,
+            has_start_codon=self.has_start_codon,
+            has_stop_codon=self.has_stop_codon,
+            max_repeat=self.max_repeat,
+            gc_content=self.gc_content,
+            aa_codes=np.array(aa_codes, dtype=np.int64),
+            # One line per code, with the patterns separated by spaces:
+            aa_patterns=np.array(
+                "\n".join(" ".join(self.aa_patterns[code]) for code in aa_codes)
+            ),
+            minotaor_version=np.array(importlib.metadata.version("minotaor")),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Return the table of a file written with `save()`. The amino acid patterns
+        are only kept if they were made with the installed version of minotaor.
+
+
+        **Parameters**
+
+        **path**
+        > Path of the file (`str`).
+        """
+        with np.load(path) as data:
+            table = cls.__new__(cls)
+            table.overhang_length = int(data["overhang_length"])
+            table.has_start_codon = data["has_start_codon"]
+            table.has_stop_codon = data["has_stop_codon"]
+            table.max_repeat = data["max_repeat"]
+            table.gc_content = data["gc_content"]
+            table.aa_patterns = {}
+            table._properties = None
+            minotaor_version = str(data["minotaor_version"])
+            if minotaor_version == importlib.metadata.version("minotaor"):
+                aa_codes = data["aa_codes"].tolist()
+                lines = str(data["aa_patterns"]).split("\n") if aa_codes else []
+                table.aa_patterns = {
+                    code: line.split(" ") for code, line in zip(aa_codes, lines)
+                }
+        return table
+
+
+def convert_dna_to_aa_pattern(sequence):
+    """Return `minotaor.convert_dna_to_aa_pattern()` of a sequence."""
+    import minotaor  # imported at first use, as it is slow to load
+
+    return minotaor.convert_dna_to_aa_pattern(sequence)
+
+
+def get_kmer_table_path(overhang_length, path=None):
+    if path is None:
+        path = KMER_TABLES_PATH
+    return os.path.join(path, "kmer_table_%d.npz" % overhang_length)
+
+
+def get_kmer_table(overhang_length):
+    """Return the `KmerTable` of a sequence length, shared in this process.
+
+    The table is loaded from the files of `write_kmer_tables()` if there is one,
+    otherwise it is computed (except for the amino acid patterns, which are computed
+    at first use).
+
+
+    **Parameters**
+
+    **overhang_length**
+    > Length of the sequences (`int`), up to `MAX_KMER_LENGTH`.
+    """
+    if overhang_length not in _kmer_tables:
+        path = get_kmer_table_path(overhang_length)
+        if os.path.exists(path):
+            _kmer_tables[overhang_length] = KmerTable.load(path)
+        else:
+            _kmer_tables[overhang_length] = KmerTable(overhang_length)
+    return _kmer_tables[overhang_length]
+
+
+def write_kmer_tables(overhang_lengths=None, path=None, workers=None):
+    """Compute the complete `KmerTable` of sequence lengths and write them to disk,
+    where `get_kmer_table()` finds them.
+
+
+    **Parameters**
+
+    **overhang_lengths**
+    > Lengths of the sequences (`list`). Defaults to 1 to `MAX_KMER_LENGTH`.
+
+    **path**
+    > Directory of the files (`str`). Defaults to the `kmer_tables` directory in
+    `$OVERHANG_CACHE_DIR` (or `~/.cache/overhang`), used by `get_kmer_table()`.
+
+    **workers**
+    > Number of processes computing the amino acid patterns (`int`).
+    """
+    if overhang_lengths is None:
+        overhang_lengths = range(1, MAX_KMER_LENGTH + 1)
+    if path is None:
+        path = KMER_TABLES_PATH
+    os.makedirs(path, exist_ok=True)
+    for overhang_length in overhang_lengths:
+        table = get_kmer_table(overhang_length)
+        table.build_aa_patterns(workers=workers)
+        table.save(get_kmer_table_path(overhang_length, path))
@@ -1,6 +1,17 @@
-import minotaor
+import operator
 
-from .tools import gc_content, order_overhangs, generate_overhang_pairs
+import numpy as np
+
+from .KmerTable import MAX_KMER_LENGTH, convert_dna_to_aa_pattern, get_kmer_table
+from .tools import (
+    encode_overhang,
+    gc_content,
+    order_overhangs,
+    iter_overhang_pairs,
+    get_hamming_distance_code,
+    get_hamming_distance_matrix,
+    reverse_complement_code,
+)
 
 
 class Overhang:
@@ -17,17 +28,63 @@ class Overhang:
     > ACGT sequence (`str`).
     """
 
+    # Fixed attributes keep instances small when enumerating long overhangs:
+    __slots__ = (
+        "overhang",
+        "overhang_rc",
+        "code",
+        "code_rc",
+        "is_palindromic",
+        "gc_content",
+        "has_multimer",
+        "has_start_codon",
+        "has_stop_codon",
+        "has_rc_start_codon",
+        "has_rc_stop_codon",
+        "_aa_patterns",
+        # Set by the report writers:
+        "is_usable",
+        "gc_content_percent",
+        "has_extreme_gc",
+        "figure_data",
+        "tatapov_figure",  # no longer set: the reports keep only the SVG figure_data
+    )
+
     def __init__(self, seq):
         self.overhang, self.overhang_rc = order_overhangs(seq)
+        self.code = encode_overhang(self.overhang)  # 2-bit packed sequence
+        self.code_rc = reverse_complement_code(self.code, len(self.overhang))
         if len(set([self.overhang, self.overhang_rc])) == 1:
             self.is_palindromic = True
         else:
             self.is_palindromic = False
-        # its reverse complement has the same GC content:
-        self.gc_content = gc_content(seq)
-        self.aa_patterns = minotaor.convert_dna_to_aa_pattern(self.overhang)
-        self.count_max_repeat()
-        self.find_codons()
+        self._aa_patterns = None  # computed at first use
+        if len(self.overhang) <= MAX_KMER_LENGTH:  # look up the precomputed values
+            kmer_table = get_kmer_table(len(self.overhang))
+            (
+                self.has_start_codon,
+                self.has_stop_codon,
+                self.has_multimer,
+                self.gc_content,
+            ) = kmer_table.get_properties(self.code)
+            properties_rc = kmer_table.get_properties(self.code_rc)
+            self.has_rc_start_codon, self.has_rc_stop_codon = properties_rc[:2]
+        else:
+            # its reverse complement has the same GC content:
+            self.gc_content = gc_content(seq)
+            self.count_max_repeat()
+            self.find_codons()
+
+    @property
+    def aa_patterns(self):
+        """Amino acid patterns of the overhang in 6 translation frames (`list`)."""
+        if self._aa_patterns is None:
+            if len(self.overhang) <= MAX_KMER_LENGTH:
+                kmer_table = get_kmer_table(len(self.overhang))
+                self._aa_patterns = kmer_table.get_aa_patterns(self.code)
+            else:
+                self._aa_patterns = convert_dna_to_aa_pattern(self.overhang)
+        return self._aa_patterns
 
     def is_good(self):
         """Summarise attributes and decide whether overhang can be used for assembly."""
@@ -76,8 +133,10 @@ class Overhang:
                 self.has_rc_stop_codon = True
 
 
-def generate_all_overhangs(overhang_length=4):
-    """Generate list Overhang class instances for all overhangs of given length.
+def iter_all_overhangs(overhang_length=4):
+    """Yield Overhang class instances for all overhangs of given length, in order.
+
+    Unlike `generate_all_overhangs()`, this does not hold all overhangs in memory.
 
 
     **Parameters**
@@ -85,16 +144,20 @@ def generate_all_overhangs(overhang_length=4):
     **overhang_length**
     > Length of overhangs (`int`).
     """
-    overhang_pairs = generate_overhang_pairs(overhang_length=overhang_length)
-    overhang_strings = [next(iter(overhang_pair)) for overhang_pair in overhang_pairs]
-    overhang_strings.sort()
+    for overhang_string, _ in iter_overhang_pairs(overhang_length=overhang_length):
+        yield Overhang(overhang_string)
 
-    overhangs = []
-    for overhang_string in overhang_strings:
-        overhang_class = Overhang(overhang_string)
-        overhangs += [overhang_class]
 
-    return overhangs
+def generate_all_overhangs(overhang_length=4):
+    """Generate list Overhang class instances for all overhangs of given length.
+
+
+    **Parameters**
+
+    **overhang_length**
+    > Length of overhangs (`int`).
+    """
+    return list(iter_all_overhangs(overhang_length=overhang_length))
 
 
 def get_overhang_distance(oh1, oh2):
@@ -109,14 +172,62 @@ def get_overhang_distance(oh1, oh2):
     **oh2**
     > An `Overhang` instance.
     """
-    distance = get_hamming_distance(oh1.overhang, oh2.overhang)
-    distance_rc = get_hamming_distance(oh1.overhang, oh2.overhang_rc)
+    distance = get_hamming_distance_code(oh1.code, oh2.code)
+    distance_rc = get_hamming_distance_code(oh1.code, oh2.code_rc)
     if distance < distance_rc:  # we want to find the most similar ones
         return distance
     else:
         return distance_rc
 
 
+def get_overhang_distance_matrix(overhangs, other_overhangs=None):
+    """Calculate `get_overhang_distance()` for all pairs of overhangs at once.
+
+    Returns an integer array of shape `(len(overhangs), len(other_overhangs))`.
+
+
+    **Parameters**
+
+    **overhangs**
+    > List of `Overhang` instances (`list`), or an `OverhangTable`.
+
+    **other_overhangs**
+    > List of `Overhang` instances (`list`), or an `OverhangTable`. Defaults to
+    `overhangs`.
+    """
+    if other_overhangs is None:
+        other_overhangs = overhangs
+    codes, _ = get_codes(overhangs)
+    other_codes, other_codes_rc = get_codes(other_overhangs)
+    length = get_overhang_length(overhangs)
+    return np.minimum(
+        get_hamming_distance_matrix(codes, other_codes, length),
+        get_hamming_distance_matrix(codes, other_codes_rc, length),
+    )
+
+
+def get_codes(overhangs):
+    """Return the codes and reverse complement codes of overhangs as arrays.
+
+
+    **Parameters**
+
+    **overhangs**
+    > List of `Overhang` instances (`list`), or an `OverhangTable`.
+    """
+    if hasattr(overhangs, "codes"):  # OverhangTable
+        return overhangs.codes, overhangs.codes_rc
+    codes = np.array([overhang.code for overhang in overhangs], dtype=np.int64)
+    codes_rc = np.array([overhang.code_rc for overhang in overhangs], dtype=np.int64)
+    return codes, codes_rc
+
+
+def get_overhang_length(overhangs):
+    if hasattr(overhangs, "overhang_length"):  # OverhangTable
+        return overhangs.overhang_length
+    return len(overhangs[0].overhang) if len(overhangs) else 0
+
+
 def get_hamming_distance(seq1, seq2):
     """Calculate Hamming distance between two overhang sequences.
 
@@ -129,9 +240,4 @@ def get_hamming_distance(seq1, seq2):
     **seq2**
     > ACGT sequence (`str`).
     """
-    distance = 0
-    for i, letter in enumerate(seq1):
-        if letter != seq2[i]:
-            distance += 1
-
-    return distance
+    return sum(map(operator.ne, seq1, seq2))
@@ -1,12 +1,22 @@
+import collections
 import itertools
-import networkx
 
-import Bio.Restriction
+import numpy as np
+import pandas
 
-import tatapov
-
-from .Overhang import Overhang, get_overhang_distance
-from .tools import reverse_complement, enzyme_tatapov_lookup
+from .AnnealingMatrix import (
+    FidelityScore,
+    get_annealing_matrix,
+    get_annealing_tensor,
+    has_annealing_data,
+)
+from .EnzymeSiteIndex import get_enzyme_site_index
+from .InspectionResult import InspectionResult
+from .SimilarityIndex import SimilarityIndex
+from .Overhang import Overhang
+from .profiling import profile_stage, profiled
+from .subset import find_compatible_subset
+from .tools import reverse_complement, order_overhangs
 
 
 class OverhangSet:
@@ -30,159 +40,417 @@ class OverhangSet:
 
     def __init__(self, overhangs, enzyme="Esp3I", name="Unnamed set"):
         self.overhangs = [Overhang(overhang) for overhang in overhangs]
-        if len(set(overhangs)) != len(overhangs):
-            self.has_duplicates = True
-        else:
-            self.has_duplicates = False
-        self.overhang_input = overhangs
-        self.overhang_input_txt = ", ".join(self.overhang_input)
+        self.overhang_input = list(overhangs)
         self.enzyme = enzyme
         self.name = name
         self.has_warnings = False  # used during evaluation of set and reporting
         self.has_errors = False  # used during evaluation of set and reporting
         self.overhang_length = len(self.overhang_input[0])  # check length on first one
+        self._counts = collections.Counter(self.overhang_input)
+        self._distances = None  # computed at first use, see `get_distances()`
 
-    def inspect_overhangs(self, make_plot=True):
-        """Inspect compatibility of overhangs and detect potential errors in the set."""
-        # DUPLICATES
-        if self.has_duplicates:
-            print("Incorrect set! Duplicate overhangs")
-            self.has_errors = True
+    @property
+    def has_duplicates(self):
+        return len(self._counts) != len(self.overhang_input)
 
-        # PALINDROMIC
-        self.palindromic_oh = []
-        self.palindromic_oh += [
-            overhang.overhang for overhang in self.overhangs if overhang.is_palindromic
-        ]
-        if len(self.palindromic_oh) != 0:
-            self.palindromic_text = "Palindromic overhang(s): " + "; ".join(
-                self.palindromic_oh
-            )
-            print(("Incorrect set! " + self.palindromic_text))
-            self.has_errors = True
-
-        # REVERSE COMPLEMENT
-        nonpalindromic_oh = set(self.overhang_input) - set(self.palindromic_oh)
-        nonpalindromic_oh_rc = {reverse_complement(oh) for oh in nonpalindromic_oh}
-        rc_oh = nonpalindromic_oh & nonpalindromic_oh_rc
-        if rc_oh:
-            self.has_rc_error = True
-            self.rc_error_text = (
-                "Nonpalindromic overhang(s) with reverse complement: "
-                + "; ".join(rc_oh)
-            )
-            print(("Incorrect set! " + self.rc_error_text))
-            self.has_errors = True
-        else:
-            self.has_rc_error = False
+    @property
+    def overhang_input_txt(self):
+        return ", ".join(self.overhang_input)
+
+    @profiled("inspect_overhangs")
+    def inspect_overhangs(self, make_plot=True, verbose=False):
+        """Inspect compatibility of overhangs and detect potential errors in the set.
+
+        Returns an `InspectionResult`, also stored in `inspection`. The text
+        descriptions of the issues (for example `weak_anneals`) are only built when
+        read. Enzymes of `Bio.Restriction` without annealing data (see
+        `has_annealing_data()`) get all checks except the annealing ones.
 
-        # SIMILAR OVERHANGS -- we do not consider it as a flaw
-        self.similar_overhangs = self.find_similar_overhangs()
+
+        **Parameters**
+
+        **make_plot**
+        > If True, plot the Tatapov data of the set in `ax` (`bool`).
+
+        **verbose**
+        > If True, print the errors and warnings (`bool`).
+        """
+        # PALINDROMIC, REVERSE COMPLEMENT, OVERHANG IN ENZYME SITE
+        self.evaluate_sequences()
+        self.has_annealing_data = has_annealing_data(
+            self.enzyme, overhang_length=self.overhang_length
+        )
 
         # SET SIZE
         # Based on Pryor et al., PLoS ONE (2020):
         if self.overhang_length == 3:
-            n = 10
+            self.max_set_size = 10
         elif self.overhang_length == 4:
-            n = 20
+            self.max_set_size = 20
         else:
-            n = 0  # serves as False
-
-        if n and len(self.overhang_input) > n:
-            self.set_size_text = (
-                "Assembly fidelity significantly decreases when using "
-                + "more than %d overhangs." % n
-            )  # text used in report
-            print("Warning! " + self.set_size_text)
-        else:
-            self.set_size_text = ""
-
-        # OVERHANG IN ENZYME SITE
-        self.overhangs_in_site = []
-        site = Bio.Restriction.__dict__[self.enzyme].site
-        for oh in self.overhangs:
-            if oh.overhang in site:
-                self.overhangs_in_site += [oh]
-            elif oh.overhang_rc in site:
-                self.overhangs_in_site += [oh]
-
-        if not len(self.overhangs_in_site) == 0:
-            self.has_warnings = True
-            # Convert to text
-            self.overhangs_in_site_txt = [
-                oh.overhang + "/" + oh.overhang_rc for oh in self.overhangs_in_site
-            ]
-            self.overhangs_in_site_txt = "; ".join(self.overhangs_in_site_txt)
-        else:
-            self.overhangs_in_site_txt = ""
+            self.max_set_size = 0  # serves as False
 
         # MISANNEALING
-        self.evaluate_annealing()  # also sets `has_warnings`
+        self.evaluate_annealing()
+        self.evaluate_fidelity()
+
+        self.update_inspection()
+
+        if verbose:
+            if self.has_duplicates:
+                print("Incorrect set! Duplicate overhangs")
+            if self.palindromic_text:
+                print("Incorrect set! " + self.palindromic_text)
+            if self.has_rc_error:
+                print("Incorrect set! " + self.rc_error_text)
+            if self.set_size_text:
+                print("Warning! " + self.set_size_text)
+            if not self.has_annealing_data:
+                print("Warning! No annealing data for %s, not checked." % self.enzyme)
 
         # Tatapov plots:
-        if make_plot:
+        if make_plot and self.has_annealing_data:
+            import tatapov  # imported at first use, as it loads all its datasets
+
             figwidth = len(self.overhang_input)
-            print(self.enzyme, "Tatapov plot (37 Celsius, 1 hour):")
-            data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[self.enzyme]]
-            subset = tatapov.data_subset(data, self.overhang_input, add_reverse=True)
-            self.ax, _ = tatapov.plot_data(subset, figwidth=figwidth, plot_color="Reds")
+            if verbose:
+                print(self.enzyme, "Tatapov plot (37 Celsius, 1 hour):")
+            matrix = get_annealing_matrix(self.enzyme)
+            subset = matrix.get_subset(self.overhang_input)
+            with profile_stage("plot_data"):
+                self.ax, _ = tatapov.plot_data(
+                    subset, figwidth=figwidth, plot_color="Reds"
+                )
             self.ax.figure.tight_layout()
             self.ax.plot()
 
+        return self.inspection
+
+    def update_inspection(self):
+        """Set `inspection` from the results of the evaluations, and `has_errors` and
+        `has_warnings` from it. Used in `inspect_overhangs()`."""
+        self.inspection = InspectionResult(
+            name=self.name,
+            enzyme=self.enzyme,
+            overhangs=tuple(self.overhang_input),
+            has_duplicates=self.has_duplicates,
+            palindromic_overhangs=tuple(self.palindromic_oh),
+            rc_overhangs=tuple(self.rc_oh),
+            weak_anneals=tuple(tuple(pair) for pair in self.weak_anneals_list),
+            self_misanneals=tuple(tuple(pair) for pair in self.self_misanneals_list),
+            misanneals=tuple(
+                (tuple(pair[0]), tuple(pair[1])) for pair in self.misanneals_list
+            ),
+            overhangs_in_site=tuple(
+                (oh.overhang, oh.overhang_rc) for oh in self.overhangs_in_site
+            ),
+            max_set_size=self.max_set_size,
+            fidelity=None if self.fidelity is None else float(self.fidelity),
+            junction_fidelities=tuple(float(f) for f in self.junction_fidelities),
+            has_annealing_data=self.has_annealing_data,
+        )
+        # used in reporting:
+        self.has_errors = self.inspection.has_errors
+        self.has_warnings = self.inspection.has_warnings
+
+    def evaluate_sequences(self):
+        """Find the palindromic overhangs, the overhangs given with their reverse
+        complement, and the overhangs in the enzyme site.
+
+        Sets `palindromic_oh`, `rc_oh`, `has_rc_error` and `overhangs_in_site`. Used in
+        `inspect_overhangs()`.
+        """
+        self.palindromic_oh = [
+            overhang.overhang for overhang in self.overhangs if overhang.is_palindromic
+        ]
+        self.rc_oh = sorted(
+            oh
+            for oh in self._counts
+            if reverse_complement(oh) != oh and reverse_complement(oh) in self._counts
+        )
+        self.has_rc_error = len(self.rc_oh) != 0
+
+        enzyme_site_index = get_enzyme_site_index()
+        self.overhangs_in_site = [
+            oh
+            for oh in self.overhangs
+            if enzyme_site_index.is_in_site(oh.overhang, self.enzyme)
+        ]
+
+    @profiled("evaluate_annealing")
     def evaluate_annealing(self):
         """Evaluate weak anneals, self-misanneals and misanneals between overhangs.
 
-        Used in `inspect_overhangs()`.
+        Sets `weak_anneals_list`, `self_misanneals_list` and `misanneals_list`. Used in
+        `inspect_overhangs()`. They are empty if there is no annealing data.
         """
+        if not self.has_annealing_data:
+            size = len(self.overhangs)
+            self._is_weak = np.zeros(size, dtype=bool)
+            self._is_self_misannealing = np.zeros(size, dtype=bool)
+            self._is_misannealing = np.zeros((size, size), dtype=bool)
+            self.update_annealing_lists()
+            return
         # Prepare data:
-        data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[self.enzyme]]
-        subset = tatapov.data_subset(data, self.overhang_input, add_reverse=True)
+        matrix = get_annealing_matrix(self.enzyme)
+        overhangs = [oh.overhang for oh in self.overhangs]
+        overhangs_rc = [oh.overhang_rc for oh in self.overhangs]
 
         # WEAK ANNEALS
         # See cutoff 400 in Pryor et al. Figure 2.
+        self._is_weak = matrix.find_weak_anneals(overhangs, overhangs_rc, cutoff=400)
+        # SELF-MISANNEALS
+        self._is_self_misannealing = matrix.find_self_misanneals(
+            overhangs, overhangs_rc
+        )
+        # MISANNEALS
+        # 10 below is a good cutoff for misannealing pairs
+        self._is_misannealing = matrix.get_misannealing_matrix(
+            overhangs, overhangs_rc, cutoff=10
+        )
+        self.update_annealing_lists()
+
+    def update_annealing_lists(self):
+        """Set `weak_anneals_list`, `self_misanneals_list` and `misanneals_list` from
+        the results of `evaluate_annealing()`."""
+        pairs = [[oh.overhang, oh.overhang_rc] for oh in self.overhangs]
         self.weak_anneals_list = [
-            [oh.overhang, oh.overhang_rc]
-            for oh in self.overhangs
-            if subset[oh.overhang][oh.overhang_rc] < 400
-        ]
-        # Convert to text
-        self.weak_anneals = [
-            oh_pair[0] + "/" + oh_pair[1] for oh_pair in self.weak_anneals_list
+            pair for pair, is_weak in zip(pairs, self._is_weak) if is_weak
         ]
-        self.weak_anneals = "; ".join(self.weak_anneals)
-        if not self.weak_anneals == "":
-            self.has_warnings = True
-
-        # SELF-MISANNEALS
         self.self_misanneals_list = [
-            [oh.overhang, oh.overhang_rc]
-            for oh in self.overhangs
-            if subset[oh.overhang][oh.overhang] != 0
-            or subset[oh.overhang_rc][oh.overhang_rc] != 0
+            pair
+            for pair, is_self_misannealing in zip(pairs, self._is_self_misannealing)
+            if is_self_misannealing
         ]
-        self.self_misanneals = [
-            oh_pair[0] + "/" + oh_pair[1] for oh_pair in self.self_misanneals_list
+        # oh and reverse complement, in a list with its misannealing pair, in the
+        # order of itertools.combinations():
+        first, second = np.nonzero(np.triu(self._is_misannealing, k=1))
+        self.misanneals_list = [
+            [list(pairs[i]), list(pairs[j])] for i, j in zip(first, second)
         ]
-        self.self_misanneals = "; ".join(self.self_misanneals)
-        if not self.self_misanneals == "":
-            self.has_warnings = True
 
-        # MISANNEALS
-        self.misanneals_list = []
-        for oh1, oh2 in itertools.combinations(self.overhangs, 2):
-            # 10 below is a good cutoff for misannealing pairs
-            if (
-                subset.loc[
-                    [oh1.overhang, oh1.overhang_rc], [oh2.overhang, oh2.overhang_rc]
-                ]
-                > 10
-            ).any(axis=None):
-                # oh and reverse complement, in a list with its misannealing pair
-                self.misanneals_list += [
-                    [[oh1.overhang, oh1.overhang_rc], [oh2.overhang, oh2.overhang_rc]]
-                ]
+    # Changes of the set. Each updates the inspection in O(N) instead of inspecting
+    # the new set from scratch.
+
+    def add_overhang(self, overhang):
+        """Add an overhang to the end of the set, and update the inspection.
+
+        Returns the updated `InspectionResult` (see `inspect_overhangs()`). The plot in
+        `ax` is not updated.
+
+
+        **Parameters**
+
+        **overhang**
+        > Overhang string (`str`).
+        """
+        new_overhang = self._prepare_change(overhang)
+        is_weak, is_self_misannealing, is_misannealing, distances = (
+            self._evaluate_new_overhang(new_overhang)
+        )
+        self.overhangs.append(new_overhang)
+        self.overhang_input.append(overhang)
+        self._counts[overhang] += 1
+        self._is_weak = np.append(self._is_weak, is_weak)
+        self._is_self_misannealing = np.append(
+            self._is_self_misannealing, is_self_misannealing
+        )
+        self._is_misannealing = _add_row_and_column(
+            self._is_misannealing, *is_misannealing
+        )
+        if self._distances is not None:
+            self._distances = _add_row_and_column(self._distances, distances)
+        if self.fidelity_score is not None:
+            self.fidelity_score.add(overhang)
+        return self._update_after_change()
+
+    def remove_overhang(self, overhang):
+        """Remove an overhang from the set (its first occurrence), and update the
+        inspection.
+
+        Returns the updated `InspectionResult` (see `inspect_overhangs()`). Raises
+        `ValueError` if the overhang is not in the set. The plot in `ax` is not
+        updated.
+
+
+        **Parameters**
+
+        **overhang**
+        > Overhang string (`str`).
+        """
+        self._prepare_change()
+        position = self.overhang_input.index(overhang)
+        del self.overhangs[position]
+        del self.overhang_input[position]
+        self._counts[overhang] -= 1
+        if self._counts[overhang] == 0:
+            del self._counts[overhang]
+        self._is_weak = np.delete(self._is_weak, position)
+        self._is_self_misannealing = np.delete(self._is_self_misannealing, position)
+        self._is_misannealing = _delete_row_and_column(self._is_misannealing, position)
+        if self._distances is not None:
+            self._distances = _delete_row_and_column(self._distances, position)
+        if self.fidelity_score is not None:
+            self.fidelity_score.remove(position)
+        return self._update_after_change()
+
+    def replace_overhang(self, overhang, new_overhang):
+        """Replace an overhang of the set (its first occurrence) with a new one, at
+        the same position, and update the inspection.
+
+        Returns the updated `InspectionResult` (see `inspect_overhangs()`). Raises
+        `ValueError` if the overhang is not in the set. The plot in `ax` is not
+        updated.
+
+
+        **Parameters**
+
+        **overhang**
+        > Overhang string of the set (`str`).
+
+        **new_overhang**
+        > Overhang string replacing it (`str`).
+        """
+        new_overhang_instance = self._prepare_change(new_overhang)
+        position = self.overhang_input.index(overhang)
+        is_weak, is_self_misannealing, is_misannealing, distances = (
+            self._evaluate_new_overhang(new_overhang_instance)
+        )
+        self.overhangs[position] = new_overhang_instance
+        self.overhang_input[position] = new_overhang
+        self._counts[overhang] -= 1
+        if self._counts[overhang] == 0:
+            del self._counts[overhang]
+        self._counts[new_overhang] += 1
+        self._is_weak[position] = is_weak
+        self._is_self_misannealing[position] = is_self_misannealing
+        misannealing_row, misannealing_column = is_misannealing
+        misannealing_row[position] = False  # the diagonal is not used
+        misannealing_column[position] = False
+        self._is_misannealing[position, :] = misannealing_row
+        self._is_misannealing[:, position] = misannealing_column
+        if self._distances is not None:
+            distances[position] = 0
+            self._distances[position, :] = distances
+            self._distances[:, position] = distances
+        if self.fidelity_score is not None:
+            self.fidelity_score.replace(position, new_overhang)
+        return self._update_after_change()
+
+    def _prepare_change(self, new_overhang=None):
+        """Inspect the set if it was not, and return the `Overhang` of the new
+        overhang (`str`) if any."""
+        if not hasattr(self, "inspection"):
+            self.inspect_overhangs(make_plot=False)
+        if new_overhang is None:
+            return None
+        if len(new_overhang) != self.overhang_length:
+            raise ValueError(
+                "The overhangs of the set have length %d, not %d: %s"
+                % (self.overhang_length, len(new_overhang), new_overhang)
+            )
+        return Overhang(new_overhang)
+
+    def _evaluate_new_overhang(self, new_overhang):
+        """Return the annealing results of a new overhang (weak, self-misannealing),
+        its misannealing with the overhangs of the set and its distances to them. The
+        misannealing is a (row, column) pair, as the annealing matrix may not be
+        symmetric. The distances are None if they are not used."""
+        if self.has_annealing_data:
+            matrix = get_annealing_matrix(self.enzyme)
+            new_overhangs = [new_overhang.overhang]
+            new_overhangs_rc = [new_overhang.overhang_rc]
+            is_weak = matrix.find_weak_anneals(
+                new_overhangs, new_overhangs_rc, cutoff=400
+            )[0]
+            is_self_misannealing = matrix.find_self_misanneals(
+                new_overhangs, new_overhangs_rc
+            )[0]
+            overhangs = [oh.overhang for oh in self.overhangs]
+            overhangs_rc = [oh.overhang_rc for oh in self.overhangs]
+            is_misannealing = (
+                matrix.get_misannealing_matrix(
+                    new_overhangs, new_overhangs_rc, overhangs, overhangs_rc, cutoff=10
+                )[0],
+                matrix.get_misannealing_matrix(
+                    overhangs, overhangs_rc, new_overhangs, new_overhangs_rc, cutoff=10
+                )[:, 0],
+            )
+        else:
+            is_weak = is_self_misannealing = False
+            is_misannealing = (
+                np.zeros(len(self.overhangs), dtype=bool),
+                np.zeros(len(self.overhangs), dtype=bool),
+            )
+        distances = None
+        if self._distances is not None and self.overhangs:
+            distances = SimilarityIndex(self.overhangs).get_distances([new_overhang])[0]
+        elif self._distances is not None:
+            distances = np.zeros(0, dtype=self._distances.dtype)
+        return is_weak, is_self_misannealing, is_misannealing, distances
+
+    def _update_after_change(self):
+        self.evaluate_sequences()
+        self.update_annealing_lists()
+        if self.fidelity_score is not None:
+            fidelity_score = self.fidelity_score
+            self.junction_fidelities = list(fidelity_score.get_junction_fidelities())
+            self.fidelity = fidelity_score.get_fidelity()
+        self.update_inspection()
+        return self.inspection
+
+    # Text descriptions of the issues, used in the reports. They are empty strings if
+    # there is no issue.
+
+    @property
+    def palindromic_text(self):
+        if not self.palindromic_oh:
+            return ""
+        return "Palindromic overhang(s): " + "; ".join(self.palindromic_oh)
+
+    @property
+    def rc_error_text(self):
+        if not self.rc_oh:
+            return ""
+        return "Nonpalindromic overhang(s) with reverse complement: " + "; ".join(
+            self.rc_oh
+        )
+
+    @property
+    def set_size_text(self):
+        if 0 < self.max_set_size < len(self.overhang_input):
+            return (
+                "Assembly fidelity significantly decreases when using "
+                + "more than %d overhangs." % self.max_set_size
+            )
+        return ""
+
+    @property
+    def similar_overhangs(self):
+        return self.get_similar_overhangs_text()
+
+    @property
+    def overhangs_in_site_txt(self):
+        return "; ".join(
+            oh.overhang + "/" + oh.overhang_rc for oh in self.overhangs_in_site
+        )
+
+    @property
+    def weak_anneals(self):
+        return "; ".join(
+            oh_pair[0] + "/" + oh_pair[1] for oh_pair in self.weak_anneals_list
+        )
+
+    @property
+    def self_misanneals(self):
+        return "; ".join(
+            oh_pair[0] + "/" + oh_pair[1] for oh_pair in self.self_misanneals_list
+        )
+
+    @property
+    def misanneals(self):
         # Create a text from the 4 overhangs, for the report:
-        self.misanneals = [
+        return "; ".join(
             misannealing_pair[0][0]
             + "/"
             + misannealing_pair[0][1]
@@ -191,14 +459,92 @@ class OverhangSet:
             + "/"
             + misannealing_pair[1][1]
             for misannealing_pair in self.misanneals_list
-        ]
-        self.misanneals = "; ".join(self.misanneals)
-        if not self.misanneals == "":
-            self.has_warnings = True
+        )
+
+    @profiled("evaluate_fidelity")
+    def evaluate_fidelity(self):
+        """Evaluate the predicted ligation fidelity of the set and of each junction.
+
+        Sets `fidelity` (`float`), `junction_fidelities` (`list`, in the order of
+        `overhangs`) and `fidelity_score`, a `FidelityScore` that can be updated
+        incrementally. Used in `inspect_overhangs()`. Without annealing data, the
+        fidelity and the score are None, and there are no junction fidelities.
+        """
+        if not self.has_annealing_data:
+            self.fidelity_score = None
+            self.junction_fidelities = []
+            self.fidelity = None
+            return
+        matrix = get_annealing_matrix(self.enzyme)
+        self.fidelity_score = FidelityScore(matrix, self.overhang_input)
+        self.junction_fidelities = list(self.fidelity_score.get_junction_fidelities())
+        self.fidelity = self.fidelity_score.get_fidelity()
+
+    @profiled("evaluate_conditions")
+    def evaluate_conditions(self, conditions=None):
+        """Evaluate the annealing of the set in all temperatures and incubation times
+        at once, to compare assembly protocols.
+
+        Returns a dataframe with one row per (temperature, dataset) condition, and the
+        number of weak anneals, self-misanneals and misannealing pairs, and the
+        fidelity of the set (see `inspect_overhangs()`) as columns. Raises
+        `ValueError` if there is no annealing data for the enzyme.
+
+
+        **Parameters**
+
+        **conditions**
+        > The (temperature, dataset) keys of `tatapov.annealing_data` (`list`).
+        Defaults to the dataset of the enzyme and all datasets not made with a
+        specific enzyme, see `overhang.AnnealingMatrix.get_annealing_conditions()`.
+        """
+        self._check_annealing_data()
+        tensor = get_annealing_tensor(self.enzyme, conditions=conditions)
+        overhangs = [overhang.overhang for overhang in self.overhangs]
+        overhangs_rc = [overhang.overhang_rc for overhang in self.overhangs]
+        is_weak = tensor.find_weak_anneals(overhangs, overhangs_rc, cutoff=400)
+        is_self_misannealing = tensor.find_self_misanneals(overhangs, overhangs_rc)
+        return pandas.DataFrame(
+            {
+                "number_of_weak_anneals": is_weak.sum(axis=1),
+                "number_of_self_misanneals": is_self_misannealing.sum(axis=1),
+                "number_of_misanneals": tensor.count_misanneals(
+                    overhangs, overhangs_rc, cutoff=10
+                ),
+                "fidelity": tensor.get_fidelities(self.overhang_input),
+            },
+            index=pandas.MultiIndex.from_tuples(
+                tensor.conditions, names=["temperature", "dataset"]
+            ),
+        )
+
+    def _check_annealing_data(self):
+        if not has_annealing_data(self.enzyme, self.overhang_length):
+            raise ValueError(
+                "No annealing data for %s with %d-base overhangs."
+                % (self.enzyme, self.overhang_length)
+            )
+
+    def get_distances(self):
+        """Return the distances (see `get_overhang_distance()`) between all overhangs
+        of the set (`numpy.ndarray`), computed with a `SimilarityIndex`.
+
+        They are computed at first use, then updated with the changes of the set.
+        """
+        if self._distances is None:
+            self._distances = SimilarityIndex(self.overhangs).get_distances(
+                self.overhangs
+            )
+        return self._distances
 
     def find_similar_overhangs(self, difference_threshold=None):
         """Find overhangs that differ in fewer nucleotides than the threshold.
 
+        Returns a list of `((overhang, overhang_rc), (overhang, overhang_rc),
+        distance)` tuples, in the order of the set. See `get_similar_overhangs_text()`
+        for a description. To compare many overhangs with another list, use a
+        `SimilarityIndex`.
+
 
         **Parameters**
 
@@ -208,19 +554,35 @@ class OverhangSet:
         """
         if difference_threshold is None:
             difference_threshold = 0
-        similar_overhangs = ""
-        for oh1, oh2 in itertools.combinations(self.overhangs, 2):
-            if get_overhang_distance(oh1, oh2) < difference_threshold:
-                similar_overhangs += (
-                    oh1.overhang
-                    + "/"
-                    + oh1.overhang_rc
-                    + " ~ "
-                    + oh2.overhang
-                    + "/"
-                    + oh2.overhang_rc
-                    + " ;  "
-                )
+        distances = self.get_distances()
+        is_similar = np.triu(distances < difference_threshold, k=1)
+        return [
+            (
+                (self.overhangs[i].overhang, self.overhangs[i].overhang_rc),
+                (self.overhangs[j].overhang, self.overhangs[j].overhang_rc),
+                int(distances[i, j]),
+            )
+            for i, j in zip(*np.nonzero(is_similar))
+        ]
+
+    def get_similar_overhangs_text(self, difference_threshold=None):
+        """Return a description of the similar overhangs of the set, for the reports.
+
+        See `find_similar_overhangs()` for the parameters.
+        """
+        if difference_threshold is None:
+            difference_threshold = 0
+        similar_overhangs = "".join(
+            pair[0]
+            + "/"
+            + pair[1]
+            + " ~ "
+            + other_pair[0]
+            + "/"
+            + other_pair[1]
+            + " ;  "
+            for pair, other_pair, _ in self.find_similar_overhangs(difference_threshold)
+        )
 
         if similar_overhangs == "":
             similar_overhangs = (
@@ -235,11 +597,29 @@ class OverhangSet:
 
         return similar_overhangs
 
-    def find_perfect_subset(self):
-        """Find a better overhang set by removing bad overhang interactions.
+    @profiled("find_perfect_subset")
+    def find_perfect_subset(self, time_limit=10, make_plot=True, verbose=True):
+        """Find a better overhang set by removing bad interactions.
+
+        Bad interactions are weak anneals, self-misanneals and misanneals. The subset is
+        stored in `subset`, and `subset_is_optimal` tells whether it is proven to be
+        the largest possible. Raises `ValueError` if there is no annealing data for
+        the enzyme.
+
+
+        **Parameters**
+
+        **time_limit**
+        > Maximum time in seconds for the search of the largest subset without
+        misanneals (`float`). If reached, the best subset found so far is used.
 
-        Bad interactions are weak anneals, self-misanneals and misanneals.
+        **make_plot**
+        > If True, plot the Tatapov data of the subset in `ax` (`bool`).
+
+        **verbose**
+        > If True, print the subset (`bool`).
         """
+        self._check_annealing_data()
         self.inspect_overhangs(make_plot=False)
         # REMOVE WEAK
         oh_to_remove = [oh for oh_pair in self.weak_anneals_list for oh in oh_pair]
@@ -248,26 +628,119 @@ class OverhangSet:
         oh_to_remove = [oh for oh_pair in self.self_misanneals_list for oh in oh_pair]
         self.subset = set(self.subset) - set(oh_to_remove)
         # REMOVE MISANNEALING
-        compatible_overhangs = []
-        misanneals_for_loop = [pair[0] + pair[1] for pair in self.misanneals_list]
-        for oh1, oh2 in itertools.combinations(self.subset, 2):
-            add_oh = True
-            for pair in misanneals_for_loop:
-                if oh1 in pair and oh2 in pair:
-                    add_oh = False
-                    break
-            if add_oh:
-                compatible_overhangs += [(oh1, oh2)]
-        graph = networkx.Graph(compatible_overhangs)
-        max_clique, clique_size = networkx.max_weight_clique(graph, None)
-        self.subset = max_clique
-        print("Overhangs in subset: " + str(self.subset))
-        print("Number of overhangs in subset: " + str(clique_size))
+        # Overhangs in the same misannealing pair (in either orientation) are
+        # incompatible:
+        incompatible_overhangs = []
+        for pair in self.misanneals_list:
+            overhangs_in_pair = self.subset.intersection(pair[0] + pair[1])
+            incompatible_overhangs += itertools.combinations(overhangs_in_pair, 2)
+        self.subset, self.subset_is_optimal = find_compatible_subset(
+            sorted(self.subset), incompatible_overhangs, time_limit=time_limit
+        )
+        if verbose:
+            print("Overhangs in subset: " + str(self.subset))
+            print("Number of overhangs in subset: " + str(len(self.subset)))
         # Visualize subset:
-        figwidth = len(self.subset)
-        print(self.enzyme, "Tatapov plot (37 Celsius, 1 hour):")
-        data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[self.enzyme]]
-        subset = tatapov.data_subset(data, self.subset, add_reverse=True)
-        self.ax, _ = tatapov.plot_data(subset, figwidth=figwidth, plot_color="Reds")
-        self.ax.figure.tight_layout()
-        self.ax.plot()
+        if make_plot:
+            import tatapov  # imported at first use, as it loads all its datasets
+
+            figwidth = len(self.subset)
+            if verbose:
+                print(self.enzyme, "Tatapov plot (37 Celsius, 1 hour):")
+            matrix = get_annealing_matrix(self.enzyme)
+            subset = matrix.get_subset(self.subset)
+            with profile_stage("plot_data"):
+                self.ax, _ = tatapov.plot_data(
+                    subset, figwidth=figwidth, plot_color="Reds"
+                )
+            self.ax.figure.tight_layout()
+            self.ax.plot()
+
+
+def _add_row_and_column(array, row, column=None):
+    """Return a square array with a new last row and column (defaults to `row`)."""
+    if column is None:
+        column = row
+    size = len(array)
+    new_array = np.zeros((size + 1, size + 1), dtype=array.dtype)
+    new_array[:size, :size] = array
+    new_array[size, :size] = row
+    new_array[:size, size] = column
+    return new_array
+
+
+def _delete_row_and_column(array, position):
+    """Return a square array without the row and column at the position."""
+    return np.delete(np.delete(array, position, axis=0), position, axis=1)
+
+
+def evaluate_overhang_sets(overhang_sets, enzyme="Esp3I"):
+    """Evaluate many overhang sets at once, without printing.
+
+    All sets share one preloaded annealing matrix, and no `Overhang` or `OverhangSet`
+    instances are created. Returns a dataframe with one row per set.
+
+
+    **Parameters**
+
+    **overhang_sets**
+    > Lists of overhang strings (`list`), or a `dict` of set name: list of overhangs.
+
+    **enzyme**
+    > Enzyme used for assembly (`str`). See `overhang.tools.enzyme_tatapov_lookup`
+    for options.
+    """
+    if isinstance(overhang_sets, dict):
+        names = list(overhang_sets.keys())
+        overhang_sets = list(overhang_sets.values())
+    else:
+        overhang_sets = list(overhang_sets)
+        names = range(len(overhang_sets))
+    matrix = get_annealing_matrix(enzyme)
+    results = [evaluate_overhang_list(overhangs, matrix) for overhangs in overhang_sets]
+
+    return pandas.DataFrame(results, index=names)
+
+
+def evaluate_overhang_list(overhangs, matrix):
+    """Evaluate an overhang set given as a list of strings. Used in
+    `evaluate_overhang_sets()`.
+
+    Returns a `dict` of results.
+
+
+    **Parameters**
+
+    **overhangs**
+    > A list of overhang strings (`list`).
+
+    **matrix**
+    > The `AnnealingMatrix` of the enzyme.
+    """
+    overhang_pairs = [order_overhangs(overhang) for overhang in overhangs]
+    overhangs_fw = [pair[0] for pair in overhang_pairs]
+    overhangs_rc = [pair[1] for pair in overhang_pairs]
+    palindromic_oh = [oh for oh, oh_rc in overhang_pairs if oh == oh_rc]
+    nonpalindromic_oh = set(overhangs) - set(palindromic_oh)
+    nonpalindromic_oh_rc = {reverse_complement(oh) for oh in nonpalindromic_oh}
+
+    is_weak = matrix.find_weak_anneals(overhangs_fw, overhangs_rc, cutoff=400)
+    is_self_misannealing = matrix.find_self_misanneals(overhangs_fw, overhangs_rc)
+    misanneals = matrix.find_misanneals(overhangs_fw, overhangs_rc, cutoff=10)
+
+    return {
+        "number_of_overhangs": len(overhangs),
+        "has_duplicates": len(set(overhangs)) != len(overhangs),
+        "palindromic_overhangs": tuple(palindromic_oh),
+        "rc_overhangs": tuple(sorted(nonpalindromic_oh & nonpalindromic_oh_rc)),
+        "weak_anneals": tuple(
+            oh for oh, oh_is_weak in zip(overhangs_fw, is_weak) if oh_is_weak
+        ),
+        "self_misanneals": tuple(
+            oh
+            for oh, oh_is_self_misannealing in zip(overhangs_fw, is_self_misannealing)
+            if oh_is_self_misannealing
+        ),
+        "number_of_misanneals": len(misanneals),
+        "fidelity": matrix.get_fidelity(overhangs),
+    }
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas
+
+from .tools import (
+    decode_overhang,
+    encode_overhang,
+    get_code_bases,
+    reverse_complement_codes,
+)
+
+
+class OverhangTable:
+    """Class for the properties of all overhangs of a given length, as NumPy arrays.
+
+    This is a columnar alternative to a list of `Overhang` instances, for enumerating
+    long overhangs. Each overhang is stored once, as the lower of itself and its
+    reverse complement (like `Overhang.overhang`), in sorted order. Overhangs are
+    2-bit packed integers (see `overhang.tools.encode_overhang()`).
+
+
+    **Parameters**
+
+    **overhang_length**
+    > Length of overhangs (`int`).
+    """
+
+    def __init__(self, overhang_length=4):
+        self.overhang_length = overhang_length
+        all_codes = np.arange(4**overhang_length, dtype=np.int64)
+        all_codes_rc = reverse_complement_codes(all_codes, overhang_length)
+        is_canonical = all_codes <= all_codes_rc
+        self.codes = all_codes[is_canonical]
+        self.codes_rc = all_codes_rc[is_canonical]
+
+        bases = self.get_bases(self.codes)
+        bases_rc = self.get_bases(self.codes_rc)
+        self.is_palindromic = self.codes == self.codes_rc
+        self.gc_content = np.isin(bases, [1, 2]).mean(axis=1)  # C or G
+        # Same as `Overhang.count_max_repeat()`:
+        self.has_multimer = self.find_repeats(bases, repeat=3)
+        # Same as `Overhang.find_codons()`:
+        start = ["ATG"]
+        stop = ["TAA", "TAG", "TGA"]
+        self.has_start_codon = self.find_codons(bases, start)
+        self.has_stop_codon = self.find_codons(bases, stop)
+        self.has_rc_start_codon = self.find_codons(bases_rc, start)
+        self.has_rc_stop_codon = self.find_codons(bases_rc, stop)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get_bases(self, codes):
+        """Return the bases (0-3 for ACGT) of the codes, as a 2D array."""
+        return get_code_bases(codes, self.overhang_length)
+
+    @staticmethod
+    def find_repeats(bases, repeat=3):
+        """Return a boolean array marking sequences with a base repeated in a row."""
+        is_repeat = np.zeros(len(bases), dtype=bool)
+        for start in range(bases.shape[1] - repeat + 1):
+            window = bases[:, start : start + repeat]
+            is_repeat |= (window == window[:, [0]]).all(axis=1)
+        return is_repeat
+
+    @staticmethod
+    def find_codons(bases, codons):
+        """Return a boolean array marking sequences that contain any of the codons."""
+        codon_codes = [encode_overhang(codon) for codon in codons]
+        has_codon = np.zeros(len(bases), dtype=bool)
+        for start in range(bases.shape[1] - 2):
+            window_codes = (
+                16 * bases[:, start] + 4 * bases[:, start + 1] + bases[:, start + 2]
+            )
+            has_codon |= np.isin(window_codes, codon_codes)
+        return has_codon
+
+    def get_overhangs(self):
+        """Return the overhang sequences (`list`)."""
+        return [decode_overhang(int(code), self.overhang_length) for code in self.codes]
+
+    def get_overhangs_rc(self):
+        """Return the reverse complement sequences (`list`)."""
+        return [
+            decode_overhang(int(code), self.overhang_length) for code in self.codes_rc
+        ]
+
+    def to_dataframe(self):
+        """Return the table as a pandas dataframe indexed by overhang."""
+        return pandas.DataFrame(
+            {
+                "overhang_rc": self.get_overhangs_rc(),
+                "is_palindromic": self.is_palindromic,
+                "gc_content": self.gc_content,
+                "has_multimer": self.has_multimer,
+                "has_start_codon": self.has_start_codon,
+                "has_stop_codon": self.has_stop_codon,
+                "has_rc_start_codon": self.has_rc_start_codon,
+                "has_rc_stop_codon": self.has_rc_stop_codon,
+            },
+            index=pandas.Index(self.get_overhangs(), name="overhang"),
+        )
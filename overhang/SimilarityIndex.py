@@ -0,0 +1,83 @@
+import numpy as np
+
+from .Overhang import get_codes, get_overhang_length
+from .tools import get_hamming_distance_matrix
+
+
+class SimilarityIndex:
+    """Class for finding the overhangs of a (large) list that are similar to others.
+
+    The overhangs are stored as 2-bit packed integers (see
+    `overhang.tools.encode_overhang()`), with their reverse complements. The distance
+    of an overhang to each overhang of the index (see `get_overhang_distance()`) is
+    computed for all bases at once, with bit operations, and for the whole index at
+    once. Queries are processed in chunks, so that memory use stays bounded.
+
+
+    **Parameters**
+
+    **overhangs**
+    > List of `Overhang` instances (`list`), or an `OverhangTable`.
+
+    **chunk_size**
+    > Maximum number of distances computed at once (`int`).
+    """
+
+    def __init__(self, overhangs, chunk_size=2**22):
+        self.overhangs = overhangs
+        self.codes, self.codes_rc = get_codes(overhangs)
+        self.overhang_length = get_overhang_length(overhangs)
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self.codes)
+
+    def get_distances(self, overhangs):
+        """Return the distances of overhangs to all overhangs of the index, as an
+        array of shape `(len(overhangs), len(index))`.
+
+
+        **Parameters**
+
+        **overhangs**
+        > List of `Overhang` instances (`list`), or an `OverhangTable`.
+        """
+        codes, _ = get_codes(overhangs)
+        return self.get_code_distances(codes)
+
+    def get_code_distances(self, codes):
+        """Return the distances of encoded overhangs (`numpy.ndarray`) to all overhangs
+        of the index, see `get_distances()`."""
+        return np.minimum(
+            get_hamming_distance_matrix(codes, self.codes, self.overhang_length),
+            get_hamming_distance_matrix(codes, self.codes_rc, self.overhang_length),
+        )
+
+    def query(self, overhangs, max_distance=1):
+        """Return the overhangs of the index within a distance of each overhang,
+        considering reverse complements.
+
+        Returns a list of `(query_index, index, distance)` tuples, sorted by query
+        index, then index. The indices are positions in `overhangs` and in the index.
+
+
+        **Parameters**
+
+        **overhangs**
+        > Query overhangs: list of `Overhang` instances (`list`), or an
+        `OverhangTable`.
+
+        **max_distance**
+        > Maximum number of different bases (`int`).
+        """
+        codes, _ = get_codes(overhangs)
+        chunk = max(1, self.chunk_size // max(1, len(self)))
+        results = []
+        for start in range(0, len(codes), chunk):
+            distances = self.get_code_distances(codes[start : start + chunk])
+            rows, columns = np.nonzero(distances <= max_distance)
+            results += [
+                (int(start + row), int(column), int(distances[row, column]))
+                for row, column in zip(rows, columns)
+            ]
+        return results
@@ -1,13 +1,22 @@
-from .Overhang import Overhang, generate_all_overhangs
-from .OverhangSet import OverhangSet
+from .Overhang import Overhang, generate_all_overhangs, iter_all_overhangs
+from .AnnealingMatrix import write_annealing_file, register_annealing_file
+from .FigureCache import FigureCache
+from .OverhangTable import OverhangTable
+from .KmerTable import KmerTable, write_kmer_tables
+from .profiling import StageProfiler
+from .heatmap import make_heatmap_svg
+from .SimilarityIndex import SimilarityIndex
+from .OverhangSet import OverhangSet, evaluate_overhang_sets
 from .tools import (
     order_overhangs,
     generate_overhang_pairs,
+    iter_overhang_pairs,
     subset_data_for_overhang,
     plot_data,
     filter_overhangs,
 )
-from .reports import write_pdf_report, write_overhangset_report
+from .design import design_overhang_set
+from .reports import write_pdf_report, write_overhangset_report, write_compendiums
 
 DISASTANDARD = [
     "AATT",  # palindromic error
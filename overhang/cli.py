@@ -0,0 +1,227 @@
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+
+from .OverhangSet import OverhangSet
+
+
+def read_overhang_sets(lines, input_format="jsonl", enzyme="Esp3I"):
+    """Yield the overhang sets of an input file, one at a time.
+
+    Each set is a `dict` with `name`, `enzyme` and `overhangs` keys, plus the `line`
+    number in the input. Sets that cannot be read have an `error` key instead of
+    `overhangs`.
+
+
+    **Parameters**
+
+    **lines**
+    > Lines of the input, for example an open file (iterable of `str`).
+
+    **input_format**
+    > `"jsonl"` for one JSON object per line, or `"csv"` for a CSV file with a header
+    line (`str`). In both, the overhangs are a list or a string of overhangs separated
+    by spaces, commas or semicolons, and the name and enzyme are optional.
+
+    **enzyme**
+    > Enzyme of the sets that do not specify one (`str`).
+    """
+    if input_format == "csv":
+        reader = csv.DictReader(lines)
+        # Rows can span several lines (quoted fields): use the last line of each row.
+        records = ((reader.line_num, row) for row in reader)
+    elif input_format == "jsonl":
+        # Blank lines are skipped after numbering, to keep the input line numbers:
+        records = (
+            (line_number, line)
+            for line_number, line in enumerate(lines, 1)
+            if line.strip()
+        )
+    else:
+        raise ValueError("Unknown input format: %s" % input_format)
+
+    for line_number, record in records:
+        if input_format == "jsonl":
+            try:
+                record = json.loads(record)
+            except ValueError as error:
+                yield {"line": line_number, "error": "Cannot read the set: %r" % error}
+                continue
+        yield read_overhang_set(record, line_number=line_number, enzyme=enzyme)
+
+
+def read_overhang_set(record, line_number=1, enzyme="Esp3I"):
+    """Return an overhang set in the format of `read_overhang_sets()`.
+
+
+    **Parameters**
+
+    **record**
+    > A `dict` with an `overhangs` key, and optional `name` and `enzyme` keys. The
+    overhangs are a list or a string of overhangs separated by spaces, commas or
+    semicolons.
+
+    **line_number**
+    > Line of the set in the input (`int`), also used in the default name.
+
+    **enzyme**
+    > Enzyme of the set if the record does not specify one (`str`).
+    """
+    overhang_set = {"line": line_number}
+    try:
+        overhangs = record["overhangs"]
+        if isinstance(overhangs, str):
+            overhangs = re.split(r"[\s,;]+", overhangs.strip())
+        overhang_set["name"] = record.get("name") or "Set %d" % line_number
+        overhang_set["enzyme"] = record.get("enzyme") or enzyme
+        overhangs = [overhang.upper() for overhang in overhangs]
+    except (KeyError, TypeError, AttributeError, ValueError) as error:
+        overhang_set["error"] = "Cannot read the set: %r" % error
+        return overhang_set
+    for key in ["name", "enzyme"]:
+        if not isinstance(overhang_set[key], str):
+            overhang_set["error"] = "Cannot read the set: %s is not a string" % key
+            return overhang_set
+    for overhang in overhangs:
+        if not overhang or not set(overhang) <= set("ACGT"):
+            overhang_set["error"] = (
+                "Cannot read the set: %r is not an ACGT sequence" % overhang
+            )
+            return overhang_set
+    if len(set(map(len, overhangs))) > 1:
+        overhang_set["error"] = "Cannot read the set: overhangs of different lengths"
+        return overhang_set
+    overhang_set["overhangs"] = overhangs
+    return overhang_set
+
+
+def validate_overhang_set(overhang_set):
+    """Return the validation results of a set from `read_overhang_sets()`.
+
+    The results are those of `OverhangSet.inspect_overhangs()` (see
+    `InspectionResult.to_dict()`), with the input line of the set. If the set cannot
+    be validated, they have an `error` key instead: no exception is raised.
+
+
+    **Parameters**
+
+    **overhang_set**
+    > A `dict` with `name`, `enzyme` and `overhangs` keys.
+    """
+    result = {
+        key: overhang_set[key]
+        for key in ["line", "name", "enzyme", "error"]
+        if key in overhang_set
+    }
+    if "error" in result:
+        return result
+    try:
+        overhangset = OverhangSet(
+            overhang_set["overhangs"],
+            enzyme=overhang_set["enzyme"],
+            name=overhang_set["name"],
+        )
+        inspection = overhangset.inspect_overhangs(make_plot=False)
+    except Exception as error:  # reported, so that the other sets are validated
+        result["error"] = "Cannot validate the set: %r" % error
+        return result
+    result.update(inspection.to_dict())
+    return result
+
+
+def validate_overhang_sets(overhang_sets, workers=1, batch_size=1000):
+    """Yield the validation results of overhang sets, in the order of the sets.
+
+    The sets are read in batches, so that memory use does not depend on the number of
+    sets.
+
+
+    **Parameters**
+
+    **overhang_sets**
+    > Sets from `read_overhang_sets()` (iterable of `dict`).
+
+    **workers**
+    > Number of processes validating the sets (`int`).
+
+    **batch_size**
+    > Number of sets read at once when using several processes (`int`).
+    """
+    if workers <= 1:
+        for overhang_set in overhang_sets:
+            yield validate_overhang_set(overhang_set)
+        return
+    overhang_sets = iter(overhang_sets)
+    chunksize = max(1, batch_size // (4 * workers))
+    with multiprocessing.Pool(workers) as pool:
+        while True:
+            batch = list(itertools.islice(overhang_sets, batch_size))
+            if not batch:
+                break
+            yield from pool.imap(validate_overhang_set, batch, chunksize=chunksize)
+
+
+def main(argv=None):
+    """Validate overhang sets from a CSV or JSONL file, and write JSONL results.
+
+    See `overhang-validate --help` for the options.
+    """
+    parser = argparse.ArgumentParser(
+        prog="overhang-validate",
+        description="Validate overhang sets (one per line) and write the results as "
+        "JSON lines.",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="CSV or JSONL file (default: stdin)"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="JSONL file (default: stdout)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["csv", "jsonl"],
+        help="input format (default: from the file extension, or jsonl)",
+    )
+    parser.add_argument(
+        "-e", "--enzyme", default="Esp3I", help="enzyme of sets without one"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="number of processes"
+    )
+    args = parser.parse_args(argv)
+
+    input_format = args.format
+    if input_format is None:
+        is_csv = os.path.splitext(args.input)[1].lower() == ".csv"
+        input_format = "csv" if is_csv else "jsonl"
+
+    if args.input == "-":
+        input_file = sys.stdin
+    else:
+        input_file = open(args.input, newline="")
+    if args.output == "-":
+        output_file = sys.stdout
+    else:
+        output_file = open(args.output, "w")
+
+    try:
+        overhang_sets = read_overhang_sets(
+            input_file, input_format=input_format, enzyme=args.enzyme
+        )
+        for result in validate_overhang_sets(overhang_sets, workers=args.workers):
+            output_file.write(json.dumps(result) + "\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+
+
+if __name__ == "__main__":
+    main()
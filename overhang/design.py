@@ -0,0 +1,125 @@
+import math
+import random
+
+from .AnnealingMatrix import FidelityScore, get_annealing_matrix
+from .Overhang import iter_all_overhangs
+from .OverhangSet import OverhangSet
+from .tools import filter_overhangs, order_overhangs
+
+
+def design_overhang_set(
+    number_of_overhangs,
+    enzyme="Esp3I",
+    required=None,
+    forbidden=None,
+    iterations=20000,
+    initial_temperature=0.5,
+    final_temperature=0.001,
+    seed=123,
+    name="Designed set",
+):
+    """Design a set of overhangs with the highest predicted ligation fidelity.
+
+    Candidates are all overhangs that pass `filter_overhangs()` and are not
+    palindromic. A greedy set is improved by simulated annealing: each move replaces
+    one overhang, and is scored incrementally with a `FidelityScore`. Returns an
+    `OverhangSet`, with the fidelity stored in its `fidelity` attribute.
+
+
+    **Parameters**
+
+    **number_of_overhangs**
+    > Size of the set, including the required overhangs (`int`).
+
+    **enzyme**
+    > Enzyme used for assembly (`str`). See `overhang.tools.enzyme_tatapov_lookup`
+    for options.
+
+    **required**
+    > Overhangs that must be in the set (`list`). They must not be palindromic,
+    forbidden, or in the list twice in either orientation (`ValueError`).
+
+    **forbidden**
+    > Overhangs that must not be in the set, in either orientation (`list`).
+
+    **iterations**
+    > Number of simulated annealing moves (`int`).
+
+    **initial_temperature**
+    > Initial temperature of the annealing, for the log of the fidelity (`float`).
+
+    **final_temperature**
+    > Final temperature of the annealing (`float`).
+
+    **seed**
+    > Seed of the random number generator (`int`).
+
+    **name**
+    > Name of the returned set (`str`).
+    """
+    required = list(required or [])
+    forbidden = {order_overhangs(overhang)[0] for overhang in forbidden or []}
+    required_pairs = set()
+    for overhang in required:
+        pair = order_overhangs(overhang)
+        if pair[0] == pair[1]:
+            raise ValueError("Required overhang %s is palindromic." % overhang)
+        if pair[0] in required_pairs:
+            raise ValueError(
+                "Required overhang %s is in the set twice, in either orientation."
+                % overhang
+            )
+        if pair[0] in forbidden:
+            raise ValueError("Required overhang %s is forbidden." % overhang)
+        required_pairs.add(pair[0])
+    excluded = required_pairs | forbidden
+    candidates = [
+        overhang.overhang
+        for overhang in filter_overhangs(iter_all_overhangs(), enzyme=enzyme)
+        if not overhang.is_palindromic and overhang.overhang not in excluded
+    ]
+    number_to_design = number_of_overhangs - len(required)
+    if number_to_design < 0:
+        raise ValueError("More required overhangs than the size of the set.")
+    if number_to_design > len(candidates):
+        raise ValueError(
+            "Only %d candidate overhangs for %d places in the set."
+            % (len(candidates), number_to_design)
+        )
+
+    # Greedy start: add the candidate that keeps the fidelity highest.
+    score = FidelityScore(get_annealing_matrix(enzyme), required)
+    unused = list(candidates)
+    for _ in range(number_to_design):
+        overhang = max(unused, key=score.get_addition_fidelity)
+        score.add(overhang)
+        unused.remove(overhang)
+
+    # Simulated annealing on the designed (not required) positions:
+    rng = random.Random(seed)
+    fidelity = score.get_fidelity()
+    best_overhangs, best_fidelity = list(score.overhangs), fidelity
+    if number_to_design > 0 and unused:
+        cooling = (final_temperature / initial_temperature) ** (1 / max(1, iterations))
+        temperature = initial_temperature
+        for _ in range(iterations):
+            position = rng.randrange(len(required), number_of_overhangs)
+            new_index = rng.randrange(len(unused))
+            new_fidelity = score.get_replacement_fidelity(position, unused[new_index])
+            if new_fidelity >= fidelity or (
+                new_fidelity > 0
+                and fidelity > 0
+                and rng.random()
+                < math.exp((math.log(new_fidelity) - math.log(fidelity)) / temperature)
+            ):
+                old_overhang = score.overhangs[position]
+                score.replace(position, unused[new_index])
+                unused[new_index] = old_overhang
+                fidelity = new_fidelity
+                if fidelity > best_fidelity:
+                    best_overhangs, best_fidelity = list(score.overhangs), fidelity
+            temperature *= cooling
+
+    overhangset = OverhangSet(best_overhangs, enzyme=enzyme, name=name)
+    overhangset.fidelity = best_fidelity
+    return overhangset
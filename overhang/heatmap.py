@@ -0,0 +1,192 @@
+import base64
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from .profiling import profiled
+
+CELL_SIZE = 10  # side of a heatmap cell, in points
+FONT_SIZE = 7
+CHARACTER_WIDTH = 0.62 * FONT_SIZE  # approximate, for the label margins
+GRID_COLOR = "#1f77b4"  # as in the Tatapov plots
+
+_colormaps = {}  # colormap name: list of 256 hex colors
+
+
+def get_colormap_colors(plot_color="Reds"):
+    """Return the 256 colors of a Matplotlib colormap, as hex strings (`list`).
+
+    Only the colormap module of Matplotlib is used, no figure is made.
+
+
+    **Parameters**
+
+    **plot_color**
+    > A Matplotlib colormap name (`str`).
+    """
+    if plot_color not in _colormaps:
+        import matplotlib  # imported at first use, as it is slow to load
+
+        colormap = matplotlib.colormaps[plot_color].resampled(256)
+        rgb = np.round(colormap(np.arange(256))[:, :3] * 255).astype(int)
+        _colormaps[plot_color] = ["#%02x%02x%02x" % tuple(color) for color in rgb]
+    return _colormaps[plot_color]
+
+
+def get_color_indices(values, number_of_colors=256):
+    """Return the colormap indices of the log10 values of a heatmap, as in
+    Matplotlib's `imshow()` (linear scale from the minimum to the maximum value).
+
+
+    **Parameters**
+
+    **values**
+    > 2D array of values (`numpy.ndarray`).
+
+    **number_of_colors**
+    > Number of colors in the colormap (`int`).
+    """
+    vmin, vmax = values.min(), values.max()
+    if vmax == vmin:
+        return np.zeros(values.shape, dtype=int)
+    scaled = (values - vmin) / (vmax - vmin) * number_of_colors
+    return np.clip(scaled.astype(int), 0, number_of_colors - 1)
+
+
+@profiled("make_heatmap_svg")
+def make_heatmap_svg(df, colorbar=True, figwidth=8, plot_color="Reds", grid=False):
+    """Return the SVG of a (restricted) Tatapov dataframe, without Matplotlib figures.
+
+    The heatmap matches `plot_data()`: log10 of the values (minimum 0.5) colored
+    with a colormap, rows and columns labelled with the overhangs, and an optional
+    colorbar. The same data always gives the same string.
+
+
+    **Parameters**
+
+    **df**
+    > One of the data sheets provided by tatapov, or a restriction using
+    ``data_subset``, for example from `AnnealingMatrix.get_overhang_subset()`.
+
+    **colorbar**
+    > If True, the figure will have a colorbar.
+
+    **figwidth**
+    > Width of the figure, in inches. The figure is scaled to this width.
+
+    **plot_color**
+    > A Matplotlib colormap name.
+
+    **grid**
+    > If True, dashed lines cross the cells, as in `tatapov.plot_data()`.
+    """
+    values = np.log10(np.maximum(0.5, np.asarray(df.values, dtype=float)))
+    n_rows, n_columns = values.shape
+    colors = get_colormap_colors(plot_color)
+    color_indices = get_color_indices(values, len(colors))
+    row_labels = [escape(str(label)) for label in df.index]
+    column_labels = [escape(str(label)) for label in df.columns]
+
+    longest_row_label = max([len(label) for label in row_labels] + [1])
+    longest_column_label = max([len(label) for label in column_labels] + [1])
+    left = longest_row_label * CHARACTER_WIDTH + 6
+    top = longest_column_label * CHARACTER_WIDTH + 6
+    grid_width = n_columns * CELL_SIZE
+    grid_height = n_rows * CELL_SIZE
+    width = left + grid_width + 4
+    height = top + grid_height + 4
+
+    elements = []
+    for i, (label, row_indices) in enumerate(zip(row_labels, color_indices)):
+        y = top + i * CELL_SIZE
+        elements.append(
+            '<text x="%.2f" y="%.2f" text-anchor="end" dominant-baseline="middle">'
+            "%s</text>" % (left - 3, y + CELL_SIZE / 2, label)
+        )
+        for j, color_index in enumerate(row_indices):
+            elements.append(
+                '<rect x="%.2f" y="%.2f" width="%d" height="%d" fill="%s"/>'
+                % (left + j * CELL_SIZE, y, CELL_SIZE, CELL_SIZE, colors[color_index])
+            )
+    for j, label in enumerate(column_labels):
+        x = left + (j + 0.5) * CELL_SIZE
+        elements.append(
+            '<text transform="translate(%.2f,%.2f) rotate(-90)" '
+            'dominant-baseline="middle">%s</text>' % (x, top - 3, label)
+        )
+    if grid:
+        line = (
+            '<line x1="%.2f" y1="%.2f" x2="%.2f" y2="%.2f" stroke="%s" '
+            'stroke-opacity="0.3" stroke-dasharray="3,1.5" stroke-width="0.8"/>'
+        )
+        for i in range(n_rows):
+            y = top + (i + 0.5) * CELL_SIZE
+            elements.append(line % (left, y, left + grid_width, y, GRID_COLOR))
+        for j in range(n_columns):
+            x = left + (j + 0.5) * CELL_SIZE
+            elements.append(line % (x, top, x, top + grid_height, GRID_COLOR))
+
+    if colorbar:
+        bar_x = width + CELL_SIZE
+        bar_height = max(grid_height, 5 * CELL_SIZE)
+        elements.append(
+            '<defs><linearGradient id="colorbar" x1="0" y1="1" x2="0" y2="0">%s'
+            "</linearGradient></defs>"
+            % "".join(
+                '<stop offset="%.2f" stop-color="%s"/>' % (i / 255, colors[i])
+                for i in range(0, 256, 15)
+            )
+        )
+        elements.append(
+            '<rect x="%.2f" y="%.2f" width="%d" height="%d" fill="url(#colorbar)" '
+            'stroke="black" stroke-width="0.5"/>' % (bar_x, top, CELL_SIZE, bar_height)
+        )
+        vmin, vmax = values.min(), values.max()
+        for tick in range(int(np.ceil(vmin)), int(np.floor(vmax)) + 1):
+            if vmax == vmin:
+                y = top + bar_height
+            else:
+                y = top + bar_height * (1 - (tick - vmin) / (vmax - vmin))
+            elements.append(
+                '<text x="%.2f" y="%.2f" dominant-baseline="middle">%d</text>'
+                % (bar_x + CELL_SIZE + 3, y, tick)
+            )
+        label_x = bar_x + CELL_SIZE + 4 * CHARACTER_WIDTH + 6
+        elements.append(
+            '<text transform="translate(%.2f,%.2f) rotate(-90)" text-anchor="middle" '
+            'dominant-baseline="middle">log10( occurrences )</text>'
+            % (label_x, top + bar_height / 2)
+        )
+        width = label_x + FONT_SIZE
+        height = max(height, top + bar_height + 4)
+
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%.2fin" height="%.2fin" '
+        'viewBox="0 0 %.2f %.2f" font-family="DejaVu Sans, sans-serif" '
+        'font-size="%d">%s</svg>'
+        % (
+            figwidth,
+            figwidth * height / width,
+            width,
+            height,
+            FONT_SIZE,
+            "".join(elements),
+        )
+    )
+
+
+def heatmap_figure_data(df, **kwargs):
+    """Return the SVG of `make_heatmap_svg()` as an HTML-embeddable string, like
+    `pdf_reports.tools.figure_data()`.
+
+
+    **Parameters**
+
+    **df**
+    > Tatapov dataframe, see `make_heatmap_svg()`.
+
+    **kwargs**
+    > Parameters of `make_heatmap_svg()`.
+    """
+    svg = make_heatmap_svg(df, **kwargs)
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
@@ -0,0 +1,116 @@
+import contextlib
+import functools
+import time
+
+_profilers = []  # active `StageProfiler` instances
+_no_stage = contextlib.nullcontext()
+
+
+class StageProfiler:
+    """Context manager recording the time spent in the stages of the package.
+
+    Stages are the functions decorated with `profiled()` (for example
+    `evaluate_annealing`, `find_perfect_subset`, `plot_data`, `end_pug_to_html`) and
+    the blocks in `profile_stage()` (for example `figure_data`, `write_report`).
+    Times include the stages called within a stage. Stages run in other processes
+    (see `workers` in the report writers) are not recorded. When no profiler is
+    active, stages only cost a check of `_profilers`.
+
+    Example:
+
+    ```python
+    with StageProfiler() as profiler:
+        overhang.write_overhangset_report("report.pdf", overhangset)
+    profiler.get_summary()
+    ```
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.times = {}
+
+    def __enter__(self):
+        _profilers.append(self)
+        return self
+
+    def __exit__(self, *exception_info):
+        _profilers.remove(self)
+
+    def record(self, stage, duration):
+        """Add a run of a stage, lasting `duration` seconds."""
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        self.times[stage] = self.times.get(stage, 0) + duration
+
+    def get_summary(self):
+        """Return a `dict` of stage: `{"count", "total_time", "mean_time"}`, with the
+        longest stages first. Times are in seconds."""
+        stages = sorted(self.times, key=self.times.get, reverse=True)
+        return {
+            stage: {
+                "count": self.counts[stage],
+                "total_time": self.times[stage],
+                "mean_time": self.times[stage] / self.counts[stage],
+            }
+            for stage in stages
+        }
+
+    def to_dataframe(self):
+        """Return the summary as a pandas dataframe, with one row per stage."""
+        import pandas
+
+        dataframe = pandas.DataFrame.from_dict(self.get_summary(), orient="index")
+        dataframe.index.name = "stage"
+        return dataframe
+
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exception_info):
+        duration = time.perf_counter() - self.start
+        for profiler in _profilers:
+            profiler.record(self.stage, duration)
+
+
+def profile_stage(stage):
+    """Return a context manager that records its block as a stage, in the active
+    `StageProfiler` instances.
+
+
+    **Parameters**
+
+    **stage**
+    > Name of the stage (`str`).
+    """
+    if not _profilers:
+        return _no_stage
+    return _StageTimer(stage)
+
+
+def profiled(stage):
+    """Decorator recording the calls of a function as a stage, see `profile_stage()`.
+
+
+    **Parameters**
+
+    **stage**
+    > Name of the stage (`str`).
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def profiled_function(*args, **kwargs):
+            if not _profilers:
+                return function(*args, **kwargs)
+            with _StageTimer(stage):
+                return function(*args, **kwargs)
+
+        return profiled_function
+
+    return decorator
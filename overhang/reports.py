@@ -1,20 +1,16 @@
+import importlib.metadata
+import itertools
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-# import matplotlib.pyplot as plt
-# import pandas
-import tatapov
+# matplotlib and pdf_reports are imported at first use, as they are slow to load.
 
-from pdf_reports import (
-    add_css_class,
-    dataframe_to_html,
-    pug_to_html,
-    style_table_rows,
-    write_report,
-)
-
-import pdf_reports.tools as pdf_tools
-
-from .tools import subset_data_for_overhang, plot_data, enzyme_tatapov_lookup
+from .AnnealingMatrix import get_annealing_matrix, has_annealing_data
+from .heatmap import heatmap_figure_data
+from .Overhang import generate_all_overhangs
+from .profiling import profile_stage, profiled
+from .tools import plot_data, enzyme_tatapov_lookup
 from .version import __version__
 
 THIS_PATH = os.path.dirname(os.path.realpath(__file__))
@@ -22,9 +18,16 @@ ASSETS_PATH = os.path.join(THIS_PATH, "report_assets")
 REPORT_TEMPLATE = os.path.join(ASSETS_PATH, "overhang_report.pug")
 SET_REPORT_TEMPLATE = os.path.join(ASSETS_PATH, "overhangset_report.pug")
 STYLESHEET = os.path.join(ASSETS_PATH, "report_style.css")
+# Parameters of the overhang plots, used as part of the figure cache key:
+FIGURE_PARAMETERS = {"colorbar": True, "figwidth": 8, "plot_color": "Reds"}
+OUTPUT_FORMATS = ["pdf", "html", "json"]
+FIGURE_BACKENDS = ["matplotlib", "svg"]
 
 
+@profiled("end_pug_to_html")
 def end_pug_to_html(template, **context):
+    from pdf_reports import pug_to_html
+
     defaults = {
         "sidebar_text": "EGF's compendium of overhangs (version %s)" % (__version__),
     }
@@ -34,25 +37,132 @@ def end_pug_to_html(template, **context):
     return pug_to_html(template, **context)
 
 
-def write_pdf_report(target, overhangs, enzyme="Esp3I"):
-    """Write an overhang compendium.
+def make_figure_data(subset_data, backend="matplotlib"):
+    """Plot a Tatapov subset and return it as an HTML-embeddable SVG string.
+
+    The SVG has no timestamp and uses fixed element IDs, so the same data always gives
+    the same string, in any process.
 
 
     **Parameters**
 
-    **target**
-    > Path for PDF file (`str`).
+    **subset_data**
+    > Tatapov dataframe of an overhang, see `subset_data_for_overhang()`.
+
+    **backend**
+    > `"matplotlib"` to plot with `plot_data()`, or `"svg"` to write the heatmap
+    directly with `make_heatmap_svg()`, which is much faster (`str`).
+    """
+    if backend == "svg":
+        return heatmap_figure_data(subset_data, **FIGURE_PARAMETERS)
+
+    import matplotlib
+    import pdf_reports.tools as pdf_tools
+
+    with matplotlib.rc_context({"svg.hashsalt": "overhang"}):
+        ax, _ = plot_data(subset_data, **FIGURE_PARAMETERS)
+        with profile_stage("figure_data"):
+            return pdf_tools.figure_data(ax, fmt="svg", metadata={"Date": None})
+
+
+@profiled("make_figures_data")
+def make_figures_data(subsets, workers=None, backend="matplotlib"):
+    """Return the SVG strings for a list of Tatapov subsets, see `make_figure_data()`.
+
+
+    **Parameters**
+
+    **subsets**
+    > List of Tatapov dataframes (`list`).
+
+    **workers**
+    > Number of processes used for plotting (`int`). If None or 1, the plots are made
+    in this process.
+
+    **backend**
+    > `"matplotlib"` or `"svg"`, see `make_figure_data()`.
+    """
+    check_figure_backend(backend)
+    if workers is None or workers <= 1:
+        return [make_figure_data(subset_data, backend) for subset_data in subsets]
+    chunksize = max(1, len(subsets) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        figures_data = executor.map(
+            make_figure_data, subsets, itertools.repeat(backend), chunksize=chunksize
+        )
+        return list(figures_data)
+
+
+def check_figure_backend(backend):
+    if backend not in FIGURE_BACKENDS:
+        raise ValueError(
+            "Unknown figure backend: %s. Options: %s"
+            % (backend, ", ".join(FIGURE_BACKENDS))
+        )
+
+
+def make_overhang_figures_data(
+    overhangs, enzyme, workers=None, figure_cache=None, backend="matplotlib"
+):
+    """Return the SVG strings of the overhangs' Tatapov plots.
+
+
+    **Parameters**
 
     **overhangs**
     > List of `Overhang` instances (`list`).
 
     **enzyme**
-    > Enzyme used for assembly (`str`). Options: `"BsaI"`, `"BsmBI"`, `"Esp3I"` or
-    `"BbsI"`.
+    > Enzyme used for assembly (`str`).
+
+    **workers**
+    > Number of processes used for plotting (`int`), see `make_figures_data()`.
+
+    **figure_cache**
+    > A `FigureCache` instance, or None. Cached figures are not plotted again.
+
+    **backend**
+    > `"matplotlib"` or `"svg"`, see `make_figure_data()`.
     """
-    # Prepare data for the plots:
-    data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[enzyme]]
+    matrix = get_annealing_matrix(enzyme)
+    if figure_cache is None:
+        subsets = [matrix.get_overhang_subset(overhang) for overhang in overhangs]
+        return make_figures_data(subsets, workers, backend)
+
+    keys = [
+        figure_cache.make_key(
+            overhang=overhang.overhang,
+            enzyme=enzyme,
+            temperature="37C",
+            dataset=enzyme_tatapov_lookup[enzyme],
+            tatapov_version=importlib.metadata.version("tatapov"),
+            data_hash=matrix.get_data_hash(),  # Tatapov or an annealing file
+            fmt="svg",
+            backend=backend,
+            **FIGURE_PARAMETERS,
+        )
+        for overhang in overhangs
+    ]
+    figures_data = [figure_cache.get(key) for key in keys]
+    missing = [i for i, figure_data in enumerate(figures_data) if figure_data is None]
+    subsets = [matrix.get_overhang_subset(overhangs[i]) for i in missing]
+    new_figures_data = make_figures_data(subsets, workers, backend)
+    for i, figure_data in zip(missing, new_figures_data):
+        figure_cache.set(keys[i], figure_data)
+        figures_data[i] = figure_data
+
+    return figures_data
+
+
+def set_report_attributes(overhangs):
+    """Set the attributes of the overhangs that are shown in the reports.
 
+
+    **Parameters**
+
+    **overhangs**
+    > List of `Overhang` instances (`list`).
+    """
     for overhang in overhangs:
         overhang.is_usable = overhang.is_good()
         overhang.gc_content_percent = int(overhang.gc_content * 100)  # to display as %
@@ -61,14 +171,193 @@ def write_pdf_report(target, overhangs, enzyme="Esp3I"):
         else:
             overhang.has_extreme_gc = False
 
-        # Prepare the plotting data:
-        subset_data = subset_data_for_overhang(data, overhang)
 
-        # Make the plot:
-        overhang.tatapov_figure, _ = plot_data(subset_data)
+def get_overhang_data(overhang):
+    """Return the report data of an overhang as a JSON-serializable `dict`.
+
+
+    **Parameters**
+
+    **overhang**
+    > An `Overhang` instance, with the attributes of `set_report_attributes()`.
+    """
+    return {
+        "overhang": overhang.overhang,
+        "overhang_rc": overhang.overhang_rc,
+        "is_usable": overhang.is_usable,
+        "is_palindromic": overhang.is_palindromic,
+        "gc_content": overhang.gc_content,
+        "has_extreme_gc": overhang.has_extreme_gc,
+        "has_start_codon": overhang.has_start_codon or overhang.has_rc_start_codon,
+        "has_stop_codon": overhang.has_stop_codon or overhang.has_rc_stop_codon,
+        "has_multimer": overhang.has_multimer,
+        "aa_patterns": list(overhang.aa_patterns),
+    }
+
+
+def write_html_report(html, target=None, title="Overhang report"):
+    """Write the HTML of a report as a standalone page, with its stylesheets inline.
+
+    The figures are already embedded in the HTML, as SVG data. Returns the page
+    (`str`) if `target` is None.
+
+
+    **Parameters**
+
+    **html**
+    > HTML of the report, from `end_pug_to_html()` (`str`).
+
+    **target**
+    > Path for HTML file (`str`), or None.
+
+    **title**
+    > Title of the page (`str`).
+    """
+    from pdf_reports.pdf_reports import STYLESHEET as PDF_REPORTS_STYLESHEET
+
+    styles = []
+    for stylesheet in [PDF_REPORTS_STYLESHEET, STYLESHEET]:
+        with open(stylesheet, "r") as f:
+            styles.append(f.read())
+    page = (
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n'
+        + "<title>%s</title>\n" % title
+        + "<style>\n%s\n</style>\n" % "\n".join(styles)
+        + "</head>\n<body>\n%s\n</body>\n</html>\n" % html
+    )
+    if target is None:
+        return page
+    with open(target, "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+def write_json_report(data, target=None):
+    """Write the data of a report as a JSON document.
+
+    Returns the document (`str`) if `target` is None.
+
+
+    **Parameters**
+
+    **data**
+    > JSON-serializable `dict`.
+
+    **target**
+    > Path for JSON file (`str`), or None.
+    """
+    document = json.dumps(data, indent=2)
+    if target is None:
+        return document
+    with open(target, "w") as f:
+        f.write(document)
+
+
+def check_output_format(output_format):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            "Unknown output format: %s. Options: %s"
+            % (output_format, ", ".join(OUTPUT_FORMATS))
+        )
+
+
+def check_annealing_data(enzyme, overhang_length):
+    if not has_annealing_data(enzyme, overhang_length=overhang_length):
+        raise ValueError(
+            "No annealing data to plot for %s and %d-base overhangs. Use "
+            'output_format="json" for a report without plots.'
+            % (enzyme, overhang_length)
+        )
+
+
+def write_pdf_report(
+    target,
+    overhangs,
+    enzyme="Esp3I",
+    workers=None,
+    figure_cache=None,
+    output_format="pdf",
+    figure_backend="matplotlib",
+):
+    """Write an overhang compendium.
 
-        # Convert the plot for PDF:
-        overhang.figure_data = pdf_tools.figure_data(overhang.tatapov_figure, fmt="svg")
+
+    **Parameters**
+
+    **target**
+    > Path for PDF file (`str`), or HTML or JSON file (see `output_format`). If None,
+    the report is returned instead (`bytes` for PDF, `str` otherwise).
+
+    **overhangs**
+    > List of `Overhang` instances (`list`).
+
+    **enzyme**
+    > Enzyme used for assembly (`str`). Options: `"BsaI"`, `"BsmBI"`, `"Esp3I"` or
+    `"BbsI"`.
+
+    **workers**
+    > Number of processes used for plotting the overhangs (`int`). The report is the
+    same as the one made in a single process (default).
+
+    **figure_cache**
+    > A `FigureCache` instance for reusing the overhang plots of earlier reports.
+
+    **output_format**
+    > `"pdf"` (default), `"html"` for the report as a web page (no PDF rendering), or
+    `"json"` for the data of the report (no plots, see `get_overhang_data()`).
+
+    **figure_backend**
+    > `"matplotlib"` (default) or `"svg"` for plots written directly as SVG, which is
+    much faster for large compendiums (`str`). See `make_figure_data()`.
+    """
+    check_output_format(output_format)
+    check_figure_backend(figure_backend)
+    set_report_attributes(overhangs)
+    if output_format == "json":
+        data = {
+            "version": __version__,
+            "enzyme": enzyme,
+            "number_of_overhangs": len(overhangs),
+            "overhangs": [get_overhang_data(overhang) for overhang in overhangs],
+        }
+        return write_json_report(data, target)
+
+    check_annealing_data(enzyme, len(overhangs[0].overhang) if overhangs else 4)
+    # Make the plots and convert them for PDF:
+    figures_data = make_overhang_figures_data(
+        overhangs,
+        enzyme,
+        workers=workers,
+        figure_cache=figure_cache,
+        backend=figure_backend,
+    )
+    return render_compendium(target, overhangs, enzyme, figures_data, output_format)
+
+
+def render_compendium(target, overhangs, enzyme, figures_data, output_format="pdf"):
+    """Write an overhang compendium with figures already made. Used in
+    `write_pdf_report()` and `write_compendiums()`.
+
+
+    **Parameters**
+
+    **target**
+    > Path for PDF or HTML file (`str`), or None, see `write_pdf_report()`.
+
+    **overhangs**
+    > List of `Overhang` instances, with the attributes of `set_report_attributes()`
+    (`list`).
+
+    **enzyme**
+    > Enzyme used for assembly (`str`).
+
+    **figures_data**
+    > The figure of each overhang, see `make_overhang_figures_data()` (`list`).
+
+    **output_format**
+    > `"pdf"` (default) or `"html"`.
+    """
+    for overhang, figure_data in zip(overhangs, figures_data):
+        overhang.figure_data = figure_data
 
     html = end_pug_to_html(
         REPORT_TEMPLATE,
@@ -76,54 +365,227 @@ def write_pdf_report(target, overhangs, enzyme="Esp3I"):
         number_of_overhangs=len(overhangs),
         enzyme=enzyme,
     )
-    write_report(html, target, extra_stylesheets=(STYLESHEET,))
+    if output_format == "html":
+        return write_html_report(html, target, title="Compendium of overhangs")
 
+    from pdf_reports import write_report
+
+    with profile_stage("write_report"):
+        return write_report(html, target, extra_stylesheets=(STYLESHEET,))
 
-def write_overhangset_report(target, overhangset):
-    """Write a report on an overhang set.
+
+@profiled("write_compendiums")
+def write_compendiums(
+    enzymes=None,
+    target_dir=".",
+    workers=None,
+    overhang_length=4,
+    figure_cache=None,
+    output_format="pdf",
+    figure_backend="matplotlib",
+):
+    """Write the overhang compendium of several enzymes (see `write_pdf_report()`).
+
+    The overhangs are enumerated and annotated once, for all enzymes. The figures of
+    each enzyme are made with `workers` processes, then the reports are rendered
+    concurrently, one process per enzyme. Returns the paths of the reports (`list`),
+    named `compendium_<enzyme>.<output_format>`.
 
 
     **Parameters**
 
-    **target**
-    > Path for PDF file (`str`).
+    **enzymes**
+    > Enzymes used for assembly (`list`). Defaults to all enzymes of
+    `overhang.tools.enzyme_tatapov_lookup`.
+
+    **target_dir**
+    > Directory of the reports (`str`).
+
+    **workers**
+    > Number of processes (`int`). If None or 1, everything is done in this process.
+
+    **overhang_length**
+    > Length of the overhangs (`int`).
+
+    **figure_cache**
+    > A `FigureCache` instance for reusing the overhang plots of earlier reports.
+
+    **output_format**
+    > `"pdf"` (default), `"html"` or `"json"`, see `write_pdf_report()`.
+
+    **figure_backend**
+    > `"matplotlib"` (default) or `"svg"`, see `make_figure_data()`.
+    """
+    if enzymes is None:
+        enzymes = list(enzyme_tatapov_lookup)
+    check_output_format(output_format)
+    check_figure_backend(figure_backend)
+    targets = [
+        os.path.join(target_dir, "compendium_%s.%s" % (enzyme, output_format))
+        for enzyme in enzymes
+    ]
+    os.makedirs(target_dir, exist_ok=True)
+    overhangs = generate_all_overhangs(overhang_length)
+    set_report_attributes(overhangs)
+    for overhang in overhangs:  # computed once, then shared by all reports
+        overhang.aa_patterns
+    if output_format == "json":
+        for target, enzyme in zip(targets, enzymes):
+            write_pdf_report(target, overhangs, enzyme=enzyme, output_format="json")
+        return targets
+
+    for enzyme in enzymes:
+        check_annealing_data(enzyme, overhang_length)
+    figures_data = [
+        make_overhang_figures_data(
+            overhangs,
+            enzyme,
+            workers=workers,
+            figure_cache=figure_cache,
+            backend=figure_backend,
+        )
+        for enzyme in enzymes
+    ]
+    arguments = [targets, [overhangs] * len(enzymes), enzymes, figures_data]
+    arguments.append([output_format] * len(enzymes))
+    if workers is None or workers <= 1:
+        list(map(render_compendium, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(enzymes))) as executor:
+            list(executor.map(render_compendium, *arguments))
+    return targets
+
+
+def make_overhangset_figure_data(overhangset, backend="matplotlib"):
+    """Inspect an overhang set, and return the HTML-embeddable SVG string of its
+    Tatapov plot. Used in `write_overhangset_report()`.
+
+
+    **Parameters**
 
     **overhangset**
     > An `OverhangSet` instance.
+
+    **backend**
+    > `"matplotlib"` or `"svg"`, see `make_figure_data()`.
     """
-    # Prepare data for the plots:
-    data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[overhangset.enzyme]]
+    if backend == "svg":
+        overhangset.inspect_overhangs(make_plot=False)
+        subset = get_annealing_matrix(overhangset.enzyme).get_subset(
+            overhangset.overhang_input
+        )
+        return heatmap_figure_data(subset, figwidth=7, plot_color="Reds", grid=True)
+
+    import pdf_reports.tools as pdf_tools
 
     overhangset.inspect_overhangs()
     height = overhangset.ax.figure.get_size_inches()[1]
     if height > 10:
         height = 10  # to fit on the page
-    overhangset.figure_data = pdf_tools.figure_data(
-        overhangset.ax, fmt="svg", size=[7, height]
-    )
+    with profile_stage("figure_data"):
+        return pdf_tools.figure_data(overhangset.ax, fmt="svg", size=[7, height])
+
+
+def write_overhangset_report(
+    target,
+    overhangset,
+    figure_cache=None,
+    output_format="pdf",
+    figure_backend="matplotlib",
+):
+    """Write a report on an overhang set.
 
-    for overhang in overhangset.overhangs:
-        overhang.is_usable = overhang.is_good()
-        overhang.gc_content_percent = int(overhang.gc_content * 100)  # to display as %
-        if overhang.gc_content < 0.25 or 0.75 < overhang.gc_content:  # none or all GC
-            overhang.has_extreme_gc = True
-        else:
-            overhang.has_extreme_gc = False
 
-        # Prepare the plotting data:
-        subset_data = subset_data_for_overhang(data, overhang)
+    **Parameters**
+
+    **target**
+    > Path for PDF file (`str`), or HTML or JSON file (see `output_format`). If None,
+    the report is returned instead (`bytes` for PDF, `str` otherwise).
 
-        # Make the plot:
-        overhang.tatapov_figure, _ = plot_data(subset_data)
+    **overhangset**
+    > An `OverhangSet` instance.
 
-        # Convert the plot for PDF:
-        overhang.figure_data = pdf_tools.figure_data(overhang.tatapov_figure, fmt="svg")
+    **figure_cache**
+    > A `FigureCache` instance for reusing the set and overhang plots of earlier
+    reports.
+
+    **output_format**
+    > `"pdf"` (default), `"html"` for the report as a web page (no PDF rendering), or
+    `"json"` for the data of the report: the inspection (see
+    `InspectionResult.to_dict()`) and the overhangs, without plots.
+
+    **figure_backend**
+    > `"matplotlib"` (default) or `"svg"` for plots written directly as SVG, which is
+    faster (`str`). See `make_figure_data()`.
+    """
+    check_output_format(output_format)
+    check_figure_backend(figure_backend)
+    if output_format == "json":
+        inspection = overhangset.inspect_overhangs(make_plot=False)
+        set_report_attributes(overhangset.overhangs)
+        data = {"version": __version__}
+        data.update(inspection.to_dict())
+        data["similar_overhangs"] = [
+            {"overhangs": [pair, other_pair], "distance": distance}
+            for pair, other_pair, distance in overhangset.find_similar_overhangs(
+                difference_threshold=2
+            )
+        ]
+        data["overhang_data"] = [
+            get_overhang_data(overhang) for overhang in overhangset.overhangs
+        ]
+        return write_json_report(data, target)
+
+    check_annealing_data(overhangset.enzyme, overhangset.overhang_length)
+    figure_data = None
+    if figure_cache is not None:
+        matrix = get_annealing_matrix(overhangset.enzyme)
+        key = figure_cache.make_key(
+            # In the order of the set, which is the order of the plot:
+            overhangset=overhangset.overhang_input,
+            enzyme=overhangset.enzyme,
+            temperature="37C",
+            dataset=enzyme_tatapov_lookup[overhangset.enzyme],
+            tatapov_version=importlib.metadata.version("tatapov"),
+            data_hash=matrix.get_data_hash(),
+            fmt="svg",
+            backend=figure_backend,
+            **FIGURE_PARAMETERS,
+        )
+        figure_data = figure_cache.get(key)
+    if figure_data is None:
+        figure_data = make_overhangset_figure_data(overhangset, figure_backend)
+        if figure_cache is not None:
+            figure_cache.set(key, figure_data)
+    else:
+        overhangset.inspect_overhangs(make_plot=False)
+    overhangset.figure_data = figure_data
+
+    set_report_attributes(overhangset.overhangs)
+
+    # Make the plots and convert them for PDF:
+    figures_data = make_overhang_figures_data(
+        overhangset.overhangs,
+        overhangset.enzyme,
+        figure_cache=figure_cache,
+        backend=figure_backend,
+    )
+    for overhang, figure_data in zip(overhangset.overhangs, figures_data):
+        overhang.figure_data = figure_data
 
     html = end_pug_to_html(
         SET_REPORT_TEMPLATE,
         overhangset=overhangset,
         number_of_overhangs=len(overhangset.overhangs),
         # Report overhang pairs with 1 (less than 2) difference:
-        similar_overhangs=overhangset.find_similar_overhangs(difference_threshold=2),
+        similar_overhangs=overhangset.get_similar_overhangs_text(
+            difference_threshold=2
+        ),
     )
-    write_report(html, target, extra_stylesheets=(STYLESHEET,))
+    if output_format == "html":
+        return write_html_report(html, target, title=overhangset.name)
+
+    from pdf_reports import write_report
+
+    with profile_stage("write_report"):
+        return write_report(html, target, extra_stylesheets=(STYLESHEET,))
@@ -0,0 +1,345 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .AnnealingMatrix import get_annealing_matrix
+from .EnzymeSiteIndex import get_enzyme_site_index
+from .OverhangSet import OverhangSet
+from .cli import read_overhang_set, validate_overhang_set
+from .tools import enzyme_tatapov_lookup
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+def warm_up(enzymes):
+    """Load the annealing matrices and the enzyme sites (used in `inspect_overhangs()`)
+    in this process."""
+    get_enzyme_site_index()
+    for enzyme in enzymes:
+        get_annealing_matrix(enzyme)
+
+
+def validate_overhang_set_batch(overhang_sets):
+    """Return the results of `validate_overhang_set()` for a list of sets. A set that
+    cannot be validated only has an `error` in its own result."""
+    return [validate_overhang_set(overhang_set) for overhang_set in overhang_sets]
+
+
+def find_overhang_subset(overhang_set, time_limit):
+    """Return the result of `OverhangSet.find_perfect_subset()` for a set, as a
+    `dict`."""
+    overhangset = OverhangSet(
+        overhang_set["overhangs"],
+        enzyme=overhang_set["enzyme"],
+        name=overhang_set["name"],
+    )
+    overhangset.find_perfect_subset(
+        time_limit=time_limit, make_plot=False, verbose=False
+    )
+    return {
+        "name": overhangset.name,
+        "enzyme": overhangset.enzyme,
+        "subset": overhangset.subset,
+        "is_optimal": overhangset.subset_is_optimal,
+    }
+
+
+def make_overhangset_report(overhang_set):
+    """Return the PDF report of a set (`bytes`), see `write_overhangset_report()`."""
+    from .reports import write_overhangset_report
+
+    overhangset = OverhangSet(
+        overhang_set["overhangs"],
+        enzyme=overhang_set["enzyme"],
+        name=overhang_set["name"],
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        target = os.path.join(directory, "report.pdf")
+        write_overhangset_report(target, overhangset)
+        with open(target, "rb") as f:
+            return f.read()
+
+
+class ValidationServer:
+    """Class for an HTTP server validating overhang sets, with asyncio.
+
+    The work is done in a pool of processes, which load the annealing matrices once
+    at startup (see also `register_annealing_file()`). Validation requests arriving
+    at the same time are sent to the pool in batches. Endpoints (all JSON, except the
+    PDF report):
+
+    - `GET /health`
+    - `POST /validate`: body `{"overhangs": [...], "enzyme": ..., "name": ...}`,
+      returns the results of `overhang-validate` for the set.
+    - `POST /subset`: same body, with an optional `time_limit` (up to
+      `max_time_limit`), returns the subset of `OverhangSet.find_perfect_subset()`.
+    - `POST /report`: same body, returns the PDF of `write_overhangset_report()`.
+
+
+    **Parameters**
+
+    **host**
+    > Address of the server (`str`). Defaults to localhost only.
+
+    **port**
+    > Port of the server (`int`). If 0, a free port is used (see `port` after
+    `start()`).
+
+    **workers**
+    > Number of processes (`int`). Defaults to the number of CPUs.
+
+    **batch_delay**
+    > Time in seconds to wait for more validation requests before sending a batch
+    (`float`).
+
+    **max_batch_size**
+    > Maximum number of sets in a batch (`int`).
+
+    **max_body_size**
+    > Maximum size of a request body, in bytes (`int`).
+
+    **max_time_limit**
+    > Maximum `time_limit` of a `/subset` request, in seconds (`float`). Larger time
+    limits are reduced to this one.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        workers=None,
+        batch_delay=0.005,
+        max_batch_size=64,
+        max_body_size=1_000_000,
+        max_time_limit=60,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.batch_delay = batch_delay
+        self.max_batch_size = max_batch_size
+        self.max_body_size = max_body_size
+        self.max_time_limit = max_time_limit
+        self.server = None
+
+    async def start(self):
+        """Start the worker processes and the server."""
+        # Worker processes forked from this one share its matrices, others load them:
+        warm_up(list(enzyme_tatapov_lookup))
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=warm_up,
+            initargs=(list(enzyme_tatapov_lookup),),
+        )
+        # Start all workers now, as processes forked later would inherit (and keep
+        # open) the connections of the server:
+        loop = asyncio.get_running_loop()
+        workers = self.workers or os.cpu_count() or 1
+        await asyncio.gather(
+            *[loop.run_in_executor(self.executor, os.getpid) for _ in range(workers)]
+        )
+        self.queue = asyncio.Queue()
+        self.tasks = set()  # keeps references to the running batches
+        self.batcher = asyncio.ensure_future(self.run_batches())
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port
+        )
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop the server and the worker processes."""
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        self.executor.shutdown(wait=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def run_batches(self):
+        """Collect the queued validation requests into batches for the pool."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.ensure_future(self.run_batch(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        overhang_sets = [overhang_set for overhang_set, _ in batch]
+        try:
+            results = await loop.run_in_executor(
+                self.executor, validate_overhang_set_batch, overhang_sets
+            )
+        except Exception as error:
+            if len(batch) > 1:
+                # Validate the sets one by one, so that the set causing the error (for
+                # example by crashing a worker process) does not fail the others:
+                await asyncio.gather(*[self.run_batch([item]) for item in batch])
+                return
+            overhang_set, future = batch[0]
+            if not future.done():
+                result = {
+                    key: overhang_set[key]
+                    for key in ["name", "enzyme"]
+                    if key in overhang_set
+                }
+                result["error"] = "Cannot validate the set: %r" % error
+                future.set_result(result)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def validate(self, overhang_set):
+        """Return the validation results of a set, computed in a batch."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((overhang_set, future))
+        return await future
+
+    async def handle_request(self, method, path, body):
+        """Return the status, content type and content of the response."""
+        if path == "/health":
+            return 200, "application/json", json.dumps({"status": "ok"}).encode()
+        if path not in ["/validate", "/subset", "/report"]:
+            return 404, "application/json", json.dumps({"error": "Not found"}).encode()
+        if method != "POST":
+            error = {"error": "Use POST"}
+            return 405, "application/json", json.dumps(error).encode()
+        try:
+            record = json.loads(body)
+            overhang_set = read_overhang_set(record)
+        except (ValueError, AttributeError) as error:
+            overhang_set = {"error": "Cannot read the set: %r" % error}
+        if "error" in overhang_set:
+            error = {"error": overhang_set["error"]}
+            return 400, "application/json", json.dumps(error).encode()
+        overhang_set.pop("line")
+
+        loop = asyncio.get_running_loop()
+        if path == "/validate":
+            result = await self.validate(overhang_set)
+            result.pop("line", None)
+            status = 400 if "error" in result else 200
+            return status, "application/json", json.dumps(result).encode()
+        if path == "/subset":
+            try:
+                time_limit = float(record.get("time_limit", 10))
+            except (TypeError, ValueError):
+                time_limit = math.nan
+            if not math.isfinite(time_limit) or time_limit < 0:
+                error = {"error": "time_limit must be a positive number of seconds"}
+                return 400, "application/json", json.dumps(error).encode()
+            time_limit = min(time_limit, self.max_time_limit)
+            try:
+                result = await loop.run_in_executor(
+                    self.executor, find_overhang_subset, overhang_set, time_limit
+                )
+            except ValueError as error:  # no annealing data for the enzyme
+                error = {"error": str(error)}
+                return 400, "application/json", json.dumps(error).encode()
+            return 200, "application/json", json.dumps(result).encode()
+        # /report
+        pdf_data = await loop.run_in_executor(
+            self.executor, make_overhangset_report, overhang_set
+        )
+        return 200, "application/pdf", pdf_data
+
+    async def handle_connection(self, reader, writer):
+        """Read an HTTP request, and write the response (one request per
+        connection)."""
+        try:
+            request_line = await reader.readline()
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip()
+            content_length = int(headers.get("content-length", 0))
+            if content_length > self.max_body_size:
+                error = {"error": "Request body too large"}
+                status, content_type, content = 413, "application/json", error
+                content = json.dumps(content).encode()
+            else:
+                body = await reader.readexactly(content_length)
+                status, content_type, content = await self.handle_request(
+                    method, path.split("?")[0], body
+                )
+        except (ValueError, asyncio.IncompleteReadError) as error:
+            status, content_type = 400, "application/json"
+            content = json.dumps({"error": "Bad request: %r" % error}).encode()
+        except Exception as error:
+            status, content_type = 500, "application/json"
+            content = json.dumps({"error": "Server error: %r" % error}).encode()
+
+        header = (
+            "HTTP/1.1 %d %s\r\n" % (status, HTTP_REASONS[status])
+            + "Content-Type: %s\r\n" % content_type
+            + "Content-Length: %d\r\n" % len(content)
+            + "Connection: close\r\n\r\n"
+        )
+        writer.write(header.encode("latin-1") + content)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+def main(argv=None):
+    """Run a `ValidationServer` until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="overhang-server", description="Serve overhang set validation over HTTP."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="default: localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-w", "--workers", type=int, help="number of processes")
+    parser.add_argument(
+        "--max-time-limit",
+        type=float,
+        default=60,
+        help="maximum time limit of /subset requests, in seconds (default: 60)",
+    )
+    args = parser.parse_args(argv)
+
+    server = ValidationServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_time_limit=args.max_time_limit,
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
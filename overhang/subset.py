@@ -0,0 +1,217 @@
+import random
+import time
+
+from .profiling import profiled
+
+
+class _TimeLimitReached(Exception):
+    pass
+
+
+def count_bits(mask):
+    """Return the number of set bits in an integer (`bin()` for Python < 3.10)."""
+    return bin(mask).count("1")
+
+
+def iter_bits(mask):
+    """Yield the indices of the set bits of an integer, lowest first."""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+@profiled("find_compatible_subset")
+def find_compatible_subset(items, incompatible_pairs, time_limit=10, seed=123):
+    """Find the largest subset of items that contains no incompatible pair.
+
+    This is a maximum clique search on the compatibility graph, with bitset adjacency.
+    A greedy and local search gives a first subset, which a branch and bound search
+    (with greedy colouring bounds) then improves until it is proven optimal or the
+    time limit is reached. Returns the subset (`list`) and whether it is proven to be
+    optimal (`bool`).
+
+
+    **Parameters**
+
+    **items**
+    > Items to choose from, for example overhang strings (`list`). Duplicates are
+    ignored.
+
+    **incompatible_pairs**
+    > Pairs of items that cannot be in the subset together (`list` of `tuple`).
+
+    **time_limit**
+    > Maximum search time in seconds (`float`). If reached, the best subset found so
+    far is returned.
+
+    **seed**
+    > Seed of the random number generator of the local search (`int`).
+    """
+    items = list(dict.fromkeys(items))
+    n = len(items)
+    if n == 0:
+        return [], True
+    deadline = time.perf_counter() + time_limit
+    index = {item: i for i, item in enumerate(items)}
+    everyone = (1 << n) - 1
+    adjacency = [everyone & ~(1 << i) for i in range(n)]
+    for item1, item2 in incompatible_pairs:
+        i, j = index[item1], index[item2]
+        if i != j:
+            adjacency[i] &= ~(1 << j)
+            adjacency[j] &= ~(1 << i)
+
+    best = find_heuristic_clique(adjacency, deadline, seed=seed)
+    try:
+        best = find_maximum_clique(adjacency, best, deadline)
+        is_optimal = True
+    except _TimeLimitReached as stop:
+        best = stop.args[0]
+        is_optimal = False
+
+    return [items[i] for i in iter_bits(best)], is_optimal
+
+
+def find_greedy_clique(adjacency, start):
+    """Grow a clique from a vertex, always adding the candidate with the most
+    neighbours among the remaining candidates.
+
+
+    **Parameters**
+
+    **adjacency**
+    > Neighbours of each vertex as an integer bitmask (`list`).
+
+    **start**
+    > Index of the first vertex (`int`).
+    """
+    clique = 1 << start
+    candidates = adjacency[start]
+    while candidates:
+        vertex = max(
+            iter_bits(candidates),
+            key=lambda v: count_bits(adjacency[v] & candidates),
+        )
+        clique |= 1 << vertex
+        candidates &= adjacency[vertex]
+    return clique
+
+
+def find_heuristic_clique(adjacency, deadline, iterations=2000, seed=123):
+    """Find a large clique with greedy starts followed by a swap-based local search.
+
+    Returns the clique as an integer bitmask.
+
+
+    **Parameters**
+
+    **adjacency**
+    > Neighbours of each vertex as an integer bitmask (`list`).
+
+    **deadline**
+    > `time.perf_counter()` value at which the search stops (`float`).
+
+    **iterations**
+    > Number of local search moves (`int`).
+
+    **seed**
+    > Seed of the random number generator (`int`).
+    """
+    n = len(adjacency)
+    degrees = [count_bits(neighbours) for neighbours in adjacency]
+    starts = sorted(range(n), key=lambda v: -degrees[v])[:10]
+    best = 0
+    for start in starts:
+        clique = find_greedy_clique(adjacency, start)
+        if count_bits(clique) > count_bits(best):
+            best = clique
+
+    # Local search: add vertices compatible with the whole clique, otherwise swap in
+    # a vertex that conflicts with a single member. Recently swapped vertices are tabu.
+    rng = random.Random(seed)
+    clique = best
+    tabu = {}
+    for iteration in range(iterations):
+        if iteration % 100 == 0 and time.perf_counter() > deadline:
+            break
+        additions = []
+        swaps = []
+        for vertex in range(n):
+            if clique >> vertex & 1 or tabu.get(vertex, -1) >= iteration:
+                continue
+            conflicts = clique & ~adjacency[vertex]
+            if conflicts == 0:
+                additions.append(vertex)
+            elif conflicts & (conflicts - 1) == 0:  # a single conflict
+                swaps.append((vertex, conflicts.bit_length() - 1))
+        if additions:
+            clique |= 1 << rng.choice(additions)
+            if count_bits(clique) > count_bits(best):
+                best = clique
+        elif swaps:
+            vertex, removed = rng.choice(swaps)
+            clique = (clique & ~(1 << removed)) | (1 << vertex)
+            tabu[removed] = iteration + 7
+        else:
+            break
+    return best
+
+
+def find_maximum_clique(adjacency, best, deadline):
+    """Find a maximum clique by branch and bound, with greedy colouring bounds.
+
+    Returns the clique as an integer bitmask. Raises `_TimeLimitReached` (with the best
+    clique found) when the deadline is reached.
+
+
+    **Parameters**
+
+    **adjacency**
+    > Neighbours of each vertex as an integer bitmask (`list`).
+
+    **best**
+    > A known clique (`int` bitmask), used as the initial lower bound.
+
+    **deadline**
+    > `time.perf_counter()` value at which the search stops (`float`).
+    """
+    state = {"best": best, "best_size": count_bits(best), "nodes": 0}
+
+    def colour_vertices(candidates):
+        # Greedy colouring: each colour class is an independent set, so a clique can
+        # contain at most one vertex of each colour.
+        vertices = []
+        colours = []
+        colour = 0
+        uncoloured = candidates
+        while uncoloured:
+            colour += 1
+            available = uncoloured
+            while available:
+                vertex = (available & -available).bit_length() - 1
+                available &= ~adjacency[vertex] & ~(1 << vertex)
+                uncoloured &= ~(1 << vertex)
+                vertices.append(vertex)
+                colours.append(colour)
+        return vertices, colours
+
+    def expand(clique, size, candidates):
+        state["nodes"] += 1
+        if state["nodes"] % 1000 == 0 and time.perf_counter() > deadline:
+            raise _TimeLimitReached(state["best"])
+        vertices, colours = colour_vertices(candidates)
+        for vertex, colour in zip(reversed(vertices), reversed(colours)):
+            if size + colour <= state["best_size"]:
+                return
+            new_clique = clique | (1 << vertex)
+            new_candidates = candidates & adjacency[vertex]
+            if new_candidates:
+                expand(new_clique, size + 1, new_candidates)
+            elif size + 1 > state["best_size"]:
+                state["best"] = new_clique
+                state["best_size"] = size + 1
+            candidates &= ~(1 << vertex)
+
+    expand(0, 0, (1 << len(adjacency)) - 1)
+    return state["best"]
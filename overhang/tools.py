@@ -1,11 +1,18 @@
-import itertools
-
-import tatapov
-
 import numpy as np
-import matplotlib.pyplot as plt
+
+from .profiling import profiled
 
 complements = {"A": "T", "T": "A", "C": "G", "G": "C"}
+complement_table = str.maketrans(complements)
+nucleotide_codes = str.maketrans("ACGT", "0123")  # 2-bit encoding, in ACGT order
+base_mask = int("01" * 128, 2)  # the lower bit of each base, for 128 bases
+# Reverse complement of each byte (4 bases) of an encoded sequence:
+reverse_complement_bytes = [
+    sum((3 - ((byte >> (2 * i)) & 3)) << (2 * (3 - i)) for i in range(4))
+    for byte in range(256)
+]
+
+byte_bit_counts = np.array([bin(byte).count("1") for byte in range(256)], np.uint8)
 
 enzyme_tatapov_lookup = {
     "BsaI": "2020_01h_BsaI",
@@ -25,7 +32,158 @@ def reverse_complement(sequence):
     **sequence**
     > An ATGC string (`str`).
     """
-    return "".join([complements[c] for c in sequence[::-1]])
+    return sequence.translate(complement_table)[::-1]
+
+
+def encode_overhang(sequence):
+    """Return the 2-bit integer encoding of a DNA sequence (A=0, C=1, G=2, T=3).
+
+    For instance `encode_overhang("ACGT")` returns `27`. Sequences of the same length
+    sort in the same order as their codes.
+
+
+    **Parameters**
+
+    **sequence**
+    > An ATGC string (`str`).
+    """
+    return int(sequence.translate(nucleotide_codes), 4)
+
+
+def decode_overhang(code, length):
+    """Return the DNA sequence of a 2-bit integer encoding, see `encode_overhang()`.
+
+
+    **Parameters**
+
+    **code**
+    > Encoded sequence (`int`).
+
+    **length**
+    > Length of the sequence (`int`).
+    """
+    return "".join(
+        "ACGT"[(code >> (2 * position)) & 3] for position in range(length - 1, -1, -1)
+    )
+
+
+def reverse_complement_code(code, length):
+    """Return the reverse complement of an encoded sequence, see `encode_overhang()`.
+
+
+    **Parameters**
+
+    **code**
+    > Encoded sequence (`int`).
+
+    **length**
+    > Length of the sequence (`int`).
+    """
+    number_of_bytes = (length + 3) // 4
+    code_rc = 0
+    for _ in range(number_of_bytes):  # from the last 4 bases
+        code_rc = (code_rc << 8) | reverse_complement_bytes[code & 255]
+        code >>= 8
+    # Padding "A"s at the start became "T"s at the end:
+    return code_rc >> (2 * (4 * number_of_bytes - length))
+
+
+def reverse_complement_codes(codes, length):
+    """Return the reverse complements of an array of encoded sequences (up to 31
+    bases), see `reverse_complement_code()`.
+
+
+    **Parameters**
+
+    **codes**
+    > Encoded sequences (`numpy.ndarray`).
+
+    **length**
+    > Length of the sequences (`int`).
+    """
+    table = np.array(reverse_complement_bytes, dtype=np.uint64)
+    codes = np.asarray(codes, dtype=np.int64).astype(np.uint64)
+    number_of_bytes = (length + 3) // 4
+    codes_rc = np.zeros_like(codes)
+    for byte in range(number_of_bytes):
+        byte_codes = (codes >> np.uint64(8 * byte)) & np.uint64(255)
+        codes_rc = (codes_rc << np.uint64(8)) | table[byte_codes]
+    codes_rc >>= np.uint64(2 * (4 * number_of_bytes - length))
+    return codes_rc.astype(np.int64)
+
+
+def get_code_bases(codes, length):
+    """Return the bases (0-3 for ACGT) of encoded sequences, as a 2D array of shape
+    `(len(codes), length)`.
+
+
+    **Parameters**
+
+    **codes**
+    > Encoded sequences (`numpy.ndarray`).
+
+    **length**
+    > Length of the sequences (`int`).
+    """
+    shifts = 2 * np.arange(length - 1, -1, -1)
+    return ((np.asarray(codes)[:, None] >> shifts) & 3).astype(np.int8)
+
+
+def get_hamming_distance_code(code1, code2):
+    """Return the number of different bases between two encoded sequences of the
+    same length (up to 128 bases), see `encode_overhang()`.
+
+
+    **Parameters**
+
+    **code1**
+    > Encoded sequence (`int`).
+
+    **code2**
+    > Encoded sequence (`int`).
+    """
+    difference = code1 ^ code2
+    # One bit per different base, then count them:
+    different_bases = (difference | (difference >> 1)) & base_mask
+    return bin(different_bases).count("1")
+
+
+def get_hamming_distance_matrix(codes1, codes2, length):
+    """Return the Hamming distances between all pairs of encoded sequences.
+
+    Returns an array of shape `(len(codes1), len(codes2))`.
+
+
+    **Parameters**
+
+    **codes1**
+    > Encoded sequences (`numpy.ndarray`).
+
+    **codes2**
+    > Encoded sequences (`numpy.ndarray`).
+
+    **length**
+    > Length of the sequences (`int`).
+    """
+    codes1 = np.asarray(codes1, dtype=np.uint64)[:, None]
+    codes2 = np.asarray(codes2, dtype=np.uint64)[None, :]
+    # Bit-parallel, as in `get_hamming_distance_code()` (up to 32 bases):
+    difference = codes1 ^ codes2
+    different_bases = (difference | (difference >> np.uint64(1))) & np.uint64(
+        base_mask & (2**64 - 1)
+    )
+    return count_bits(different_bases).astype(np.int8)
+
+
+def count_bits(values):
+    """Return the number of bits set in each value of an unsigned integer array."""
+    if hasattr(np, "bitwise_count"):  # NumPy 2
+        return np.bitwise_count(values)
+    counts = np.zeros(values.shape, dtype=np.uint8)
+    for byte in range(values.dtype.itemsize):
+        byte_values = (values >> np.uint64(8 * byte)) & np.uint64(255)
+        counts += byte_bit_counts[byte_values]
+    return counts
 
 
 def gc_content(sequence):
@@ -39,7 +197,7 @@ def gc_content(sequence):
     **sequence**
     > An ATGC string (`str`).
     """
-    return 1.0 * len([c for c in sequence if c in "GC"]) / len(sequence)
+    return 1.0 * (sequence.count("G") + sequence.count("C")) / len(sequence)
 
 
 def order_overhangs(seq):
@@ -57,8 +215,11 @@ def order_overhangs(seq):
     return sorted_overhangs[0], sorted_overhangs[1]
 
 
-def generate_overhang_pairs(overhang_length=4):
-    """Generate all overhang pairs of given length.
+def iter_overhang_pairs(overhang_length=4):
+    """Yield all overhang pairs of given length, without storing them.
+
+    Each pair is yielded once, as `(overhang, overhang_rc)` with the lower sequence
+    first (like `order_overhangs()`), in sorted order.
 
 
     **Parameters**
@@ -66,17 +227,27 @@ def generate_overhang_pairs(overhang_length=4):
     **overhang_length**
     > Length of overhangs (`int`).
     """
-    raw_overhangs = [
-        "".join(overhang)
-        for overhang in itertools.product(*overhang_length * ("ACGT",))
-    ]  # adapted from goldenhinges
+    for code in range(4**overhang_length):
+        code_rc = reverse_complement_code(code, overhang_length)
+        if code <= code_rc:  # the pair is yielded from its lower sequence only
+            yield (
+                decode_overhang(code, overhang_length),
+                decode_overhang(code_rc, overhang_length),
+            )
+
 
-    overhang_pairs = []  # for each overhang and its complement
-    for overhang in raw_overhangs:
-        overhang_pairs += [frozenset([overhang, reverse_complement(overhang)])]
-    overhang_pairs = set(overhang_pairs)  # remove duplicate pairs
+def generate_overhang_pairs(overhang_length=4):
+    """Generate all overhang pairs of given length.
 
-    return overhang_pairs
+    Returns a set of frozensets. See `iter_overhang_pairs()` for a generator.
+
+
+    **Parameters**
+
+    **overhang_length**
+    > Length of overhangs (`int`).
+    """
+    return {frozenset(pair) for pair in iter_overhang_pairs(overhang_length)}
 
 
 def subset_data_for_overhang(dataframe, overhang, horizontal=True, filter=True):
@@ -111,6 +282,7 @@ def subset_data_for_overhang(dataframe, overhang, horizontal=True, filter=True):
         return subset_data
 
 
+@profiled("plot_data")
 def plot_data(df, ax=None, colorbar=True, figwidth=8, plot_color="Reds"):
     """Plot a (restricted) Tatapov dataframe.
 
@@ -134,6 +306,8 @@ def plot_data(df, ax=None, colorbar=True, figwidth=8, plot_color="Reds"):
     > A Matplotlib colormap name.
     """
     # Adapted from tatapov.plot_data()
+    import matplotlib.pyplot as plt  # imported at first use, as it is slow to load
+
     if ax is None:
         _, ax = plt.subplots(1, figsize=(figwidth, 1.5))
     values = np.log10(np.maximum(0.5, df.values[::-1]))
@@ -165,31 +339,28 @@ def filter_overhangs(overhangs, enzyme="Esp3I"):
     **Parameters**
 
     **overhangs**
-    > List of Overhang instances (`list`).
+    > List (or any iterable, for example `iter_all_overhangs()`) of Overhang
+    instances.
 
     **enzyme**
     > Enzyme used with the overhangs (`str`). See `overhang.tools.enzyme_tatapov_lookup`
     for options.
     """
-    data = tatapov.annealing_data["37C"][enzyme_tatapov_lookup[enzyme]]
-    overhang_input = [overhang.overhang for overhang in overhangs]
-    subset = tatapov.data_subset(data, overhang_input, add_reverse=True)
-
-    # WEAK ANNEALS
-    # See cutoff 400 in Pryor et al. Figure 2.
-    strong_overhangs = []
-    for overhang in overhangs:
-        if subset[overhang.overhang][overhang.overhang_rc] >= 400:
-            strong_overhangs += [overhang]
-
-    # SELF-MISANNEALS
-    # Use 0 as cutoff:
+    from .AnnealingMatrix import get_annealing_matrix  # imports this module
+
+    matrix = get_annealing_matrix(enzyme)
     good_overhangs = []
-    for overhang in strong_overhangs:
-        if (
-            subset[overhang.overhang][overhang.overhang] == 0
-            and subset[overhang.overhang_rc][overhang.overhang_rc] == 0
-        ):
-            good_overhangs += [overhang]
+    for overhang in overhangs:  # a single pass, so that generators can be used
+        index = matrix.index[overhang.overhang]
+        index_rc = matrix.index[overhang.overhang_rc]
+        # WEAK ANNEALS
+        # See cutoff 400 in Pryor et al. Figure 2.
+        if matrix.values[index_rc, index] < 400:
+            continue
+        # SELF-MISANNEALS
+        # Use 0 as cutoff:
+        if matrix.values[index, index] != 0 or matrix.values[index_rc, index_rc] != 0:
+            continue
+        good_overhangs += [overhang]
 
     return good_overhangs
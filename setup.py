@@ -18,9 +18,15 @@ setup(
     install_requires=[
         "matplotlib",
         "minotaor",
-        "networkx",
         "numpy",
+        "pandas",
         "pdf_reports",
         "tatapov",
     ],
+    entry_points={
+        "console_scripts": [
+            "overhang-validate=overhang.cli:main",
+            "overhang-server=overhang.server:main",
+        ]
+    },
 )
@@ -0,0 +1,165 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+import tatapov
+
+import overhang
+import overhang.AnnealingMatrix
+from overhang.AnnealingMatrix import (
+    AnnealingMatrix,
+    FidelityScore,
+    get_annealing_conditions,
+    get_annealing_matrix,
+    get_annealing_tensor,
+    get_dataset_matrix,
+    load_annealing_file,
+    write_annealing_file,
+)
+
+
+def test_get_annealing_matrix():
+    matrix = get_annealing_matrix("Esp3I")
+    assert matrix is get_annealing_matrix("Esp3I")  # loaded only once
+    assert matrix.values.shape == (256, 256)
+    assert matrix.overhangs[matrix.index["ACGT"]] == "ACGT"
+    with pytest.raises(ValueError):
+        matrix.values[0, 0] = 1  # shared, so read-only
+
+
+def test_get_subset():
+    data = tatapov.annealing_data["37C"]["2020_01h_Esp3I"]
+    matrix = get_annealing_matrix("Esp3I")
+    overhangs = ["TAGG", "ATGG", "AATT", "CCTA"]
+    subset = matrix.get_subset(overhangs)
+    assert subset is matrix.get_subset(overhangs)  # memoized
+    assert subset.equals(tatapov.data_subset(data, overhangs, add_reverse=True))
+
+    for ovhg in [overhang.Overhang("TAGG"), overhang.Overhang("AATT")]:
+        expected = overhang.subset_data_for_overhang(data, ovhg)
+        assert matrix.get_overhang_subset(ovhg).equals(expected)
+
+    # The memoized set subsets are bounded:
+    sets = itertools.islice(itertools.combinations(matrix.overhangs, 2), 200)
+    for overhang_set in sets:
+        matrix.get_subset(overhang_set)
+    assert len(matrix._set_subsets) == overhang.AnnealingMatrix.MAX_SET_SUBSETS
+
+
+def test_find_misanneals():
+    data = tatapov.annealing_data["37C"]["2020_01h_BsaI"]
+    matrix = AnnealingMatrix.from_dataframe(data)
+    overhangs = [overhang.Overhang(oh) for oh in ["TAGG", "ATGG", "GACT", "GGAC"]]
+    overhangs_fw = [oh.overhang for oh in overhangs]
+    overhangs_rc = [oh.overhang_rc for oh in overhangs]
+    subset = tatapov.data_subset(data, overhangs_fw, add_reverse=True)
+
+    expected = [
+        (i, j)
+        for (i, oh1), (j, oh2) in itertools.combinations(enumerate(overhangs), 2)
+        if (
+            subset.loc[[oh1.overhang, oh1.overhang_rc], [oh2.overhang, oh2.overhang_rc]]
+            > 10
+        ).any(axis=None)
+    ]
+    assert matrix.find_misanneals(overhangs_fw, overhangs_rc) == expected
+
+    is_weak = matrix.find_weak_anneals(overhangs_fw, overhangs_rc)
+    assert list(is_weak) == [
+        subset[oh.overhang][oh.overhang_rc] < 400 for oh in overhangs
+    ]
+
+
+def test_FidelityScore():
+    matrix = get_annealing_matrix("BsaI")
+    overhangs = ["TAGG", "ATGG", "GACT", "GGAC", "TCCG"]
+    fidelity_score = FidelityScore(matrix, overhangs[:3])
+    fidelity_score.add("GGAC")
+    fidelity_score.add("AAAA")
+    fidelity_score.remove(4)
+    fidelity_score.add("TTTT")
+    expected = fidelity_score.get_replacement_fidelity(4, "TCCG")
+    fidelity_score.replace(4, "TCCG")
+    assert fidelity_score.overhangs == overhangs
+    assert fidelity_score.get_fidelity() == expected
+    assert abs(expected - matrix.get_fidelity(overhangs)) < 1e-12
+
+    junction_fidelities = fidelity_score.get_junction_fidelities()
+    assert len(junction_fidelities) == 5
+    assert all(0 <= fidelity <= 1 for fidelity in junction_fidelities)
+
+    # Duplicate overhangs are scored as junctions, but their strands are counted once
+    # in the ligations of the set:
+    fidelity_score = FidelityScore(matrix, overhangs + ["TAGG"])
+    expected = FidelityScore(matrix, overhangs).get_junction_fidelities()
+    junction_fidelities = fidelity_score.get_junction_fidelities()
+    assert np.allclose(junction_fidelities, list(expected) + [expected[0]])
+    fidelity_score.remove(0)
+    assert np.allclose(
+        fidelity_score.get_junction_fidelities(), expected[1:].tolist() + [expected[0]]
+    )
+    fidelity_score.replace(4, "CCTA")  # TAGG -> its reverse complement
+    fidelity_score.replace(0, "CCTA")
+    fidelity_score.add("TCCG")
+    reference = FidelityScore(matrix, fidelity_score.overhangs)
+    assert np.allclose(reference.totals, fidelity_score.totals)
+    assert np.allclose(reference.totals_rc, fidelity_score.totals_rc)
+    assert abs(reference.get_fidelity() - fidelity_score.get_fidelity()) < 1e-12
+
+
+def test_annealing_file(tmpdir, monkeypatch):
+    path = os.path.join(str(tmpdir), "annealing.bin")
+    write_annealing_file(path, enzymes=["BsaI", "Esp3I"])
+    matrices = load_annealing_file(path)
+    assert sorted(matrices) == [("37C", "2020_01h_BsaI"), ("37C", "2020_01h_Esp3I")]
+    matrix = matrices[("37C", "2020_01h_Esp3I")]
+    assert isinstance(matrix.values, np.memmap)
+    assert not matrix.values.flags.writeable
+    assert np.array_equal(matrix.values, get_annealing_matrix("Esp3I").values)
+    assert matrix.overhangs == get_annealing_matrix("Esp3I").overhangs
+
+    overhangs = [overhang.Overhang(oh) for oh in overhang.DISASTANDARD]
+    filtered_overhangs = overhang.filter_overhangs(overhangs)
+
+    # Matrices are loaded from the file given in the environment:
+    monkeypatch.setattr(overhang.AnnealingMatrix, "_annealing_matrices", {})
+    monkeypatch.setattr(overhang.AnnealingMatrix, "_annealing_files", set())
+    monkeypatch.setenv("OVERHANG_ANNEALING_FILE", path)
+    assert isinstance(get_annealing_matrix("BsaI").values, np.memmap)
+    overhangset = overhang.OverhangSet(overhang.DISASTANDARD, enzyme="Esp3I")
+    overhangset.inspect_overhangs(make_plot=False)
+    assert len(overhangset.misanneals_list) > 0
+    assert overhang.filter_overhangs(overhangs) == filtered_overhangs
+
+
+def test_AnnealingTensor():
+    conditions = get_annealing_conditions("BsaI")
+    assert conditions[0] == ("37C", "2020_01h_BsaI")
+    assert ("25C", "18h") in conditions
+    assert ("37C", "2020_01h_Esp3I") not in conditions
+    tensor = get_annealing_tensor("BsaI")
+    assert tensor is get_annealing_tensor("BsaI", conditions=conditions)
+    assert tensor.values.shape == (len(conditions), 256, 256)
+
+    overhang_pairs = [
+        overhang.tools.order_overhangs(oh) for oh in overhang.DISASTANDARD
+    ]
+    overhangs = [pair[0] for pair in overhang_pairs]
+    overhangs_rc = [pair[1] for pair in overhang_pairs]
+    is_weak = tensor.find_weak_anneals(overhangs, overhangs_rc)
+    is_self_misannealing = tensor.find_self_misanneals(overhangs, overhangs_rc)
+    misanneals = tensor.count_misanneals(overhangs, overhangs_rc)
+    fidelities = tensor.get_fidelities(overhang.DISASTANDARD)
+    for i, condition in enumerate(conditions):  # same as each matrix
+        matrix = get_dataset_matrix(*condition)
+        assert np.array_equal(
+            is_weak[i], matrix.find_weak_anneals(overhangs, overhangs_rc)
+        )
+        assert np.array_equal(
+            is_self_misannealing[i],
+            matrix.find_self_misanneals(overhangs, overhangs_rc),
+        )
+        assert misanneals[i] == len(matrix.find_misanneals(overhangs, overhangs_rc))
+        expected = matrix.get_fidelity(overhang.DISASTANDARD)
+        assert abs(fidelities[i] - expected) < 1e-12
@@ -0,0 +1,44 @@
+import pytest
+
+import overhang
+from overhang.EnzymeSiteIndex import EnzymeSiteIndex, get_enzyme_site_index
+
+
+def test_EnzymeSiteIndex():
+    index = EnzymeSiteIndex(enzymes=["Esp3I", "SapI"], overhang_lengths=[3, 4])
+    assert index.get_site("Esp3I") == "CGTCTC"
+    # CGTC, GTCT, TCTC and their reverse complements:
+    assert index.get_kmers("Esp3I", 4) == {"CGTC", "GTCT", "TCTC"} | {
+        "GACG",
+        "AGAC",
+        "GAGA",
+    }
+    assert index.is_in_site("GACG", "Esp3I")
+    assert not index.is_in_site("ATGG", "Esp3I")
+    assert index.is_in_site("GAAG", "SapI")  # site GCTCTTC
+    assert len(index.get_kmers("BsmBI", 5)) == 4  # indexed at first use
+    # Ambiguous nucleotides are left out (BsaXI site: ACNNNNNCTCC):
+    assert index.get_kmers("BsaXI", 4) == {"CTCC", "GGAG"}
+    with pytest.raises(ValueError):
+        index.get_site("NotAnEnzyme")
+
+    assert len(get_enzyme_site_index().kmers) > 500  # all enzymes
+
+
+def test_enzyme_without_annealing_data():
+    overhangset = overhang.OverhangSet(["GCTC", "ATGG", "AATT"], enzyme="SapI")
+    inspection = overhangset.inspect_overhangs()
+    assert not inspection.has_annealing_data
+    assert inspection.fidelity is None
+    assert inspection.palindromic_overhangs == ("AATT",)
+    assert inspection.overhangs_in_site == (("GAGC", "GCTC"),)
+    assert inspection.warnings == ("overhangs_in_site", "no_annealing_data")
+    assert overhangset.add_overhang("TGCA").palindromic_overhangs == ("AATT", "TGCA")
+
+    # 3-base overhangs have no annealing data:
+    inspection = overhang.OverhangSet(["ATG", "GCA"]).inspect_overhangs()
+    assert not inspection.has_annealing_data
+    assert inspection.severity == "warning"
+
+    with pytest.raises(ValueError):
+        overhang.OverhangSet(["ATGG"], enzyme="NotAnEnzyme").inspect_overhangs()
@@ -0,0 +1,31 @@
+import os
+
+import overhang
+
+
+def test_FigureCache(tmpdir):
+    figure_cache = overhang.FigureCache(path=str(tmpdir), max_size=250)
+    key = figure_cache.make_key(overhang="AAAA", enzyme="Esp3I")
+    assert key == figure_cache.make_key(enzyme="Esp3I", overhang="AAAA")
+    assert key != figure_cache.make_key(overhang="AAAC", enzyme="Esp3I")
+    assert figure_cache.get(key) is None
+
+    figure_cache.set(key, "A" * 100)
+    assert figure_cache.get(key) == "A" * 100
+
+    # Least recently used figures are evicted:
+    os.utime(figure_cache.get_filepath(key), (0, 0))
+    figure_cache.set("second", "B" * 100)
+    figure_cache.set("third", "C" * 100)
+    assert figure_cache.get(key) is None
+    assert figure_cache.get("third") == "C" * 100
+    assert figure_cache.measure_size() <= 250
+
+    # Replaced figures are counted once:
+    large_cache = overhang.FigureCache(path=str(tmpdir.join("large")), max_size=1000)
+    for figure_data in ["A" * 100, "B" * 100, "C" * 50]:
+        large_cache.set("figure", figure_data)
+    assert large_cache.size == large_cache.measure_size() == 50
+
+    figure_cache.clear()
+    assert figure_cache.get("third") is None
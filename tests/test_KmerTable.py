@@ -0,0 +1,46 @@
+import os
+
+import overhang
+from overhang.KmerTable import get_kmer_table
+from overhang.tools import gc_content
+
+
+def test_KmerTable():
+    for overhang_length in [3, 5]:
+        table = overhang.KmerTable(overhang_length)
+        assert len(table) == 4**overhang_length
+        for oh in overhang.generate_all_overhangs(overhang_length):
+            properties = (
+                oh.has_start_codon,
+                oh.has_stop_codon,
+                oh.has_multimer,
+                oh.gc_content,
+            )
+            assert table.get_properties(oh.code) == properties
+            # Same as the string methods:
+            oh.count_max_repeat()
+            oh.find_codons()
+            assert properties == (
+                oh.has_start_codon,
+                oh.has_stop_codon,
+                oh.has_multimer,
+                gc_content(oh.overhang),
+            )
+            assert table.get_properties(oh.code_rc)[:2] == (
+                oh.has_rc_start_codon,
+                oh.has_rc_stop_codon,
+            )
+
+
+def test_write_kmer_tables(tmpdir):
+    import minotaor
+
+    overhang.write_kmer_tables(overhang_lengths=[2, 3], path=str(tmpdir))
+    assert len(get_kmer_table(3).aa_patterns) == 32  # one per `Overhang`
+    table = overhang.KmerTable.load(os.path.join(str(tmpdir), "kmer_table_3.npz"))
+    assert len(table.aa_patterns) == 32
+    assert (table.max_repeat == get_kmer_table(3).max_repeat).all()
+    oh = overhang.Overhang("ACT")
+    assert table.get_aa_patterns(oh.code) == minotaor.convert_dna_to_aa_pattern("ACT")
+    assert oh.aa_patterns == minotaor.convert_dna_to_aa_pattern("ACT")
+    assert overhang.KmerTable.load(os.path.join(str(tmpdir), "kmer_table_2.npz"))
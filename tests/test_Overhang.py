@@ -1,4 +1,5 @@
 import overhang
+from overhang.Overhang import get_overhang_distance, get_overhang_distance_matrix
 
 
 def test_Overhang():
@@ -33,4 +34,25 @@ def test_Overhang():
 
 
 def test_generate_all_overhangs():
-    assert len(overhang.generate_all_overhangs(3)) == 32
+    overhangs = overhang.generate_all_overhangs(3)
+    assert len(overhangs) == 32
+    sequences = [oh.overhang for oh in overhangs]
+    assert sequences == sorted(sequences)
+    assert sequences == [oh.overhang for oh in overhang.iter_all_overhangs(3)]
+
+
+def test_Overhang_code():
+    oh_acga = overhang.Overhang("TCGT")
+    assert oh_acga.overhang == "ACGA"
+    assert oh_acga.code == 0b00011000  # A=0, C=1, G=2, T=3
+    assert not hasattr(oh_acga, "__dict__")
+
+
+def test_get_overhang_distance_matrix():
+    overhangs = overhang.generate_all_overhangs(3)
+    distances = get_overhang_distance_matrix(overhangs)
+    for i, oh1 in enumerate(overhangs):
+        for j, oh2 in enumerate(overhangs):
+            assert distances[i, j] == get_overhang_distance(oh1, oh2)
+    table_distances = get_overhang_distance_matrix(overhang.OverhangTable(3))
+    assert table_distances.shape == (32, 32)
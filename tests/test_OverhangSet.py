@@ -1,3 +1,8 @@
+import dataclasses
+import json
+
+import pytest
+
 import overhang
 
 
@@ -5,11 +10,22 @@ def test_OverhangSet():
     overhangset = overhang.OverhangSet(
         overhangs=overhang.DISASTANDARD, name="Disastandard"
     )
-    overhangset.inspect_overhangs()
+    inspection = overhangset.inspect_overhangs()
     assert overhangset.has_duplicates
     assert overhangset.has_errors
     assert overhangset.has_rc_error
     assert overhangset.has_warnings
+    assert inspection is overhangset.inspection
+    assert inspection.severity == "error"
+    assert inspection.errors == ("duplicates", "palindromic_overhangs", "rc_overhangs")
+    assert inspection.rc_overhangs == ("CCTA", "TAGG")
+    assert inspection.weak_anneals == (("CACC", "GGTG"),)
+    assert overhangset.weak_anneals == "CACC/GGTG"
+    assert json.loads(inspection.to_json())["palindromic_overhangs"] == ["AATT"]
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        inspection.name = "Changed"
+    assert len(overhangset.junction_fidelities) == len(overhang.DISASTANDARD)
+    assert 0 <= overhangset.fidelity <= min(overhangset.junction_fidelities)
 
     overhangset = overhang.OverhangSet(overhangs=["CTAT", "GGAC", "TGTT"], name="Test")
     overhangset.find_perfect_subset()
@@ -20,3 +36,107 @@ def test_OverhangSet():
     overhangset.inspect_overhangs()
     assert overhangset.has_warnings
     assert overhangset.overhangs_in_site_txt == "AGAC/GTCT; CGTC/GACG"
+    assert overhangset.inspection.overhangs_in_site == (
+        ("AGAC", "GTCT"),
+        ("CGTC", "GACG"),
+    )
+
+
+def test_evaluate_overhang_sets():
+    overhang_sets = {
+        "Disastandard": overhang.DISASTANDARD,
+        "EcoFlex": ["CTAT", "GTAC", "GGAC", "TCGA", "TGTT"],
+    }
+    results = overhang.evaluate_overhang_sets(overhang_sets, enzyme="BsaI")
+    assert list(results.index) == ["Disastandard", "EcoFlex"]
+
+    disastandard = results.loc["Disastandard"]
+    assert disastandard["has_duplicates"]
+    assert disastandard["palindromic_overhangs"] == ("AATT",)
+    assert disastandard["rc_overhangs"] == ("CCTA", "TAGG")
+    assert 0 <= disastandard["fidelity"] <= 1
+
+    overhangset = overhang.OverhangSet(
+        overhangs=overhang_sets["EcoFlex"], enzyme="BsaI"
+    )
+    overhangset.inspect_overhangs(make_plot=False)
+    ecoflex = results.loc["EcoFlex"]
+    assert not ecoflex["has_duplicates"]
+    assert ecoflex["number_of_misanneals"] == len(overhangset.misanneals_list)
+    assert len(ecoflex["weak_anneals"]) == len(overhangset.weak_anneals_list)
+
+
+def test_change_overhangs():
+    overhangset = overhang.OverhangSet(["TAGG", "ATGG", "GACT"], name="Test")
+    overhangset.find_similar_overhangs(difference_threshold=2)  # computes distances
+    changes = [
+        ("add", "CCTA"),  # reverse complement of TAGG
+        ("add", "AATT"),  # palindromic
+        ("add", "ATGG"),  # duplicate
+        ("replace", "ATGG", "CACC"),
+        ("remove", "CCTA"),
+        ("add", "GTCT"),  # in the Esp3I site
+        ("replace", "TAGG", "CCAG"),
+        ("remove", "AATT"),
+    ]
+    for change in changes:
+        method = getattr(overhangset, change[0] + "_overhang")
+        inspection = method(*change[1:])
+        # The result is the same as for a new set:
+        new_overhangset = overhang.OverhangSet(overhangset.overhang_input, name="Test")
+        assert inspection == new_overhangset.inspect_overhangs(make_plot=False)
+        assert overhangset.find_similar_overhangs(
+            difference_threshold=2
+        ) == new_overhangset.find_similar_overhangs(difference_threshold=2)
+    assert overhangset.overhang_input == ["CCAG", "CACC", "GACT", "ATGG", "GTCT"]
+
+    with pytest.raises(ValueError):
+        overhangset.remove_overhang("AAAA")
+    with pytest.raises(ValueError):
+        overhangset.add_overhang("AAAAA")
+
+
+def test_change_overhangs_asymmetric_matrix(monkeypatch):
+    matrix = overhang.AnnealingMatrix.get_annealing_matrix("Esp3I")
+    values = matrix.values.copy()
+    # TAGG misanneals with GACT in one orientation only:
+    values[matrix.index["TAGG"], matrix.index["GACT"]] = 1000
+    monkeypatch.setitem(
+        overhang.AnnealingMatrix._annealing_matrices,
+        ("37C", "2020_01h_Esp3I"),
+        overhang.AnnealingMatrix.AnnealingMatrix(values, matrix.overhangs),
+    )
+    overhangset = overhang.OverhangSet(["TAGG", "ATGG"], name="Test")
+    changes = [
+        ("add", "GACT"),
+        ("replace", "TAGG", "CCAG"),
+        ("replace", "CCAG", "TAGG"),
+    ]
+    for change in changes:
+        inspection = getattr(overhangset, change[0] + "_overhang")(*change[1:])
+        new_overhangset = overhang.OverhangSet(overhangset.overhang_input, name="Test")
+        assert inspection == new_overhangset.inspect_overhangs(make_plot=False)
+    assert len(overhangset.misanneals_list) == 1
+
+
+def test_evaluate_conditions():
+    overhangset = overhang.OverhangSet(overhang.DISASTANDARD, enzyme="BsaI")
+    results = overhangset.evaluate_conditions()
+    assert results.index[0] == ("37C", "2020_01h_BsaI")
+    assert ("25C", "01h") in results.index
+    overhangset.inspect_overhangs(make_plot=False)
+    first = results.iloc[0]
+    assert first["number_of_weak_anneals"] == len(overhangset.weak_anneals_list)
+    assert first["number_of_misanneals"] == len(overhangset.misanneals_list)
+    assert abs(first["fidelity"] - overhangset.fidelity) < 1e-12
+
+    results = overhangset.evaluate_conditions(conditions=[("25C", "18h")])
+    assert list(results.index) == [("25C", "18h")]
+    with pytest.raises(ValueError):
+        overhang.OverhangSet(["TAGG", "ATGG"], enzyme="EcoRI").evaluate_conditions()
+
+
+def test_find_perfect_subset_without_annealing_data():
+    overhangset = overhang.OverhangSet(["GCT", "AGC", "TTA"], enzyme="SapI")
+    with pytest.raises(ValueError):  # no annealing data for 3-base overhangs
+        overhangset.find_perfect_subset(make_plot=False, verbose=False)
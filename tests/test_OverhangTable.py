@@ -0,0 +1,20 @@
+import overhang
+
+
+def test_OverhangTable():
+    table = overhang.OverhangTable(3)
+    assert len(table) == 32
+    overhangs = {oh.overhang: oh for oh in overhang.generate_all_overhangs(3)}
+    assert table.get_overhangs() == sorted(overhangs)
+
+    dataframe = table.to_dataframe()
+    for sequence, row in dataframe.iterrows():
+        oh = overhangs[sequence]
+        assert row["overhang_rc"] == oh.overhang_rc
+        assert row["gc_content"] == oh.gc_content
+        assert row["has_multimer"] == oh.has_multimer
+        assert row["has_start_codon"] == oh.has_start_codon
+        assert row["has_rc_stop_codon"] == oh.has_rc_stop_codon
+
+    assert table.is_palindromic.sum() == 0
+    assert overhang.OverhangTable(4).is_palindromic.sum() == 16
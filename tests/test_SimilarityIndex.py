@@ -0,0 +1,33 @@
+import overhang
+from overhang.Overhang import get_overhang_distance
+
+
+def test_SimilarityIndex():
+    database = overhang.generate_all_overhangs(4)
+    queries = [overhang.Overhang(seq) for seq in ["TAGG", "ATGG", "GACT"]]
+    index = overhang.SimilarityIndex(database)
+    assert len(index) == 136
+    results = index.query(queries, max_distance=1)
+    expected = [
+        (i, j, get_overhang_distance(query, oh))
+        for i, query in enumerate(queries)
+        for j, oh in enumerate(database)
+        if get_overhang_distance(query, oh) <= 1
+    ]
+    assert results == expected
+    # Query in chunks, and with an OverhangTable:
+    table_index = overhang.SimilarityIndex(overhang.OverhangTable(4), chunk_size=200)
+    assert table_index.query(queries, max_distance=1) == results
+
+
+def test_find_similar_overhangs():
+    overhangset = overhang.OverhangSet(["TAGG", "TAGC", "ATGG", "CCAT"])
+    assert overhangset.find_similar_overhangs(difference_threshold=2) == [
+        (("CCTA", "TAGG"), ("GCTA", "TAGC"), 1),
+        (("ATGG", "CCAT"), ("ATGG", "CCAT"), 0),
+    ]
+    assert overhangset.get_similar_overhangs_text(difference_threshold=2) == (
+        "These overhang pairs (including reverse complements) have fewer than 2 "
+        "differences: CCTA/TAGG ~ GCTA/TAGC ;  ATGG/CCAT ~ ATGG/CCAT ;  "
+    )
+    assert overhangset.find_similar_overhangs() == []
@@ -0,0 +1,101 @@
+import json
+import os
+
+from overhang.cli import main, read_overhang_sets, validate_overhang_set
+
+
+def test_main(tmpdir):
+    csv_path = os.path.join(str(tmpdir), "sets.csv")
+    with open(csv_path, "w") as f:
+        f.write("name,enzyme,overhangs\n")
+        f.write("Set A,BsaI,TAGG ATGG GACT\n")
+        f.write('Set B,,"TAGG,CCTA,TCCG"\n')
+        f.write("Set C,NotAnEnzyme,TAGG\n")
+    jsonl_path = os.path.join(str(tmpdir), "sets.jsonl")
+    with open(jsonl_path, "w") as f:
+        f.write(
+            json.dumps(
+                {"name": "Set A", "enzyme": "BsaI", "overhangs": "TAGG ATGG GACT"}
+            )
+            + "\n"
+        )
+        f.write(
+            json.dumps({"name": "Set B", "overhangs": ["TAGG", "CCTA", "TCCG"]}) + "\n"
+        )
+        f.write(
+            json.dumps(
+                {"name": "Set C", "enzyme": "NotAnEnzyme", "overhangs": ["TAGG"]}
+            )
+            + "\n"
+        )
+        f.write("not json\n")
+
+    output_paths = []
+    for input_path, workers in [(csv_path, 1), (jsonl_path, 1), (jsonl_path, 2)]:
+        output_path = os.path.join(str(tmpdir), "results_%d.jsonl" % len(output_paths))
+        main([input_path, "-o", output_path, "--workers", str(workers)])
+        output_paths.append(output_path)
+
+    with open(output_paths[1]) as f:
+        results = [json.loads(line) for line in f]
+    assert [result["name"] for result in results[:3]] == ["Set A", "Set B", "Set C"]
+    assert results[0]["enzyme"] == "BsaI"
+    assert results[0]["overhangs"] == ["TAGG", "ATGG", "GACT"]
+    assert results[1]["severity"] == "error"
+    assert results[1]["enzyme"] == "Esp3I"
+    assert results[1]["rc_overhangs"] == ["CCTA", "TAGG"]
+    assert "error" in results[2] and "error" in results[3]
+
+    with open(output_paths[2]) as f:
+        assert [json.loads(line) for line in f] == results  # in parallel
+
+    with open(output_paths[0]) as f:
+        csv_results = [json.loads(line) for line in f]
+    for csv_result, result in zip(csv_results, results):
+        assert csv_result.pop("line") == result.pop("line") + 1  # after the header
+        assert csv_result == result
+
+
+def test_read_overhang_sets():
+    lines = [
+        '{"overhangs": "TAGG ATGG"}\n',
+        "\n",
+        '{"overhangs": "tagg gcna"}\n',
+        "  \n",
+        '{"overhangs": ["TAGG", "ATG"]}\n',
+    ]
+    overhang_sets = list(read_overhang_sets(lines))
+    assert [overhang_set["line"] for overhang_set in overhang_sets] == [1, 3, 5]
+    assert overhang_sets[0]["overhangs"] == ["TAGG", "ATGG"]
+    assert "'GCNA' is not an ACGT sequence" in overhang_sets[1]["error"]
+    assert "different lengths" in overhang_sets[2]["error"]
+
+
+def test_validate_overhang_set():
+    lines = [
+        '{"overhangs": ["TAGG", "ATGG"], "enzyme": ["BsaI"]}\n',
+        '{"overhangs": ["TAGG", "ATGG"], "name": 1}\n',
+        '{"overhangs": []}\n',
+        '{"overhangs": ["TAGG", "ATGG"], "enzyme": "BsaI"}\n',
+    ]
+    results = [
+        validate_overhang_set(overhang_set)
+        for overhang_set in read_overhang_sets(lines)
+    ]
+    assert "enzyme is not a string" in results[0]["error"]
+    assert "name is not a string" in results[1]["error"]
+    assert "Cannot validate the set" in results[2]["error"]  # no overhangs
+    assert "error" not in results[3]
+
+
+def test_read_overhang_sets_csv():
+    lines = [
+        "name,overhangs\n",
+        'Set A,"TAGG\n',
+        'ATGG"\n',
+        ",GACT CCAG\n",
+    ]
+    overhang_sets = list(read_overhang_sets(lines, input_format="csv"))
+    assert [overhang_set["line"] for overhang_set in overhang_sets] == [3, 4]
+    assert overhang_sets[0]["overhangs"] == ["TAGG", "ATGG"]
+    assert overhang_sets[1]["name"] == "Set 4"
@@ -0,0 +1,33 @@
+import pytest
+
+import overhang
+from overhang.design import design_overhang_set
+
+
+def test_design_overhang_set():
+    overhangset = design_overhang_set(
+        10, enzyme="BsaI", required=["TAGG"], forbidden=["CCAT"], iterations=2000
+    )
+    assert len(overhangset.overhang_input) == 10
+    assert overhangset.overhang_input[0] == "TAGG"
+    assert "ATGG" not in overhangset.overhang_input
+    assert "CCAT" not in overhangset.overhang_input
+
+    overhangset.inspect_overhangs(make_plot=False)
+    assert not overhangset.has_errors
+    assert 0 < overhangset.fidelity <= 1
+    results = overhang.evaluate_overhang_sets([overhangset.overhang_input], "BsaI")
+    assert abs(results["fidelity"][0] - overhangset.fidelity) < 1e-9
+
+
+def test_design_overhang_set_bad_required():
+    bad_required = [
+        ["TAGG", "AATT"],  # palindromic
+        ["TAGG", "TAGG"],  # duplicate
+        ["TAGG", "CCTA"],  # reverse complement of TAGG
+    ]
+    for required in bad_required:
+        with pytest.raises(ValueError):
+            design_overhang_set(10, enzyme="BsaI", required=required)
+    with pytest.raises(ValueError):  # forbidden as its reverse complement
+        design_overhang_set(10, enzyme="BsaI", required=["TAGG"], forbidden=["CCTA"])
@@ -0,0 +1,42 @@
+import xml.etree.ElementTree as ET
+
+import matplotlib
+import numpy as np
+
+import overhang
+from overhang.AnnealingMatrix import get_annealing_matrix
+from overhang.heatmap import get_colormap_colors, heatmap_figure_data
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_make_heatmap_svg():
+    overhangset = overhang.OverhangSet(["TAGG", "ATGG", "GACT"])
+    subset = get_annealing_matrix("Esp3I").get_subset(overhangset.overhang_input)
+    svg = overhang.make_heatmap_svg(subset, grid=True)
+    assert svg == overhang.make_heatmap_svg(subset, grid=True)  # deterministic
+
+    root = ET.fromstring(svg)
+    cells = [rect for rect in root.iter(SVG + "rect") if rect.get("fill")[0] == "#"]
+    assert len(cells) == subset.size
+    labels = [text.text for text in root.iter(SVG + "text")]
+    axis_labels = list(subset.index) + list(subset.columns)
+    assert labels[: len(axis_labels)] == axis_labels
+
+    # The colors are those of matplotlib's imshow():
+    values = np.log10(np.maximum(0.5, subset.values))
+    image = matplotlib.cm.ScalarMappable(cmap="Reds")
+    image.set_clim(values.min(), values.max())
+    expected_colors = [
+        matplotlib.colors.to_hex(color) for color in image.to_rgba(values.flatten())
+    ]
+    assert [cell.get("fill") for cell in cells] == expected_colors
+
+
+def test_heatmap_figure_data():
+    subset = get_annealing_matrix("Esp3I").get_overhang_subset(
+        overhang.Overhang("ACGA")
+    )
+    figure_data = heatmap_figure_data(subset, colorbar=False)
+    assert figure_data.startswith("data:image/svg+xml;base64,")
+    assert len(get_colormap_colors("Reds")) == 256
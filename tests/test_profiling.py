@@ -0,0 +1,28 @@
+import overhang
+from overhang.reports import make_overhang_figures_data
+
+
+def test_StageProfiler():
+    overhangs = overhang.generate_all_overhangs(4)[:2]
+    make_overhang_figures_data(overhangs, "Esp3I")  # not recorded
+
+    with overhang.StageProfiler() as profiler:
+        with overhang.StageProfiler() as inner_profiler:
+            overhangset = overhang.OverhangSet(["CTAT", "GGAC", "TGTT"])
+            overhangset.find_perfect_subset(make_plot=False, verbose=False)
+        make_overhang_figures_data(overhangs, "Esp3I")
+
+    summary = profiler.get_summary()
+    assert summary["find_perfect_subset"]["count"] == 1
+    assert summary["evaluate_annealing"]["count"] == 1
+    assert summary["plot_data"]["count"] == 2
+    assert summary["figure_data"]["count"] == 2
+    assert summary["find_perfect_subset"]["total_time"] >= (
+        summary["evaluate_annealing"]["total_time"]
+    )
+    assert set(inner_profiler.get_summary()) < set(summary)
+    assert list(profiler.to_dataframe().columns) == [
+        "count",
+        "total_time",
+        "mean_time",
+    ]
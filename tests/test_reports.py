@@ -1,5 +1,10 @@
+import json
 import os
 
+import pytest
+
+import tatapov
+
 import overhang
 
 
@@ -23,3 +28,141 @@ def test_write_overhangset_report(tmpdir):
     with open(pdf_path, "rb") as f:
         filesize = len(f.read())
         assert filesize > 300000
+
+
+def test_make_figures_data():
+    data = tatapov.annealing_data["37C"]["2020_01h_Esp3I"]
+    overhangs = overhang.generate_all_overhangs(4)[0:6]
+    subsets = [overhang.subset_data_for_overhang(data, ovhg) for ovhg in overhangs]
+    figures_data = overhang.reports.make_figures_data(subsets)
+    assert figures_data[0].startswith("data:image/svg+xml;base64,")
+    # Plotting in parallel gives the same figures:
+    assert overhang.reports.make_figures_data(subsets, workers=2) == figures_data
+
+
+def test_make_overhang_figures_data(tmpdir, monkeypatch):
+    figure_cache = overhang.FigureCache(path=str(tmpdir))
+    overhangs = overhang.generate_all_overhangs(4)[0:3]
+    figures_data = overhang.reports.make_overhang_figures_data(
+        overhangs, "Esp3I", figure_cache=figure_cache
+    )
+    assert len(os.listdir(str(tmpdir))) == 3
+    cached_figures_data = overhang.reports.make_overhang_figures_data(
+        overhangs, "Esp3I", figure_cache=figure_cache
+    )
+    assert cached_figures_data == figures_data
+
+    # Figures of other annealing data (for example from an annealing file) are new:
+    matrix = overhang.AnnealingMatrix.get_annealing_matrix("Esp3I")
+    other_matrix = overhang.AnnealingMatrix.AnnealingMatrix(
+        matrix.values * 2, matrix.overhangs
+    )
+    monkeypatch.setitem(
+        overhang.AnnealingMatrix._annealing_matrices,
+        ("37C", "2020_01h_Esp3I"),
+        other_matrix,
+    )
+    overhang.reports.make_overhang_figures_data(
+        overhangs, "Esp3I", figure_cache=figure_cache
+    )
+    assert len(os.listdir(str(tmpdir))) == 6
+
+
+def test_write_overhangset_report_figure_cache(tmpdir):
+    figure_cache = overhang.FigureCache(path=str(tmpdir))
+    overhangset = overhang.OverhangSet(overhangs=["TAGG", "ATGG", "GACT"])
+    html = overhang.write_overhangset_report(
+        None, overhangset, figure_cache=figure_cache, output_format="html"
+    )
+    assert len(os.listdir(str(tmpdir))) == 4  # set and overhang plots
+    overhangset = overhang.OverhangSet(overhangs=["TAGG", "ATGG", "GACT"])
+    with overhang.StageProfiler() as profiler:
+        cached_html = overhang.write_overhangset_report(
+            None, overhangset, figure_cache=figure_cache, output_format="html"
+        )
+    assert "plot_data" not in profiler.get_summary()  # no plots made again
+    assert cached_html == html
+
+
+def test_write_pdf_report_html_and_json(tmpdir):
+    overhangs = overhang.generate_all_overhangs(4)[0:3]
+    html_path = os.path.join(str(tmpdir), "test_report.html")
+    overhang.write_pdf_report(html_path, overhangs, output_format="html")
+    with open(html_path, "r") as f:
+        html = f.read()
+    assert html.startswith("<!DOCTYPE html>")
+    assert html.count("data:image/svg+xml;base64,") == 3
+
+    data = json.loads(overhang.write_pdf_report(None, overhangs, output_format="json"))
+    assert data["number_of_overhangs"] == 3
+    assert data["overhangs"][0]["overhang"] == "AAAA"
+    assert data["overhangs"][0]["overhang_rc"] == "TTTT"
+    assert data["overhangs"][0]["has_multimer"]
+
+    with pytest.raises(ValueError):
+        overhang.write_pdf_report(None, overhangs, output_format="docx")
+
+
+def test_write_compendiums(tmpdir):
+    target_dir = os.path.join(str(tmpdir), "compendiums")
+    targets = overhang.write_compendiums(
+        enzymes=["BsaI", "Esp3I"],
+        target_dir=target_dir,
+        workers=2,
+        output_format="html",
+        figure_backend="svg",
+    )
+    assert targets == [
+        os.path.join(target_dir, "compendium_BsaI.html"),
+        os.path.join(target_dir, "compendium_Esp3I.html"),
+    ]
+    overhangs = overhang.generate_all_overhangs(4)
+    html = overhang.write_pdf_report(
+        None, overhangs, enzyme="Esp3I", output_format="html", figure_backend="svg"
+    )
+    with open(targets[1], "r", encoding="utf-8") as f:
+        assert f.read() == html  # same as a single report
+
+    targets = overhang.write_compendiums(
+        enzymes=["BsaI"], target_dir=target_dir, output_format="json"
+    )
+    with open(targets[0], "r") as f:
+        assert json.load(f)["number_of_overhangs"] == 136
+
+
+def test_write_overhangset_report_html_and_json(tmpdir):
+    overhangset = overhang.OverhangSet(overhangs=["TAGG", "ATGG", "GACT", "AATT"])
+    html = overhang.write_overhangset_report(None, overhangset, output_format="html")
+    assert "Overhang set report" in html
+    assert html.count("data:image/svg+xml;base64,") == 5  # set and overhang plots
+
+    json_path = os.path.join(str(tmpdir), "test_set_report.json")
+    overhang.write_overhangset_report(json_path, overhangset, output_format="json")
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    assert data["severity"] == "error"
+    assert data["palindromic_overhangs"] == ["AATT"]
+    assert [oh["overhang"] for oh in data["overhang_data"]] == [
+        "CCTA",
+        "ATGG",
+        "AGTC",
+        "AATT",
+    ]
+
+
+def test_write_overhangset_report_svg_backend():
+    overhangset = overhang.OverhangSet(overhangs=["TAGG", "ATGG", "GACT"])
+    html = overhang.write_overhangset_report(
+        None, overhangset, output_format="html", figure_backend="svg"
+    )
+    assert html.count("data:image/svg+xml;base64,") == 4
+    assert not hasattr(overhangset, "ax")  # no matplotlib figure
+
+    overhangs = overhang.generate_all_overhangs(4)[0:3]
+    figures_data = overhang.reports.make_overhang_figures_data(
+        overhangs, "Esp3I", backend="svg"
+    )
+    assert figures_data[0].startswith("data:image/svg+xml;base64,")
+    assert figures_data != overhang.reports.make_overhang_figures_data(
+        overhangs, "Esp3I"
+    )
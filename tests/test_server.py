@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+import overhang.server
+from overhang.server import ValidationServer, validate_overhang_set_batch
+
+
+async def send_request(port, method, path, data=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if data is None else json.dumps(data).encode()
+    writer.write(
+        (
+            "%s %s HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (method, path, len(body))
+        ).encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    header, _, content = response.partition(b"\r\n\r\n")
+    status = int(header.split()[1])
+    return status, json.loads(content)
+
+
+def test_ValidationServer():
+    async def run_requests():
+        server = ValidationServer(workers=1, batch_delay=0.1, max_time_limit=5)
+        batch_sizes = []
+        run_batch = server.run_batch
+
+        async def run_recorded_batch(batch):
+            batch_sizes.append(len(batch))
+            await run_batch(batch)
+
+        server.run_batch = run_recorded_batch
+        await server.start()
+        try:
+            assert await send_request(server.port, "GET", "/health") == (
+                200,
+                {"status": "ok"},
+            )
+            overhang_sets = [
+                {"name": "Set %d" % i, "overhangs": ["TAGG", "ATGG", "GACT"][: i + 1]}
+                for i in range(3)
+            ]
+            responses = await asyncio.gather(
+                *[
+                    send_request(server.port, "POST", "/validate", overhang_set)
+                    for overhang_set in overhang_sets
+                ]
+            )
+            for overhang_set, (status, result) in zip(overhang_sets, responses):
+                assert status == 200
+                assert result["name"] == overhang_set["name"]
+                assert result["overhangs"] == overhang_set["overhangs"]
+            assert max(batch_sizes) > 1  # validated together
+
+            status, result = await send_request(
+                server.port,
+                "POST",
+                "/subset",
+                {
+                    "overhangs": ["CTAT", "GGAC", "TGTT"],
+                    "time_limit": 1e9,
+                },  # reduced to 5
+            )
+            assert status == 200
+            assert set(result["subset"]) == {"TGTT", "CTAT"}
+            status, result = await send_request(
+                server.port,
+                "POST",
+                "/subset",
+                {"overhangs": ["GCT", "AGC", "TTA"], "enzyme": "SapI"},
+            )
+            assert status == 400 and "No annealing data" in result["error"]
+            for time_limit in [-1, "inf", "soon"]:
+                status, result = await send_request(
+                    server.port,
+                    "POST",
+                    "/subset",
+                    {"overhangs": ["CTAT", "GGAC"], "time_limit": time_limit},
+                )
+                assert status == 400 and "time_limit" in result["error"]
+
+            status, result = await send_request(
+                server.port, "POST", "/validate", {"overhangs": ["TAGG"], "enzyme": "X"}
+            )
+            assert status == 400 and "error" in result
+            status, _ = await send_request(server.port, "POST", "/validate", None)
+            assert status == 400
+            status, _ = await send_request(server.port, "GET", "/unknown")
+            assert status == 404
+        finally:
+            await server.close()
+
+    asyncio.run(run_requests())
+
+
+def validate_or_fail(overhang_sets):
+    if any(overhang_set["name"] == "Crash" for overhang_set in overhang_sets):
+        raise RuntimeError("Worker failure")
+    return validate_overhang_set_batch(overhang_sets)
+
+
+def test_ValidationServer_bad_set_in_batch(monkeypatch):
+    # Workers are forked from this process, so they use this batch function:
+    monkeypatch.setattr(
+        overhang.server, "validate_overhang_set_batch", validate_or_fail
+    )
+
+    async def run_requests():
+        server = ValidationServer(workers=1, batch_delay=0.2)
+        await server.start()
+        try:
+            overhang_sets = [
+                {"name": "Good", "overhangs": ["TAGG", "ATGG"]},
+                {"name": "No overhangs", "overhangs": []},
+                {"name": "Crash", "overhangs": ["TAGG", "ATGG"]},
+            ]
+            responses = await asyncio.gather(
+                *[
+                    send_request(server.port, "POST", "/validate", overhang_set)
+                    for overhang_set in overhang_sets
+                ]
+            )
+            (status, result), (bad_status, bad_result), (crash_status, crash_result) = (
+                responses
+            )
+            assert status == 200 and "error" not in result
+            assert bad_status == 400 and bad_result["name"] == "No overhangs"
+            assert crash_status == 400 and "Worker failure" in crash_result["error"]
+        finally:
+            await server.close()
+
+    asyncio.run(run_requests())
@@ -0,0 +1,43 @@
+import itertools
+import random
+
+from overhang.subset import find_compatible_subset
+
+
+def test_find_compatible_subset():
+    rng = random.Random(0)
+    for n in [1, 5, 10, 12]:
+        items = ["item%d" % i for i in range(n)]
+        incompatible_pairs = [
+            pair for pair in itertools.combinations(items, 2) if rng.random() < 0.4
+        ]
+        subset, is_optimal = find_compatible_subset(items, incompatible_pairs)
+        assert is_optimal
+        for pair in itertools.combinations(subset, 2):
+            assert pair not in incompatible_pairs
+
+        # Compare with an exhaustive search:
+        largest = max(
+            size
+            for size in range(1, n + 1)
+            for candidate in itertools.combinations(items, size)
+            if not any(
+                pair in incompatible_pairs
+                for pair in itertools.combinations(candidate, 2)
+            )
+        )
+        assert len(subset) == largest
+
+
+def test_find_compatible_subset_time_limit():
+    rng = random.Random(1)
+    items = list(range(300))
+    incompatible_pairs = [
+        pair for pair in itertools.combinations(items, 2) if rng.random() < 0.5
+    ]
+    subset, is_optimal = find_compatible_subset(items, incompatible_pairs, time_limit=0)
+    assert not is_optimal
+    assert len(subset) > 1
+    incompatible_pairs = set(incompatible_pairs)
+    for pair in itertools.combinations(sorted(subset), 2):
+        assert pair not in incompatible_pairs
@@ -1,3 +1,5 @@
+import numpy as np
+
 import overhang
 
 
@@ -12,6 +14,15 @@ def test_generate_overhang_pairs():
     }
 
 
+def test_iter_overhang_pairs():
+    pairs = overhang.iter_overhang_pairs(2)
+    assert next(pairs) == ("AA", "TT")  # a generator
+    pairs = [("AA", "TT")] + list(pairs)
+    assert pairs == sorted(pairs)
+    assert {frozenset(pair) for pair in pairs} == overhang.generate_overhang_pairs(2)
+    assert len(pairs) == 10  # (16 + 4 palindromes) / 2
+
+
 def test_filter_overhangs():
     overhangs = [
         overhang.Overhang(ovhg)
@@ -25,3 +36,35 @@ def test_filter_overhangs():
     filtered_overhangs = overhang.filter_overhangs(overhangs)
     assert len(filtered_overhangs) == 2
     assert set([ovhg.overhang for ovhg in filtered_overhangs]) == set(["CCTA", "ATGG"])
+    # Also works with generators:
+    filtered_overhangs = overhang.filter_overhangs(iter(overhangs))
+    assert len(filtered_overhangs) == 2
+
+
+def test_encode_overhang():
+    assert overhang.tools.encode_overhang("ACGT") == 27
+    assert overhang.tools.decode_overhang(27, 4) == "ACGT"
+    assert overhang.tools.decode_overhang(0, 3) == "AAA"
+
+
+def test_reverse_complement_code():
+    code = overhang.tools.encode_overhang("AACGT")
+    code_rc = overhang.tools.reverse_complement_code(code, 5)
+    assert overhang.tools.decode_overhang(code_rc, 5) == "ACGTT"
+    codes_rc = overhang.tools.reverse_complement_codes([code, code_rc], 5)
+    assert list(codes_rc) == [code_rc, code]
+
+
+def test_get_hamming_distance_code():
+    codes = [overhang.tools.encode_overhang(seq) for seq in ["ACGT", "ACCA", "TGCA"]]
+    assert overhang.tools.get_hamming_distance_code(codes[0], codes[1]) == 2
+    assert overhang.tools.get_hamming_distance_code(codes[0], codes[2]) == 4
+    distances = overhang.tools.get_hamming_distance_matrix(codes, codes, 4)
+    assert distances.tolist() == [[0, 2, 4], [2, 0, 2], [4, 2, 0]]
+
+
+def test_count_bits(monkeypatch):
+    values = np.array([0, 1, 255, 2**63 + 3], dtype=np.uint64)
+    assert overhang.tools.count_bits(values).tolist() == [0, 1, 8, 3]
+    monkeypatch.delattr(np, "bitwise_count", raising=False)  # as in NumPy 1
+    assert overhang.tools.count_bits(values).tolist() == [0, 1, 8, 3]